@@ -1,3 +1,5 @@
+from django.core.cache import cache
+
 import amo
 
 
@@ -15,6 +17,56 @@ def match_rules(rules, app, action):
     return False
 
 
+class CompiledRules(object):
+    """
+    The rules of several groups, compiled so `allows` gives the same answer
+    as `match_rules` over all of them with a few set lookups.
+    """
+
+    def __init__(self, rules):
+        self.pairs = set()
+        self.apps = set()
+        for rule in ','.join(rules).split(','):
+            rule_app, sep, rule_action = rule.partition(':')
+            if sep:
+                self.pairs.add((rule_app, rule_action))
+                self.apps.add(rule_app)
+
+    def allows(self, app, action):
+        if action == '%':
+            return '*' in self.apps or app in self.apps
+        pairs = self.pairs
+        return ((app, action) in pairs or (app, '*') in pairs or
+                ('*', action) in pairs or ('*', '*') in pairs)
+
+
+class UserGroups(list):
+    """A user's groups along with their compiled rules, see get_groups."""
+
+    def __init__(self, groups):
+        super(UserGroups, self).__init__(groups)
+        self.rules = CompiledRules(g.rules for g in self)
+
+
+def groups_cache_key(user_id):
+    # Circular import.
+    from amo.utils import cache_ns_key
+    return '%s:%s' % (cache_ns_key('acl-groups'), user_id)
+
+
+def get_groups(user):
+    """
+    Return a user's groups as UserGroups. They are cached until the user's
+    group membership or any group changes, see access.models.
+    """
+    key = groups_cache_key(user.id)
+    groups = cache.get(key)
+    if groups is None:
+        groups = list(user.groups.all())
+        cache.set(key, groups)
+    return UserGroups(groups)
+
+
 def action_allowed(request, app, action):
     """
     Determines if the request user has permission to do a certain action
@@ -22,16 +74,16 @@ def action_allowed(request, app, action):
     'Admin:%' is true if the user has any of:
     ('Admin:*', 'Admin:%s'%whatever, '*:*',) as rules.
     """
-    allowed = any(match_rules(group.rules, app, action) for group in
-                  getattr(request, 'groups', ()))
+    groups = getattr(request, 'groups', ())
+    if isinstance(groups, UserGroups):
+        return groups.rules.allows(app, action)
+    allowed = any(match_rules(group.rules, app, action) for group in groups)
     return allowed
 
 
 def action_allowed_user(user, app, action):
     """Similar to action_allowed, but takes user instead of request."""
-    allowed = any(match_rules(group.rules, app, action) for group in
-                  user.groups.all())
-    return allowed
+    return get_groups(user).rules.allows(app, action)
 
 
 def check_ownership(request, obj, require_owner=False, require_author=False,
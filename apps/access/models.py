@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.db import models
 from django import dispatch
 from django.db.models import signals
@@ -61,3 +62,26 @@ def groupuser_post_delete(sender, instance, **kw):
         instance.user.user.is_superuser = instance.user.user.is_staff = False
         instance.user.user.save()
     log.info('Removed %s from %s' % (instance.user, instance.group))
+
+
+@dispatch.receiver(signals.post_save, sender=GroupUser,
+                   dispatch_uid='groupuser.clear_groups')
+@dispatch.receiver(signals.post_delete, sender=GroupUser,
+                   dispatch_uid='groupuser.clear_groups')
+def clear_user_groups(sender, instance, **kw):
+    """Forget the cached groups of a user who joined or left a group."""
+    from access.acl import groups_cache_key  # Circular import.
+    cache.delete(groups_cache_key(instance.user_id))
+
+
+@dispatch.receiver(signals.post_save, sender=Group,
+                   dispatch_uid='group.clear_groups')
+@dispatch.receiver(signals.post_delete, sender=Group,
+                   dispatch_uid='group.clear_groups')
+@dispatch.receiver(signals.m2m_changed, sender=GroupUser,
+                   dispatch_uid='groupuser.m2m.clear_groups')
+def clear_all_groups(sender, **kw):
+    """Forget everyone's cached groups when a group or its rules change."""
+    # Circular import.
+    from amo.utils import cache_ns_key
+    cache_ns_key('acl-groups', increment=True)
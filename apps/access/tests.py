@@ -1,8 +1,10 @@
+import itertools
+
 from django.contrib.auth.models import User
 from django.http import HttpRequest
 
 import mock
-from nose.tools import assert_false
+from nose.tools import assert_false, eq_
 
 import amo
 from amo.tests import TestCase, req_factory_factory
@@ -10,8 +12,10 @@ from amo.urlresolvers import reverse
 from addons.models import Addon, AddonUser
 from users.models import UserProfile
 
-from .acl import (action_allowed, check_addon_ownership, check_ownership,
-                  check_reviewer, match_rules)
+from .acl import (action_allowed, action_allowed_user, check_addon_ownership,
+                  check_ownership, check_reviewer, CompiledRules, get_groups,
+                  match_rules)
+from .models import Group, GroupUser
 
 
 def test_match_rules():
@@ -236,3 +240,58 @@ class TestCheckReviewer(TestCase):
         assert not check_reviewer(req, only='app')
         assert not check_reviewer(req, only='addon')
         assert check_reviewer(req, only='persona')
+
+
+def test_compiled_rules():
+    rules = ('*:*', 'Admin:*', 'Admin:%', 'Admin:EditAnyAddon',
+             'Editors:*,Admin:features', 'Stats:View', 'Apps:Review',
+             '*:Review', 'Locale.de:Edit', 'None:None')
+    checks = [('Admin', '%'), ('Admin', 'EditAnyAddon'), ('Admin', 'Foo'),
+              ('Editors', 'Anything'), ('Apps', 'Review'), ('Apps', '%'),
+              ('Addons', 'Review'), ('Stats', 'Edit'), ('Locale.de', 'Edit'),
+              ('Locale.fr', 'Edit')]
+
+    for n in range(1, len(rules) + 1):
+        for combo in itertools.combinations(rules, n):
+            compiled = CompiledRules(combo)
+            for app, action in checks:
+                eq_(compiled.allows(app, action),
+                    any(match_rules(r, app, action) for r in combo),
+                    (combo, app, action))
+
+
+class TestGetGroups(TestCase):
+    fixtures = ['base/users']
+
+    def setUp(self):
+        self.user = UserProfile.objects.get(email='regular@mozilla.com')
+
+    def test_cached(self):
+        self.grant_permission(self.user, 'Apps:Review')
+        eq_([g.name for g in get_groups(self.user)], ['Test Group'])
+        with self.assertNumQueries(0):
+            groups = get_groups(self.user)
+        assert groups.rules.allows('Apps', 'Review')
+        assert action_allowed_user(self.user, 'Apps', 'Review')
+
+    def test_membership_changed(self):
+        assert not get_groups(self.user)
+        self.grant_permission(self.user, 'Apps:Review')
+        assert action_allowed_user(self.user, 'Apps', 'Review')
+        GroupUser.objects.filter(user=self.user).delete()
+        assert not action_allowed_user(self.user, 'Apps', 'Review')
+
+    def test_rules_changed(self):
+        self.grant_permission(self.user, 'Apps:Review')
+        assert action_allowed_user(self.user, 'Apps', 'Review')
+        Group.objects.get(name='Test Group').update(rules='Apps:Edit')
+        assert not action_allowed_user(self.user, 'Apps', 'Review')
+        assert action_allowed_user(self.user, 'Apps', 'Edit')
+
+    def test_request(self):
+        self.grant_permission(self.user, 'Addons:Edit')
+        req = req_factory_factory('noop', user=self.user)
+        req.groups = get_groups(self.user)
+        assert action_allowed(req, 'Addons', 'Edit')
+        assert action_allowed(req, 'Addons', '%')
+        assert not action_allowed(req, 'Admin', '%')
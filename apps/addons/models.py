@@ -1637,9 +1637,10 @@ def version_changed(sender, **kw):
 @receiver(dbsignals.post_save, sender=Addon,
           dispatch_uid='addons.search.index')
 def update_search_index(sender, instance, **kw):
-    from . import tasks
+    from lib.es import queue
+    from . import tasks  # NOQA: registers the index queue.
     if not kw.get('raw'):
-        tasks.index_addons.delay([instance.id])
+        queue.add('addons', [instance.id])
 
 
 @Addon.on_change
@@ -2443,6 +2444,23 @@ models.signals.post_delete.connect(update_incompatible_versions,
                                    dispatch_uid='cor_update_incompatible')
 
 
+def clear_api_dicts(sender, instance, **kw):
+    """Clear the cached API dicts for an add-on, its versions, previews or
+    authors, see api.utils.addons_to_dicts."""
+    # Circular import.
+    from api.utils import clear_addon_dicts
+    if kw.get('raw'):
+        return
+    clear_addon_dicts(instance.id if isinstance(instance, Addon)
+                      else instance.addon_id)
+
+
+for _sender in (Addon, Version, Preview, AddonUser):
+    for _signal in (models.signals.post_save, models.signals.post_delete):
+        _signal.connect(clear_api_dicts, sender=_sender,
+                        dispatch_uid='clear_api_dicts')
+
+
 # webapps.models imports addons.models to get Addon, so we need to keep the
 # Webapp import down here.
 from mkt.webapps.models import Webapp
@@ -14,7 +14,9 @@ from editors.models import RereviewQueueTheme
 import amo
 from amo.decorators import set_modified_on, write
 from amo.storage_utils import rm_stored_dir
-from amo.utils import cache_ns_key, ImageCheck, LocalFileStorage
+from amo.utils import (cache_ns_key, ImageCheck, LocalFileStorage,
+                       resize_images)
+from lib.es import queue as index_queue
 from lib.es.utils import index_objects
 from versions.models import Version
 
@@ -114,6 +116,9 @@ def index_addons(ids, **kw):
     index_objects(ids, Addon, search, kw.pop('index', None), transforms)
 
 
+index_queue.register('addons', index_addons)
+
+
 @task
 def unindex_addons(ids, **kw):
     for addon in ids:
@@ -133,6 +138,21 @@ def delete_persona_image(dst, **kw):
         log.error('Error deleting persona image: %s' % e)
 
 
+def _persona_preview(im):
+    """Crop the right of a Persona header and resize it for the preview."""
+    preview, (orig_w, orig_h) = amo.PERSONA_IMAGE_SIZES['header']
+    im = im.crop((orig_w - (preview[0] * 2), 0, orig_w, orig_h))
+    return im.resize(preview, Image.ANTIALIAS)
+
+
+def _persona_icon(im):
+    """Crop the right of a Persona header and resize it for the icon."""
+    preview, (orig_w, orig_h) = amo.PERSONA_IMAGE_SIZES['header']
+    _, icon_size = amo.PERSONA_IMAGE_SIZES['icon']
+    im = im.crop((orig_w - (preview[1] * 2), 0, orig_w, orig_h))
+    return im.resize(icon_size, Image.ANTIALIAS)
+
+
 @set_modified_on
 def create_persona_preview_images(src, full_dst, **kw):
     """
@@ -140,32 +160,9 @@ def create_persona_preview_images(src, full_dst, **kw):
     a 32x32 thumbnail used for search suggestions/detail pages.
     """
     log.info('[1@None] Resizing persona images: %s' % full_dst)
-    preview, full = amo.PERSONA_IMAGE_SIZES['header']
-    preview_w, preview_h = preview
-    orig_w, orig_h = full
-    with storage.open(src) as fp:
-        i_orig = i = Image.open(fp)
-
-        # Crop image from the right.
-        i = i.crop((orig_w - (preview_w * 2), 0, orig_w, orig_h))
-
-        # Resize preview.
-        i = i.resize(preview, Image.ANTIALIAS)
-        i.load()
-        with storage.open(full_dst[0], 'wb') as fp:
-            i.save(fp, 'png')
-
-        _, icon_size = amo.PERSONA_IMAGE_SIZES['icon']
-        icon_w, icon_h = icon_size
-
-        # Resize icon.
-        i = i_orig
-        i.load()
-        i = i.crop((orig_w - (preview_h * 2), 0, orig_w, orig_h))
-        i = i.resize(icon_size, Image.ANTIALIAS)
-        i.load()
-        with storage.open(full_dst[1], 'wb') as fp:
-            i.save(fp, 'png')
+    resize_images(src, [(full_dst[0], _persona_preview),
+                        (full_dst[1], _persona_icon)],
+                  remove_src=False, mode=None)
     return True
 
 
@@ -177,10 +174,7 @@ def save_persona_image(src, full_dst, **kw):
     if not img.is_image():
         log.error('Not an image: %s' % src, exc_info=True)
         return
-    with storage.open(src, 'rb') as fp:
-        i = Image.open(fp)
-        with storage.open(full_dst, 'wb') as fp:
-            i.save(fp, 'png')
+    resize_images(src, [(full_dst, None)], remove_src=False, mode=None)
     return True
 
 
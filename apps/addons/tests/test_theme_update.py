@@ -26,7 +26,10 @@ class TestWSGIApplication(amo.tests.TestCase):
         urls = {
             '/themes/update-check/5': ['en-US', 5, None],
             '/en-US/themes/update-check/5': ['en-US', 5, None],
-            '/fr/themes/update-check/5': ['fr', 5, None]
+            '/fr/themes/update-check/5': ['fr', 5, None],
+            '/en-us/themes/update-check/5': ['en-US', 5, None],
+            '/fr-FR/themes/update-check/5': ['fr', 5, None],
+            '/xx/themes/update-check/5': ['en-US', 5, None],
         }
 
         # From AMO we consume the ID as the `addon_id`.
@@ -20,11 +20,12 @@ import waffle
 
 import amo
 import amo.tests
+from amo import perf
 from amo.helpers import absolutify, numberfmt, urlparams
 from amo.tests import addon_factory
 from amo.urlresolvers import reverse
 from abuse.models import AbuseReport
-from addons.models import Addon, AddonDependency, AddonUser, Charity
+from addons.models import Addon, AddonDependency, AddonUser, Charity, Preview
 from bandwagon.models import Collection
 from files.models import File
 from paypal.tests.test import other_error
@@ -93,6 +94,17 @@ class TestHomepage(amo.tests.TestCase):
             'Welcome to Thunderbird Add-ons. Add extra features and styles to '
             'make Thunderbird your own.')
 
+    def test_query_budget(self):
+        # The page's queries with one add-on are the budget for five.
+        addon_factory()
+        with perf.collect() as one:
+            eq_(self.client.get(self.base_url).status_code, 200)
+        for i in range(4):
+            addon_factory()
+        cache.clear()
+        with self.assertQueryBudget(one.queries):
+            eq_(self.client.get(self.base_url).status_code, 200)
+
 
 class TestHomepageFeatures(amo.tests.TestCase):
     fixtures = ['base/apps',
@@ -832,6 +844,19 @@ class TestImpalaDetailPage(amo.tests.TestCase):
     def get_pq(self):
         return pq(self.client.get(self.url).content)
 
+    def test_query_budget(self):
+        # More authors and previews mustn't mean more queries.
+        with perf.collect() as before:
+            eq_(self.client.get(self.url).status_code, 200)
+        for i in range(3):
+            user = UserProfile.objects.create(username='author%s' % i,
+                                              email='author%s@mozilla.com' % i)
+            AddonUser.objects.create(addon=self.addon, user=user, listed=True)
+            Preview.objects.create(addon=self.addon, position=i)
+        cache.clear()
+        with self.assertQueryBudget(before.queries):
+            eq_(self.client.get(self.url).status_code, 200)
+
     def test_no_webapps(self):
         self.addon.update(type=amo.ADDON_WEBAPP)
         eq_(self.client.get(self.url).status_code, 404)
@@ -35,7 +35,7 @@ def reverse_name_lookup(key, webapp=False):
     return None  # Explicitly return None for no results
 
 
-@memoize('addons:featured', time=60 * 10)
+@memoize('addons:featured', time=60 * 10, lock=True)
 def get_featured_ids(app, lang=None, type=None):
     from addons.models import Addon
     ids = []
@@ -66,7 +66,7 @@ def get_featured_ids(app, lang=None, type=None):
     return map(int, ids)
 
 
-@memoize('addons:creatured', time=60 * 10)
+@memoize('addons:creatured', time=60 * 10, lock=True)
 def get_creatured_ids(category, lang):
     from addons.models import Addon
     from bandwagon.models import FeaturedCollection
@@ -29,7 +29,7 @@ def i18n(request):
             }
 
 
-@memoize('collect-timings')
+@memoize('collect-timings', local=60)
 def get_collect_timings():
     # The flag has to be enabled for everyone and then we'll use that
     # percentage in the pages.
@@ -13,7 +13,7 @@ import amo
 from amo.utils import chunked
 from bandwagon.models import Collection
 from constants.base import VALID_STATUSES
-from devhub.models import ActivityLog
+from devhub.log_partitions import expire_logs
 from lib.es.utils import raise_if_reindex_in_progress
 from sharing import SERVICES_LIST, LOCAL_SERVICES_LIST
 from stats.models import AddonShareCount, Contribution
@@ -31,9 +31,6 @@ def gc(test_result=True):
 
     log.debug('Collecting data to delete')
 
-    logs = (ActivityLog.objects.filter(created__lt=days_ago(90))
-            .exclude(action__in=amo.LOG_KEEP).values_list('id', flat=True))
-
     # Paypal only keeps retrying to verify transactions for up to 3 days. If we
     # still have an unverified transaction after 6 days, we might as well get
     # rid of it.
@@ -45,8 +42,6 @@ def gc(test_result=True):
             created__lt=days_ago(2), type=amo.COLLECTION_ANONYMOUS)
             .values_list('id', flat=True))
 
-    for chunk in chunked(logs, 100):
-        tasks.delete_logs.delay(chunk)
     for chunk in chunked(contributions_to_delete, 100):
         tasks.delete_stale_contributions.delay(chunk)
     for chunk in chunked(collections_to_delete, 100):
@@ -54,6 +49,9 @@ def gc(test_result=True):
     # Incomplete addons cannot be deleted here because when an addon is
     # rejected during a review it is marked as incomplete. See bug 670295.
 
+    log.debug('Expiring activity logs.')
+    expire_logs(days_ago(90))
+
     log.debug('Cleaning up sharing services.')
     service_names = [s.shortname for s in SERVICES_LIST]
     # collect local service names
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import time
+from optparse import make_option
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from PIL import Image
+
+import amo
+from amo.utils import resize_image, resize_images, resize_many
+
+HELP = 'Time resizing a corpus of images to every add-on icon size'
+FORMATS = ('.png', '.jpg', '.jpeg', '.gif')
+
+
+class Command(BaseCommand):
+    """
+    Times producing every add-on icon size for each image in a corpus:
+    decoding once per size (resize_image), once per image (resize_images),
+    in a process pool (resize_many) and again with unchanged sources.
+
+    The default corpus is the test images, which include animated PNGs and
+    GIFs, plus a large generated PNG and JPEG.
+
+    Usage:
+
+        python manage.py bench_images --corpus=/path/to/images --rounds=5
+
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--corpus', help='Directory of images to resize.'),
+        make_option('--rounds', type='int', default=3,
+                    help='Number of times to resize the corpus.'),
+        make_option('--processes', type='int', default=None,
+                    help='Size of the process pool, one per CPU by default.'),
+    )
+    help = HELP
+
+    def handle(self, *args, **kw):
+        tmp = tempfile.mkdtemp(dir=settings.TMP_PATH)
+        try:
+            sources = self.corpus(kw['corpus'], tmp)
+            if not sources:
+                raise CommandError('No images found.')
+            self.bench(sources, tmp, kw['rounds'], kw['processes'])
+        finally:
+            shutil.rmtree(tmp)
+
+    def corpus(self, path, tmp):
+        if not path:
+            path = os.path.join(settings.ROOT, 'apps', 'amo', 'tests',
+                                'images')
+            w, h = 1024, 768
+            im = Image.fromstring('RGB', (w, h), os.urandom(w * h * 3))
+            for ext in ('png', 'jpeg'):
+                im.save(os.path.join(tmp, 'generated.%s' % ext), ext)
+        return sorted(os.path.join(d, f)
+                      for d in (path, tmp) for f in os.listdir(d)
+                      if f.lower().endswith(FORMATS))
+
+    def bench(self, sources, tmp, rounds, processes):
+        sizes = amo.ADDON_ICON_SIZES
+        jobs = [(src, [(os.path.join(tmp, '%s-%s.png' % (i, s)), (s, s))
+                       for s in sizes])
+                for i, src in enumerate(sources)]
+
+        def per_size():
+            for src, outputs in jobs:
+                for dst, size in outputs:
+                    resize_image(src, dst, size, remove_src=False,
+                                 locally=True)
+
+        def per_image():
+            for src, outputs in jobs:
+                resize_images(src, outputs, remove_src=False, locally=True)
+
+        def pool():
+            resize_many(jobs, processes, remove_src=False, locally=True)
+
+        def run(fn, clear=True):
+            start = time.time()
+            for i in xrange(rounds):
+                if clear:
+                    cache.clear()
+                fn()
+            return len(jobs) * rounds / (time.time() - start)
+
+        print '%s images, %s sizes each' % (len(jobs), len(sizes))
+        print 'resize_image:   %8.1f images/s' % run(per_size)
+        print 'resize_images:  %8.1f images/s' % run(per_image)
+        print 'resize_many:    %8.1f images/s' % run(pool)
+        # The pool's processes may not share our cache.
+        per_image()
+        print 'unchanged:      %8.1f images/s' % run(per_image, clear=False)
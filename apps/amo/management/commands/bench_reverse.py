@@ -0,0 +1,49 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.urlresolvers import NoReverseMatch
+
+from amo.urlresolvers import django_reverse, fast_reverse
+
+HELP = 'Compare the cost of reversing URLs with and without fast_reverse'
+
+
+class Command(BaseCommand):
+    """
+    Times Django's reverse against `amo.urlresolvers.fast_reverse` for a URL
+    name, the way API serializers call it.
+
+    Usage:
+
+        python manage.py bench_reverse app-detail 12345 --rounds=10000
+
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--rounds', type='int', default=10000,
+                    help='Number of times to reverse the URL.'),
+    )
+    args = '<url name> [<arg> ...]'
+    help = HELP
+
+    def handle(self, *args, **kw):
+        if not args:
+            raise CommandError('Pass a URL name.')
+        name, url_args = args[0], list(args[1:]) or None
+        try:
+            url = django_reverse(name, args=url_args)
+        except NoReverseMatch as e:
+            raise CommandError(str(e))
+        if fast_reverse(name, args=url_args) != url:
+            raise CommandError('fast_reverse returned a different URL.')
+
+        def run(fn):
+            start = time.time()
+            for i in xrange(kw['rounds']):
+                fn(name, args=url_args)
+            return (time.time() - start) * 1e6 / kw['rounds']
+
+        print url
+        print 'django: %8.1f us/call' % run(django_reverse)
+        print 'fast:   %8.1f us/call' % run(fast_reverse)
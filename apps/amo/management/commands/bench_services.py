@@ -0,0 +1,281 @@
+import glob
+import json
+import os
+import random
+import re
+import time
+from optparse import make_option
+from StringIO import StringIO
+from urllib import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+
+import mock
+
+import amo
+from addons.models import Addon
+from applications.models import AppVersion
+from services import pfs, theme_update, update, verify
+
+HELP = 'Benchmark the services/ WSGI apps in-process'
+
+# Access log request lines, and the service each path belongs to.
+REQUEST_RE = re.compile(r'"(?:GET|HEAD) (?P<path>[^ ?"]+)\??(?P<qs>[^ "]*)')
+ROUTES = (
+    ('update', re.compile(r'/VersionCheck\.php$')),
+    ('theme_update', theme_update.url_re),
+    ('pfs', re.compile(r'/(PluginFinderService|pfs)\.php$')),
+)
+
+PFS_MIMETYPES = [
+    'application/x-shockwave-flash', 'application/x-director',
+    'audio/x-pn-realaudio-plugin', 'video/quicktime', 'audio/mpeg',
+    'application/x-java-applet;version=1.5', 'application/pdf',
+    'video/x-ms-wmv', 'application/x-mtx', 'video/vnd.divx',
+    'application/x-silverlight-2', 'application/x-unknown']
+PLATFORMS = ['Windows NT 6.1', 'Windows NT 5.1', 'Intel Mac OS X 10.8',
+             'PPC Mac OS X 10.5', 'Linux x86_64', 'Linux i686']
+LOCALES = ['en-US', 'de', 'fr', 'ja-JP', 'es-ES', 'pt-BR']
+COMPAT_MODES = ['normal'] * 8 + ['strict', 'ignore']
+
+
+class CountingCursor(object):
+
+    def __init__(self, cursor, counter):
+        self.cursor = cursor
+        self.counter = counter
+
+    def execute(self, *args, **kw):
+        self.counter.queries += 1
+        return self.cursor.execute(*args, **kw)
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+
+class CountingConnection(object):
+
+    def __init__(self, conn, counter):
+        self.conn = conn
+        self.counter = counter
+
+    def cursor(self, *args, **kw):
+        return CountingCursor(self.conn.cursor(*args, **kw), self.counter)
+
+    def __getattr__(self, attr):
+        return getattr(self.conn, attr)
+
+
+class CountingPool(object):
+    """Stands in for a service's mypool, counting the queries made."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.queries = 0
+
+    def connect(self):
+        return CountingConnection(self.pool.connect(), self)
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100.0))]
+
+
+class Command(BaseCommand):
+    """
+    Drives each services/ WSGI application in-process, against the
+    database in SERVICES_DATABASE, and reports latency percentiles,
+    requests per second on one core and queries per request.
+
+    Requests are replayed from access logs with --log, or made up from
+    add-ons, themes and app versions in the database. verify only runs
+    with --receipts, a directory made by `generate_receipts`.
+
+    Save the results with --save and compare a later run against them
+    with --compare, which fails if a service got slower than --tolerance
+    percent or makes more queries.
+
+    Usage:
+
+        python manage.py bench_services --requests=2000 --save=base.json
+        python manage.py bench_services --log=access.log --compare=base.json
+
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--services', default='update,theme_update,verify,pfs',
+                    help='Comma separated services to run.'),
+        make_option('--requests', type='int', default=1000,
+                    help='Requests per service.'),
+        make_option('--warmup', type='int', default=100,
+                    help='Untimed requests per service before timing.'),
+        make_option('--log', action='append', default=[],
+                    help='Access log to replay requests from.'),
+        make_option('--receipts', help='Directory of receipts for verify.'),
+        make_option('--seed', type='int', default=0,
+                    help='Seed for picking requests.'),
+        make_option('--save', help='Save the results as a baseline.'),
+        make_option('--compare', help='Baseline to compare against.'),
+        make_option('--tolerance', type='float', default=10,
+                    help='Percent a baseline may be missed by.'),
+    )
+    help = HELP
+
+    def handle(self, *args, **kw):
+        self.rand = random.Random(kw['seed'])
+        names = kw['services'].split(',')
+        logged = self.from_logs(kw['log'])
+
+        results = {}
+        for name in names:
+            if name not in SERVICES:
+                raise CommandError('Unknown service: %s' % name)
+            mix = logged.get(name) or getattr(self, 'mix_' + name)(kw)
+            if not mix:
+                print '%s: no requests, skipped' % name
+                continue
+            requests = [self.rand.choice(mix)
+                        for i in xrange(kw['warmup'] + kw['requests'])]
+            results[name] = self.run(name, requests, kw['warmup'])
+
+        self.report(results)
+        if kw['compare']:
+            with open(kw['compare']) as fp:
+                self.compare(results, json.load(fp), kw['tolerance'])
+        if kw['save']:
+            with open(kw['save'], 'w') as fp:
+                json.dump(results, fp, indent=2, sort_keys=True)
+
+    def from_logs(self, paths):
+        """Requests from access logs, grouped by service."""
+        mixes = {}
+        for path in paths:
+            with open(path) as fp:
+                for line in fp:
+                    match = REQUEST_RE.search(line)
+                    if not match:
+                        continue
+                    for name, route in ROUTES:
+                        if route.search(match.group('path')):
+                            mixes.setdefault(name, []).append(
+                                ('GET', match.group('path'),
+                                 match.group('qs'), ''))
+                            break
+        return mixes
+
+    def mix_update(self, kw):
+        addons = (Addon.objects.exclude(type=amo.ADDON_WEBAPP)
+                  .exclude(guid=None)
+                  .filter(status__in=amo.REVIEWED_STATUSES, inactive=False)
+                  .values_list('guid', '_current_version__version')[:1000])
+        app_versions = list(AppVersion.objects
+                            .filter(application=amo.FIREFOX.id)
+                            .order_by('-version_int')
+                            .values_list('version', flat=True)[:10])
+        mix = []
+        for guid, version in addons:
+            for app_version in app_versions:
+                mix.append(('GET', '/update/VersionCheck.php', urlencode({
+                    'reqVersion': 2, 'id': guid, 'version': version or '',
+                    'appID': amo.FIREFOX.guid, 'appVersion': app_version,
+                    'appOS': self.rand.choice(PLATFORMS),
+                    'compatMode': self.rand.choice(COMPAT_MODES)}), ''))
+        return mix
+
+    def mix_theme_update(self, kw):
+        themes = (Addon.objects.filter(type=amo.ADDON_PERSONA,
+                                       status=amo.STATUS_PUBLIC)
+                  .values_list('id', 'persona__persona_id')[:1000])
+        mix = []
+        for addon_id, persona_id in themes:
+            for locale in LOCALES:
+                path = '/%s/themes/update-check/%%s' % locale
+                mix.append(('GET', path % addon_id, '', ''))
+                if persona_id:
+                    mix.append(('GET', path % persona_id, 'src=gp', ''))
+        return mix
+
+    def mix_verify(self, kw):
+        if not kw['receipts']:
+            return []
+        mix = []
+        for path in glob.glob(os.path.join(kw['receipts'], '*.receipt')):
+            with open(path) as fp:
+                mix.append(('POST', '/verify/', '', fp.read()))
+        return mix
+
+    def mix_pfs(self, kw):
+        return [('GET', '/PluginFinderService.php', urlencode({
+                    'mimetype': mimetype,
+                    'appID': amo.FIREFOX.guid,
+                    'appVersion': '20130101',
+                    'clientOS': platform,
+                    'chromeLocale': locale}), '')
+                for mimetype in PFS_MIMETYPES
+                for platform in PLATFORMS
+                for locale in LOCALES]
+
+    def run(self, name, requests, warmup):
+        module = SERVICES[name]
+        statuses = {}
+
+        def start_response(status, headers):
+            statuses[status] = statuses.get(status, 0) + 1
+
+        # pfs doesn't use the database, the pool is just never connected.
+        pool = CountingPool(getattr(module, 'mypool', None))
+        times = []
+        with mock.patch.object(module, 'mypool', pool, create=True):
+            for i, (method, path, qs, body) in enumerate(requests):
+                if i == warmup:
+                    pool.queries = 0
+                    statuses.clear()
+                environ = {'REQUEST_METHOD': method, 'PATH_INFO': path,
+                           'QUERY_STRING': qs,
+                           'wsgi.input': StringIO(body),
+                           'CONTENT_LENGTH': str(len(body))}
+                start = time.time()
+                try:
+                    module.application(environ, start_response)
+                except Exception:
+                    start_response('500 Exception', [])
+                times.append(time.time() - start)
+
+        times = sorted(times[warmup:])
+        return {'requests': len(times),
+                'p50': percentile(times, 50) * 1000,
+                'p99': percentile(times, 99) * 1000,
+                'rps': len(times) / sum(times),
+                'queries': float(pool.queries) / len(times),
+                'statuses': statuses}
+
+    def report(self, results):
+        print '%-14s %8s %9s %9s %9s %8s' % ('service', 'requests', 'p50 ms',
+                                            'p99 ms', 'req/s', 'queries')
+        for name, r in sorted(results.items()):
+            print '%-14s %8d %9.2f %9.2f %9.0f %8.2f' % (
+                name, r['requests'], r['p50'], r['p99'], r['rps'],
+                r['queries'])
+            print '%14s %s' % ('', ', '.join('%s: %s' % s for s in
+                                              sorted(r['statuses'].items())))
+
+    def compare(self, results, baseline, tolerance):
+        regressions = []
+        for name, r in sorted(results.items()):
+            if name not in baseline:
+                continue
+            base = baseline[name]
+            for key, worse in (('p50', 1), ('p99', 1), ('rps', -1)):
+                change = (r[key] - base[key]) * 100.0 / base[key]
+                print '%-14s %-4s %9.2f -> %9.2f (%+.1f%%)' % (
+                    name, key, base[key], r[key], change)
+                if change * worse > tolerance:
+                    regressions.append('%s %s' % (name, key))
+            if r['queries'] > base['queries']:
+                regressions.append('%s queries' % name)
+        if regressions:
+            raise CommandError('Regressed: %s' % ', '.join(regressions))
+
+
+SERVICES = {'update': update, 'theme_update': theme_update,
+            'verify': verify, 'pfs': pfs}
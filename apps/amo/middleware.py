@@ -23,7 +23,7 @@ import jingo
 from django_statsd.clients import statsd
 
 import amo
-from . import urlresolvers
+from . import perf, urlresolvers
 from .helpers import urlparams
 
 
@@ -247,3 +247,50 @@ class NoAddonsMiddleware(ViewMiddleware):
         name = self.get_name(view_func)
         if name.startswith(settings.NO_ADDONS_MODULES):
             raise Http404
+
+
+perf_log = commonware.log.getLogger('z.perf')
+
+
+class PerfMiddleware(ViewMiddleware):
+    """
+    Counts and times the SQL queries, cache calls, ES searches and template
+    renders of each request, see amo.perf. They're sent to statsd as
+    perf.<view>.<name> timers and perf.<view>.<name>.count counters.
+
+    Requests making more queries than the view's budget (PERF_QUERY_BUDGET
+    or PERF_QUERY_BUDGETS) get request.over_query_budget set and are
+    logged and counted.
+    """
+
+    def process_request(self, request):
+        request.perf_stats = perf.start()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = getattr(request, 'perf_stats', None)
+        if stats:
+            stats.view = self.get_name(view_func)
+
+    def process_response(self, request, response):
+        stats = getattr(request, 'perf_stats', None)
+        if stats:
+            perf.stop(stats)
+            if stats.view:
+                self.report(request, stats)
+        return response
+
+    def report(self, request, stats):
+        for name, count in stats.counts.items():
+            key = 'perf.%s.%s' % (stats.view, name)
+            if name in stats.times:
+                statsd.timing(key, stats.times[name])
+            statsd.incr('%s.count' % key, count)
+
+        budget = perf.query_budget(stats.view)
+        request.over_query_budget = (budget is not None and
+                                     stats.queries > budget)
+        if request.over_query_budget:
+            statsd.incr('perf.%s.over_budget' % stats.view)
+            perf_log.warning('%s made %s queries, over its budget of %s: %s'
+                             % (request.path, stats.queries, budget,
+                                stats.summary()))
@@ -0,0 +1,214 @@
+"""
+Count and time the SQL queries, cache calls, ES searches and template
+renders done while handling a request.
+
+`install` wraps the database, cache, search and template layers so they
+report to the RequestStats of the current thread, if `collect` started one.
+PerfMiddleware does that for every request and sends the totals to statsd
+under the view's name.
+"""
+import collections
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.backends import BaseDatabaseWrapper
+
+import jinja2
+
+import amo.search
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = []
+
+
+class RequestStats(object):
+    """Number of calls and total milliseconds for each kind of work."""
+
+    def __init__(self):
+        self.counts = collections.defaultdict(int)
+        self.times = collections.defaultdict(float)
+        self.parent = self.view = None
+        # The names being timed, so nested calls aren't counted twice.
+        self.active = set()
+
+    def add(self, name, count=1, ms=None):
+        self.counts[name] += count
+        if ms is not None:
+            self.times[name] += ms
+
+    def update(self, other):
+        for name, count in other.counts.items():
+            self.add(name, count, other.times.get(name))
+
+    @property
+    def queries(self):
+        return self.counts['sql.master'] + self.counts['sql.slave']
+
+    def summary(self):
+        return ', '.join('%s: %s (%.1fms)' % (name, self.counts[name],
+                                             self.times.get(name, 0))
+                         for name in sorted(self.counts))
+
+
+def current():
+    """The RequestStats being collected on this thread, or None."""
+    return getattr(_local, 'stats', None)
+
+
+def start():
+    """Start collecting RequestStats on this thread."""
+    install()
+    stats = RequestStats()
+    stats.parent = current()
+    _local.stats = stats
+    return stats
+
+
+def stop(stats):
+    """
+    Stop collecting `stats`. If they were started inside another
+    collection, what they collected is added to it.
+    """
+    _local.stats = stats.parent
+    if stats.parent is not None:
+        stats.parent.update(stats)
+
+
+@contextmanager
+def collect():
+    """Collect RequestStats for the block."""
+    stats = start()
+    try:
+        yield stats
+    finally:
+        stop(stats)
+
+
+@contextmanager
+def timing(name):
+    stats = current()
+    if stats is None or name in stats.active:
+        yield
+        return
+    stats.active.add(name)
+    start = time.time()
+    try:
+        yield
+    finally:
+        stats.active.discard(name)
+        stats.add(name, ms=(time.time() - start) * 1000)
+
+
+def timed(name):
+    """Decorator recording each call to the function as `name`."""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kw):
+            with timing(name):
+                return f(*args, **kw)
+        return wrapper
+    return decorator
+
+
+class TimingCursor(object):
+    """Wraps a database cursor to record its queries."""
+
+    def __init__(self, cursor, name):
+        self.cursor = cursor
+        self.name = name
+
+    def execute(self, *args, **kw):
+        with timing(self.name):
+            return self.cursor.execute(*args, **kw)
+
+    def executemany(self, *args, **kw):
+        with timing(self.name):
+            return self.cursor.executemany(*args, **kw)
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+
+def _cursor(f):
+    @functools.wraps(f)
+    def wrapper(self, *args, **kw):
+        # multidb sends reads to one of the SLAVE_DATABASES.
+        role = 'slave' if self.alias in settings.SLAVE_DATABASES else 'master'
+        return TimingCursor(f(self, *args, **kw), 'sql.%s' % role)
+    return wrapper
+
+
+def _cache_get(f):
+    @functools.wraps(f)
+    def wrapper(self, key, *args, **kw):
+        stats = current()
+        if stats is None or 'cache.get' in stats.active:
+            return f(self, key, *args, **kw)
+        with timing('cache.get'):
+            value = f(self, key, *args, **kw)
+        if value is None:
+            stats.add('cache.miss')
+        return value
+    return wrapper
+
+
+def _cache_get_many(f):
+    @functools.wraps(f)
+    def wrapper(self, keys, *args, **kw):
+        stats = current()
+        if stats is None or 'cache.get' in stats.active:
+            return f(self, keys, *args, **kw)
+        keys = list(keys)
+        with timing('cache.get'):
+            values = f(self, keys, *args, **kw)
+        stats.add('cache.miss', len(keys) - len(values))
+        return values
+    return wrapper
+
+
+def _search(f):
+    @functools.wraps(f)
+    def wrapper(self, *args, **kw):
+        # Results are cached on the search after the first call.
+        if self._results_cache:
+            return f(self, *args, **kw)
+        with timing('search.es'):
+            return f(self, *args, **kw)
+    return wrapper
+
+
+def install():
+    """Wrap the layers we time. Only the first call does anything."""
+    with _install_lock:
+        if _installed:
+            return
+        _installed.append(True)
+
+    BaseDatabaseWrapper.cursor = _cursor(BaseDatabaseWrapper.cursor)
+
+    # cache-machine and memoize go through the same backend. Writes of any
+    # kind are counted as cache.set.
+    backend = type(cache)
+    backend.get = _cache_get(backend.get)
+    backend.get_many = _cache_get_many(backend.get_many)
+    for method in ('set', 'set_many', 'add', 'delete', 'delete_many'):
+        setattr(backend, method,
+                timed('cache.set')(getattr(backend, method)))
+
+    for cls in (amo.search.ES, amo.search.TempS):
+        cls._do_search = _search(cls._do_search)
+
+    jinja2.Template.render = timed('template')(jinja2.Template.render)
+
+
+def query_budget(view):
+    """The number of queries `view` may make, or None for no limit."""
+    return settings.PERF_QUERY_BUDGETS.get(view, settings.PERF_QUERY_BUDGET)
@@ -13,7 +13,7 @@ from addons.models import Addon
 from amo.decorators import set_task_user
 from applications.models import Application, AppVersion
 from bandwagon.models import Collection
-from devhub.models import ActivityLog, AppLog, LegacyAddonLog
+from devhub.models import AppLog, LegacyAddonLog
 from editors.models import EscalationQueue, EventLog
 from market.models import Refund
 from reviews.models import Review
@@ -59,13 +59,6 @@ def set_modified_on_object(obj, **kw):
                   (obj.__class__.__name__, obj.pk, e))
 
 
-@task
-def delete_logs(items, **kw):
-    log.info('[%s@%s] Deleting logs' % (len(items), delete_logs.rate_limit))
-    ActivityLog.objects.filter(pk__in=items).exclude(
-        action__in=amo.LOG_KEEP).delete()
-
-
 @task
 def delete_stale_contributions(items, **kw):
     log.info('[%s@%s] Deleting stale contributions' %
@@ -33,11 +33,13 @@ from waffle.models import Flag, Sample, Switch
 import addons.search
 import amo
 import amo.search
+from amo import perf
 import stats.search
 from access.models import Group, GroupUser
 from addons.models import Addon, AddonCategory, Category, Persona
 from addons.tasks import unindex_addons
 from amo.urlresolvers import get_url_prefix, Prefixer, reverse, set_url_prefix
+from amo.utils import local_cache
 from applications.models import Application, AppVersion
 from bandwagon.models import Collection
 from files.helpers import copyfileobj
@@ -263,6 +265,7 @@ class TestCase(RedisTest, test_utils.TestCase):
     def _pre_setup(self):
         super(TestCase, self)._pre_setup()
         cache.clear()
+        local_cache.clear()
 
     @contextmanager
     def activate(self, locale=None, app=None):
@@ -282,6 +285,18 @@ class TestCase(RedisTest, test_utils.TestCase):
         set_url_prefix(old_prefix)
         translation.activate(old_locale)
 
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        """
+        Asserts the block makes at most `budget` SQL queries, counted the
+        way amo.middleware.PerfMiddleware counts them.
+        """
+        with perf.collect() as stats:
+            yield stats
+        assert stats.queries <= budget, (
+            '%s queries, over the budget of %s: %s'
+            % (stats.queries, budget, stats.summary()))
+
     def assertNoFormErrors(self, response):
         """Asserts that no form in the context has errors.
 
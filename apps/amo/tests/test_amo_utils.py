@@ -1,19 +1,26 @@
 # -*- coding: utf-8 -*-
 import os
 import tempfile
+import time
 import unittest
 
 from django.conf import settings
+from django.contrib.auth.models import User
 from django.core.cache import cache
+from django.core.paginator import EmptyPage
 from django.core.validators import ValidationError
 from django.utils import translation
 
 import mock
 from nose.tools import eq_, assert_raises, raises
-
-from amo.utils import (cache_ns_key, escape_all, find_language,
-                       LocalFileStorage, no_translation, resize_image,
-                       rm_local_tmp_dir, slugify, slug_validator, to_language)
+from PIL import Image
+
+import amo.tests
+from amo.utils import (cache_ns_key, CachedCountPaginator, escape_all,
+                       estimate_count, find_language, local_cache, LocalCache,
+                       LocalFileStorage, memoize, memoize_key, no_translation,
+                       resize_image, resize_images, rm_local_tmp_dir, slugify,
+                       slug_validator, to_language)
 from product_details import product_details
 
 u = u'Ελληνικά'
@@ -71,6 +78,50 @@ def test_resize_transparency():
             os.remove(dest)
 
 
+class TestResizeImages(unittest.TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.src = os.path.join(settings.ROOT, 'apps', 'amo', 'tests',
+                                'images', 'transparent.png')
+        self.dests = [tempfile.mkstemp(dir=settings.TMP_PATH)[1]
+                      for i in range(2)]
+        for dest in self.dests:
+            self.addCleanup(os.remove, dest)
+
+    def resize(self):
+        return resize_images(self.src, zip(self.dests, [(32, 32), None]),
+                             remove_src=False, locally=True)
+
+    def test_decoded_once(self):
+        with mock.patch('amo.utils.Image.open', wraps=Image.open) as open_:
+            sizes = self.resize()
+        eq_(open_.call_count, 1)
+        eq_(sizes[0], (32, 32))
+        eq_(sizes, [Image.open(d).size for d in self.dests])
+
+    def test_same_as_resize_image(self):
+        self.resize()
+        expected = self.src.replace('.png', '-expected.png')
+        with open(self.dests[0]) as dfh:
+            with open(expected) as efh:
+                assert dfh.read() == efh.read()
+
+    def test_unchanged_source(self):
+        sizes = self.resize()
+        with mock.patch('amo.utils.Image.open') as open_:
+            eq_(self.resize(), sizes)
+        assert not open_.called
+
+    def test_missing_output(self):
+        self.resize()
+        os.remove(self.dests[1])
+        with mock.patch('amo.utils.Image.open', wraps=Image.open) as open_:
+            self.resize()
+        eq_(open_.call_count, 1)
+        assert os.path.exists(self.dests[1])
+
+
 def test_to_language():
     tests = (('en-us', 'en-US'),
              ('en_US', 'en-US'),
@@ -203,6 +254,7 @@ class TestCacheNamespaces(unittest.TestCase):
 
     def setUp(self):
         cache.clear()
+        local_cache.clear()
         self.namespace = 'redis-is-dead'
 
     @mock.patch('amo.utils.epoch')
@@ -225,6 +277,188 @@ class TestCacheNamespaces(unittest.TestCase):
         eq_(ns_key, expected)
         eq_(cache_ns_key(self.namespace), expected)
 
+    @mock.patch('amo.utils.epoch')
+    def test_local(self, epoch_mock):
+        epoch_mock.return_value = 123456
+        cache_ns_key(self.namespace)
+        with mock.patch('amo.utils.cache') as cache_mock:
+            eq_(cache_ns_key(self.namespace), '123456:ns:%s' % self.namespace)
+            assert not cache_mock.get.called
+
+    @mock.patch('amo.utils.epoch')
+    def test_local_expired(self, epoch_mock):
+        epoch_mock.return_value = 123456
+        cache_ns_key(self.namespace)
+        # Another process increments it and our copy expires.
+        cache.incr('ns:%s' % self.namespace)
+        local_cache.clear()
+        eq_(cache_ns_key(self.namespace), '123457:ns:%s' % self.namespace)
+
+
+class TestLocalCache(unittest.TestCase):
+
+    def test_expiry(self):
+        c = LocalCache(10)
+        c.set('a', 1, 60)
+        eq_(c.get('a'), 1)
+        with mock.patch('amo.utils.time.time') as time_mock:
+            time_mock.return_value = time.time() + 61
+            eq_(c.get('a'), None)
+
+    def test_lru(self):
+        c = LocalCache(2)
+        c.set('a', 1, 60)
+        c.set('b', 2, 60)
+        c.get('a')
+        c.set('c', 3, 60)
+        eq_(c.get('a'), 1)
+        eq_(c.get('b'), None)
+        eq_(c.get('c'), 3)
+
+
+class TestMemoize(unittest.TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.calls = []
+
+    def func(self, *args, **kw):
+        @memoize('test-memoize', **kw)
+        def f(x):
+            self.calls.append(x)
+            return x * 2
+        return f
+
+    def test_memoize(self):
+        f = self.func()
+        eq_(f(2), 4)
+        eq_(f(2), 4)
+        eq_(self.calls, [2])
+        eq_(cache.get(memoize_key('test-memoize', 2)), 4)
+
+    def test_local(self):
+        f = self.func(local=60)
+        eq_(f(2), 4)
+        cache.clear()
+        eq_(f(2), 4)
+        eq_(self.calls, [2])
+
+    def test_lock_fresh(self):
+        f = self.func(lock=True)
+        eq_(f(2), 4)
+        eq_(f(2), 4)
+        eq_(self.calls, [2])
+
+    def test_lock_stale(self):
+        f = self.func(lock=True)
+        f(2)
+        key = memoize_key('test-memoize', 2)
+        cache.set(key, cache.get(key)._replace(expires=0))
+        eq_(f(2), 4)
+        eq_(self.calls, [2, 2])
+        assert cache.get(key).expires > 0
+
+    @mock.patch('amo.utils.statsd')
+    def test_stat_name(self, statsd):
+        memoize('webapps:featured|home')(lambda: 1)()
+        statsd.incr.assert_called_with('memoize.webapps_featured_home.miss')
+
+    def test_lock_taken(self):
+        f = self.func(lock=True)
+        f(2)
+        key = memoize_key('test-memoize', 2)
+        cache.set(key, cache.get(key)._replace(expires=0))
+        cache.add(key + ':lock', 1)
+        # Someone else is recomputing it, we get the old value.
+        eq_(f(2), 4)
+        eq_(self.calls, [2])
+
+
+class TestCachedCountPaginator(amo.tests.TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            User.objects.create(username='user%s' % i)
+        self.qs = User.objects.order_by('id')
+
+    def test_count(self):
+        pager = CachedCountPaginator(self.qs, 2)
+        eq_(pager.count, 5)
+        eq_(pager.num_pages, 3)
+        assert not pager.count_is_estimate
+
+    def test_count_cached(self):
+        eq_(CachedCountPaginator(self.qs, 2).count, 5)
+        User.objects.create(username='another')
+        eq_(CachedCountPaginator(self.qs, 2).count, 5)
+        eq_(CachedCountPaginator(self.qs.all(), 3).count, 5)
+        # A different query is counted on its own.
+        eq_(CachedCountPaginator(self.qs.filter(id__gt=0), 2).count, 6)
+
+    def test_list(self):
+        eq_(CachedCountPaginator(range(5), 2).count, 5)
+
+    @mock.patch('amo.utils.estimate_count')
+    def test_under_estimate_threshold(self, estimate_count):
+        estimate_count.return_value = 5
+        pager = CachedCountPaginator(self.qs, 2, estimate_over=10)
+        eq_(pager.count, 5)
+        assert not pager.count_is_estimate
+
+    @mock.patch('amo.utils.estimate_count')
+    def test_estimate(self, estimate_count):
+        estimate_count.return_value = 4
+        pager = CachedCountPaginator(self.qs, 2, estimate_over=3)
+        eq_(pager.count, 4)
+        assert pager.count_is_estimate
+        # The estimate is short, but the page past it is still there.
+        eq_(len(pager.page(3).object_list), 1)
+        with self.assertRaises(EmptyPage):
+            pager.page(4)
+
+    @mock.patch('amo.utils.estimate_count')
+    def test_no_estimate(self, estimate_count):
+        estimate_count.return_value = None
+        pager = CachedCountPaginator(self.qs, 2, estimate_over=3)
+        eq_(pager.count, 5)
+        assert not pager.count_is_estimate
+
+
+class TestEstimateCount(amo.tests.TestCase):
+
+    def explain(self, **plan):
+        plan.setdefault('Extra', None)
+        with mock.patch('amo.utils.connections') as connections:
+            connection = connections.__getitem__.return_value
+            connection.vendor = 'mysql'
+            cursor = connection.cursor.return_value
+            cursor.description = [(k,) for k in plan]
+            cursor.fetchall.return_value = [plan.values()]
+            return estimate_count(User.objects.filter(username='a'))
+
+    def test_no_where(self):
+        eq_(self.explain(type='ALL', rows=1000), 1000)
+
+    def test_filtered(self):
+        eq_(self.explain(type='ALL', rows=1000, filtered=10.0,
+                         Extra='Using where'), 100)
+
+    def test_scan_with_where(self):
+        # Without `filtered`, `rows` is every row the scan reads.
+        eq_(self.explain(type='ALL', rows=1000, Extra='Using where'), None)
+        eq_(self.explain(type='ref', rows=1000, Extra='Using where'), None)
+
+    def test_range(self):
+        eq_(self.explain(type='range', rows=1000, Extra='Using where'), 1000)
+
+    def test_join(self):
+        with mock.patch('amo.utils.connections') as connections:
+            connection = connections.__getitem__.return_value
+            connection.vendor = 'mysql'
+            connection.cursor.return_value.fetchall.return_value = [(), ()]
+            eq_(estimate_count(User.objects.all()), None)
+
 
 def test_escape_all():
     x = '-'.join([u, u])
@@ -0,0 +1,107 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+
+import jingo
+import mock
+from nose.tools import eq_
+from test_utils import RequestFactory
+
+import amo.tests
+from amo import perf
+from amo.middleware import PerfMiddleware
+
+
+def view(request):
+    User.objects.count()
+    cache.get('perf-test')
+    return HttpResponse(jingo.env.from_string('{{ 1 }}').render())
+
+
+class TestCollect(amo.tests.TestCase):
+
+    def test_sql(self):
+        with perf.collect() as stats:
+            User.objects.count()
+        eq_(stats.counts['sql.master'], 1)
+        eq_(stats.queries, 1)
+        assert 'sql.master' in stats.times
+
+    def test_cache(self):
+        with perf.collect() as stats:
+            cache.set('perf-test', 1)
+            cache.get('perf-test')
+            cache.get('perf-test-missing')
+            cache.get_many(['perf-test', 'perf-test-missing'])
+        eq_(stats.counts['cache.set'], 1)
+        eq_(stats.counts['cache.get'], 3)
+        eq_(stats.counts['cache.miss'], 2)
+
+    def test_template(self):
+        with perf.collect() as stats:
+            jingo.env.from_string('{{ 1 }}').render()
+        eq_(stats.counts['template'], 1)
+
+    def test_nested(self):
+        with perf.collect() as outer:
+            User.objects.count()
+            with perf.collect() as inner:
+                User.objects.count()
+        eq_(inner.queries, 1)
+        eq_(outer.queries, 2)
+        eq_(perf.current(), None)
+
+    def test_not_collecting(self):
+        perf.install()
+        User.objects.count()
+        eq_(perf.current(), None)
+
+
+@mock.patch('amo.middleware.statsd')
+class TestPerfMiddleware(amo.tests.TestCase):
+
+    def request(self):
+        middleware = PerfMiddleware()
+        request = RequestFactory().get('/')
+        middleware.process_request(request)
+        middleware.process_view(request, view, (), {})
+        return request, middleware.process_response(request, view(request))
+
+    def test_stats(self, statsd):
+        request, response = self.request()
+        stats = request.perf_stats
+        eq_(stats.view, 'amo.tests.test_perf.view')
+        eq_(stats.queries, 1)
+        eq_(stats.counts['cache.miss'], 1)
+        eq_(perf.current(), None)
+        statsd.timing.assert_any_call(
+            'perf.amo.tests.test_perf.view.sql.master',
+            stats.times['sql.master'])
+        statsd.incr.assert_any_call(
+            'perf.amo.tests.test_perf.view.cache.miss.count', 1)
+        assert not request.over_query_budget
+
+    def test_over_budget(self, statsd):
+        with self.settings(PERF_QUERY_BUDGET=0):
+            request, response = self.request()
+        assert request.over_query_budget
+        statsd.incr.assert_any_call(
+            'perf.amo.tests.test_perf.view.over_budget')
+
+    def test_view_budget(self, statsd):
+        budgets = {'amo.tests.test_perf.view': 0}
+        with self.settings(PERF_QUERY_BUDGET=None, PERF_QUERY_BUDGETS=budgets):
+            request, response = self.request()
+        assert request.over_query_budget
+
+    def test_no_budget(self, statsd):
+        with self.settings(PERF_QUERY_BUDGET=None):
+            request, response = self.request()
+        assert not request.over_query_budget
+
+    def test_query_budget_helper(self, statsd):
+        with self.assertQueryBudget(1):
+            self.request()
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget(0):
+                self.request()
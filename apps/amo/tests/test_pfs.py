@@ -1,12 +1,20 @@
+import re
+
+import mock
+from nose.tools import eq_
+from  pyquery import PyQuery as pq
+
 import amo
 import amo.tests
+from services import pfs
 from services.pfs import get_output
 
-from  pyquery import PyQuery as pq
-
 
 class TestPfs(amo.tests.TestCase):
 
+    def setUp(self):
+        pfs._cache.clear()
+
     def test_xss(self):
         for k in ['name', 'mimetype', 'guid', 'version', 'iconUrl',
                   'InstallerLocation', 'InstallerHash', 'XPILocation',
@@ -14,3 +22,74 @@ class TestPfs(amo.tests.TestCase):
                   'licenseURL', 'needsRestart']:
             res = get_output({k: 'fooo<script>alert("foo")</script>;'})
             assert not pq(res)('script')
+
+    def test_exact_mimetypes_dont_match_regexes(self):
+        for mimetype in pfs.EXACT_RULES:
+            eq_([r for r in pfs.REGEX_RULES if r.mimetype_re.match(mimetype)],
+                [])
+
+    def get(self, **kw):
+        data = {'appID': '{ec8030f7-c20a-464f-9b0e-13a3a9e97384}',
+                'appVersion': '20130101', 'clientOS': 'Windows NT 6.1',
+                'chromeLocale': 'en-US'}
+        data.update(kw)
+        return get_output(data)
+
+    def field(self, output, name):
+        return re.search('<pfs:%s>(.*)</pfs:%s>' % (name, name),
+                         output).group(1)
+
+    def test_flash(self):
+        rdf = self.get(mimetype='application/x-shockwave-flash')
+        eq_(self.field(rdf, 'name'), 'Adobe Flash Player')
+        eq_(self.field(rdf, 'guid'),
+            '{4cfaef8a-a6c9-41a0-8e6f-967eb8f49143}')
+        rdf = self.get(mimetype='application/x-shockwave-flash',
+                       clientOS='Intel Mac OS X 10.8')
+        eq_(self.field(rdf, 'guid'), '-1')
+
+    def test_shockwave_locale(self):
+        rdf = self.get(mimetype='application/x-director')
+        eq_(self.field(rdf, 'licenseURL'),
+            'http://www.adobe.com/go/eula_shockwaveplayer')
+        rdf = self.get(mimetype='application/x-director',
+                       chromeLocale='ja-JP')
+        eq_(self.field(rdf, 'licenseURL'),
+            'http://www.adobe.com/go/eula_shockwaveplayer_jp')
+
+    def test_regex_rule(self):
+        rdf = self.get(mimetype='video/quicktime')
+        eq_(self.field(rdf, 'name'), 'Apple Quicktime')
+        rdf = self.get(mimetype='video/x-ms-wmv', clientOS='PPC Mac OS X')
+        eq_(self.field(rdf, 'name'), 'Flip4Mac')
+        # No fallback once the mimetype matched.
+        rdf = self.get(mimetype='video/x-ms-wmv', clientOS='Linux i686')
+        eq_(self.field(rdf, 'name'), '-1')
+
+    def test_falls_through_platforms(self):
+        rdf = self.get(mimetype='video/vnd.divx', clientOS='PPC Mac OS X')
+        eq_(self.field(rdf, 'XPILocation'),
+            'http://download.divx.com/player/DivXWebPlayerMac.xpi')
+
+    @mock.patch('services.pfs.render')
+    def test_cached(self, render):
+        render.return_value = 'rdf'
+        data = {'mimetype': 'application/pdf', 'appID': 'x',
+                'appVersion': '1', 'clientOS': 'Win', 'chromeLocale': 'de'}
+        eq_(get_output(data), 'rdf')
+        eq_(get_output(dict(data, appVersion='2', chromeLocale='fr')), 'rdf')
+        eq_(render.call_count, 1)
+        get_output(dict(data, chromeLocale='ja-JP'))
+        eq_(render.call_count, 2)
+
+    def test_conditional_get(self):
+        start_response = mock.Mock()
+        environ = {'QUERY_STRING': 'mimetype=application/pdf&appID=x&'
+                                   'appVersion=1&clientOS=Win&chromeLocale=de'}
+        body = pfs.application(environ, start_response)
+        headers = dict(start_response.call_args[0][1])
+        assert body[0]
+
+        environ['HTTP_IF_NONE_MATCH'] = headers['ETag']
+        eq_(pfs.application(environ, start_response), [])
+        eq_(start_response.call_args[0][0], '304 Not Modified')
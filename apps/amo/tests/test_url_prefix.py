@@ -1,6 +1,7 @@
 from django import test, shortcuts
 from django.conf import settings
-from django.core.urlresolvers import set_script_prefix
+from django.core.urlresolvers import (get_resolver, NoReverseMatch,
+                                      set_script_prefix)
 
 from nose.tools import eq_, assert_not_equal
 import test_utils
@@ -312,3 +313,51 @@ class TestShorter(amo.tests.TestCase):
         check('zh', 'zh-CN')
         with self.settings(LANGUAGE_URL_MAP={'en-us': 'en-US'}):
             check('zh', 'en-US')
+
+
+class TestFastReverse(amo.tests.TestCase):
+    # Values to try for URL parameters until Django accepts one.
+    samples = ['1', '12345', 'slug', 'en-US', 'a1b2c3d4', 'firefox', '1.0',
+               'abc-def', '2013-01-01', 'uuid-0000']
+
+    def setUp(self):
+        urlresolvers.clean_url_prefixes()
+
+    def check(self, name, **kw):
+        try:
+            expected = urlresolvers.django_reverse(name, **kw)
+        except NoReverseMatch:
+            with self.assertRaises(NoReverseMatch):
+                urlresolvers.fast_reverse(name, **kw)
+            return False
+        eq_(urlresolvers.fast_reverse(name, **kw), expected)
+        # Again, now that it's compiled.
+        eq_(urlresolvers.fast_reverse(name, **kw), expected)
+        return True
+
+    def test_all_named_urls(self):
+        resolver = get_resolver(None)
+        names = [k for k in resolver.reverse_dict.keys()
+                 if isinstance(k, basestring)]
+        assert names
+        for name in names:
+            for possibility, pattern, defaults in (
+                    resolver.reverse_dict.getlist(name)):
+                for result, params in possibility:
+                    for value in self.samples:
+                        args = [value] * len(params)
+                        kwargs = dict((p, value) for p in params)
+                        self.check(name, args=args or None)
+                        if self.check(name, kwargs=kwargs):
+                            break
+
+    def test_no_match(self):
+        assert not self.check('home', args=['nope'])
+        assert not self.check('not-a-url-name')
+
+    def test_kwargs(self):
+        self.check('home', kwargs={})
+
+    def test_prefix(self):
+        eq_(urlresolvers.fast_reverse('home', prefix='/oremj/'),
+            urlresolvers.django_reverse('home', prefix='/oremj/'))
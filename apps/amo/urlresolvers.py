@@ -1,18 +1,21 @@
 #-*- coding: utf-8 -*-
 import hashlib
 import hmac
+import re
 import urllib
+import weakref
 from threading import local
 from urlparse import urlparse, urlsplit, urlunsplit
 
 from django.conf import settings
 from django.core import urlresolvers
-from django.utils import encoding
-from django.utils.translation.trans_real import parse_accept_lang_header
+from django.utils import encoding, translation
+from django.utils.regex_helper import normalize
 
 import jinja2
 
 import amo
+from lib.misc.locales import LocaleNegotiator
 
 # Get a pointer to Django's reverse because we're going to hijack it after we
 # define our own.
@@ -59,7 +62,7 @@ def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None,
     # Blank out the script prefix since we add that in prefixer.fix().
     if prefixer:
         prefix = prefix or '/'
-    url = django_reverse(viewname, urlconf, args, kwargs, prefix, current_app)
+    url = fast_reverse(viewname, urlconf, args, kwargs, prefix, current_app)
     if prefixer and add_prefix:
         return prefixer.fix(url)
     else:
@@ -69,6 +72,89 @@ def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None,
 urlresolvers.reverse = reverse
 
 
+# URL templates built by _compile(), by resolver and then by
+# (viewname, language, prefix, number of args, kwarg names).
+_compiled = weakref.WeakKeyDictionary()
+
+
+def _compile(resolver, viewname, prefix, nargs, kwnames):
+    """
+    Return the (template, params, defaults, regex) tuples Django would try,
+    in order, to reverse `viewname` with `nargs` positional arguments or the
+    keyword arguments named in `kwnames`. Returns None if Django should
+    handle it.
+    """
+    prefix_norm, prefix_args = normalize(prefix)[0]
+    if prefix_args:
+        return None
+    try:
+        view = urlresolvers.get_callable(viewname, True)
+    except (ImportError, AttributeError):
+        return None
+
+    compiled = []
+    for possibility, pattern, defaults in resolver.reverse_dict.getlist(view):
+        regex = re.compile(u'^%s%s' % (prefix, pattern), re.UNICODE)
+        for result, params in possibility:
+            if kwnames is None:
+                if nargs != len(params):
+                    continue
+            elif set(kwnames) | set(defaults) != set(params) | set(defaults):
+                continue
+            compiled.append((prefix_norm + result, params, defaults, regex))
+    return compiled
+
+
+def fast_reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None,
+                 current_app=None):
+    """
+    Same as Django's reverse, but the URL patterns for each viewname and
+    arity are only looked up once, so most calls are a string substitution
+    and a regex match. Namespaced and callable views are passed to Django.
+    """
+    if (current_app or not isinstance(viewname, basestring) or
+        ':' in viewname or (args and kwargs)):
+        return django_reverse(viewname, urlconf, args, kwargs, prefix,
+                              current_app)
+
+    if urlconf is None:
+        urlconf = urlresolvers.get_urlconf()
+    resolver = urlresolvers.get_resolver(urlconf)
+    if prefix is None:
+        prefix = urlresolvers.get_script_prefix()
+    kwargs = kwargs or {}
+    if args:
+        nargs, kwnames = len(args), None
+    else:
+        nargs, kwnames = 0, tuple(sorted(kwargs))
+
+    key = (viewname, translation.get_language(), prefix, nargs, kwnames)
+    cache = _compiled.setdefault(resolver, {})
+    try:
+        compiled = cache[key]
+    except KeyError:
+        compiled = cache[key] = _compile(resolver, viewname, prefix, nargs,
+                                         kwnames)
+
+    if compiled:
+        if args:
+            values = [encoding.force_unicode(v) for v in args]
+        for template, params, defaults, regex in compiled:
+            if args:
+                candidate = template % dict(zip(params, values))
+            else:
+                if any(kwargs.get(k, v) != v for k, v in defaults.items()):
+                    continue
+                candidate = template % dict(
+                    (k, encoding.force_unicode(v)) for k, v in kwargs.items())
+            if regex.search(candidate):
+                return encoding.iri_to_uri(candidate)
+
+    # Nothing matched, let Django raise NoReverseMatch.
+    return django_reverse(viewname, urlconf, args, kwargs, prefix,
+                          current_app)
+
+
 class Prefixer(object):
 
     def __init__(self, request):
@@ -208,25 +294,12 @@ def url_fix(s, charset='utf-8'):
     return urlunsplit((scheme, netloc, path, qs, anchor))
 
 
+# Shared by everything that negotiates a locale from a request.
+locale_negotiator = LocaleNegotiator(settings)
+
+
 def lang_from_accept_header(header):
-    # Map all our lang codes and any prefixes to the locale code.
-    langs = dict((k.lower(), v) for k, v in settings.LANGUAGE_URL_MAP.items())
-
-    # If we have a lang or a prefix of the lang, return the locale code.
-    for lang, _ in parse_accept_lang_header(header.lower()):
-        if lang in langs:
-            return langs[lang]
-
-        prefix = lang.split('-')[0]
-        # Downgrade a longer prefix to a shorter one if needed (es-PE > es)
-        if prefix in langs:
-            return langs[prefix]
-        # Upgrade to a longer one, if present (zh > zh-CN)
-        lookup = settings.SHORTER_LANGUAGES.get(prefix, '').lower()
-        if lookup and lookup in langs:
-            return langs[lookup]
-
-    return settings.LANGUAGE_CODE
+    return locale_negotiator.from_header(header)
 
 
 def remora_url(url, lang=None, app=None, prefix=''):
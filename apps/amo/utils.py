@@ -7,11 +7,14 @@ import errno
 import functools
 import hashlib
 import itertools
+import multiprocessing
 import operator
 import os
 import random
 import re
 import shutil
+import StringIO
+import threading
 import time
 import unicodedata
 import urllib
@@ -29,6 +32,8 @@ from django.core.files.storage import (FileSystemStorage,
 from django.core.mail import EmailMessage, EmailMultiAlternatives
 from django.core.serializers import json
 from django.core.validators import validate_slug, ValidationError
+from django.db import connections
+from django.db.models.sql.datastructures import EmptyResultSet
 from django.forms.fields import Field
 from django.http import HttpRequest
 from django.template import Context, loader
@@ -118,16 +123,25 @@ def sorted_groupby(seq, key):
     return itertools.groupby(sorted(seq, key=key), key=key)
 
 
-def paginate(request, queryset, per_page=20, count=None):
+def paginate(request, queryset, per_page=20, count=None, cache_count=False):
     """
     Get a Paginator, abstracting some common paging actions.
 
     If you pass ``count``, that value will be used instead of calling
     ``.count()`` on the queryset.  This can be good if the queryset would
     produce an expensive count query.
+
+    With ``cache_count`` the count comes from a CachedCountPaginator, so it
+    may be a little stale, or an estimate for very large listings.
     """
-    p = (ESPaginator if isinstance(queryset, (amo.search.ES, elasticutils.S))
-         else paginator.Paginator)(queryset, per_page)
+    if isinstance(queryset, (amo.search.ES, elasticutils.S)):
+        p = ESPaginator(queryset, per_page)
+    elif cache_count:
+        p = CachedCountPaginator(
+            queryset, per_page,
+            estimate_over=settings.ESTIMATED_COUNT_THRESHOLD)
+    else:
+        p = paginator.Paginator(queryset, per_page)
 
     if count is not None:
         p._count = count
@@ -502,24 +516,98 @@ def resize_image(src, dst, size=None, remove_src=True, locally=False):
     with local files it's up to you to ensure that all directories
     exist leading up to the dst filename.
     """
-    if src == dst:
-        raise Exception("src and dst can't be the same: %s" % src)
+    return resize_images(src, [(dst, size)], remove_src=remove_src,
+                         locally=locally)[0]
+
+
+def _image_op_name(size):
+    if callable(size):
+        return '%s.%s' % (size.__module__, size.__name__)
+    return repr(tuple(size) if size else None)
+
+
+def resize_images(src, outputs, remove_src=True, locally=False, mode='RGBA'):
+    """
+    Decodes the image at src once and saves a PNG to every (dst, size) in
+    outputs. Returns the width and height of each output, in order.
+
+    size is None to keep the image as it is, a (width, height) to scale and
+    crop to, or a module level function taking and returning a PIL image.
+    The decoded image is converted to `mode` first, unless that's None.
 
+    Outputs last written from the same source bytes with the same size are
+    left alone, so re-processing an unchanged upload does no image work.
+    src and dst are as for resize_image.
+    """
     open_ = open if locally else storage.open
     delete = os.unlink if locally else storage.delete
+    exists = os.path.exists if locally else storage.exists
+
+    for dst, size in outputs:
+        if src == dst:
+            raise Exception("src and dst can't be the same: %s" % src)
 
     with open_(src, 'rb') as fp:
-        im = Image.open(fp)
-        im = im.convert('RGBA')
-        if size:
-            im = processors.scale_and_crop(im, size)
-    with open_(dst, 'wb') as fp:
-        im.save(fp, 'png')
+        data = fp.read()
+    src_hash = hashlib.sha1(data).hexdigest()
+
+    im, sizes = None, []
+    for dst, size in outputs:
+        key = 'image-source:%s' % hashlib.md5(smart_str(dst)).hexdigest()
+        source = '%s:%s:%s' % (src_hash, mode, _image_op_name(size))
+        cached = cache.get(key)
+        if cached and cached[0] == source and exists(dst):
+            sizes.append(cached[1])
+            continue
+
+        if im is None:
+            im = Image.open(StringIO.StringIO(data))
+            if mode:
+                im = im.convert(mode)
+            else:
+                im.load()
+        if callable(size):
+            out = size(im)
+        elif size:
+            out = processors.scale_and_crop(im, size)
+        else:
+            out = im
+        with open_(dst, 'wb') as fp:
+            out.save(fp, 'png')
+        cache.set(key, (source, out.size),
+                  settings.IMAGE_SOURCE_CACHE_TIMEOUT)
+        sizes.append(out.size)
 
     if remove_src:
         delete(src)
 
-    return im.size
+    return sizes
+
+
+def _resize_images(args):
+    src, outputs, kw = args
+    return resize_images(src, outputs, **kw)
+
+
+def _close_cache():
+    # Don't share the parent's cache connections with the pool processes.
+    if hasattr(cache, 'close'):
+        cache.close()
+
+
+def resize_many(jobs, processes=None, **kw):
+    """
+    Runs resize_images(src, outputs, **kw) for every (src, outputs) in jobs
+    over a pool of `processes` processes, one per CPU by default. Returns
+    the sizes from each, in order.
+    """
+    pool = multiprocessing.Pool(processes, initializer=_close_cache)
+    try:
+        return pool.map(_resize_images,
+                        [(src, outputs, kw) for src, outputs in jobs])
+    finally:
+        pool.close()
+        pool.join()
 
 
 def remove_icons(destination):
@@ -650,25 +738,126 @@ def memoize_key(prefix, *args, **kwargs):
                                  prefix, key.hexdigest())
 
 
+class LocalCache(object):
+    """
+    A small per-process LRU cache with expiry, kept in front of memcache for
+    values that are read far more often than they change.
+
+    Nothing clears entries in other processes, so only put things here that
+    can be stale for `timeout` seconds.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires = self._data.pop(key)
+            except KeyError:
+                return default
+            if expires < time.time():
+                return default
+            # Move it to the end, the most recently used.
+            self._data[key] = (value, expires)
+            return value
+
+    def set(self, key, value, timeout):
+        if timeout <= 0 or not self.size:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, time.time() + timeout)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalCache(settings.LOCAL_CACHE_SIZE)
+
+# A memoize(lock=True) value stored with the time it should be recomputed.
+Expiring = collections.namedtuple('Expiring', 'value expires')
+
+
 def memoize_get(prefix, *args, **kwargs):
     """Returns the content of the cache given the key."""
-    return cache.get(memoize_key(prefix, *args, **kwargs))
+    data = cache.get(memoize_key(prefix, *args, **kwargs))
+    if isinstance(data, Expiring):
+        return data.value
+    return data
+
 
+def _now():
+    # `memoize` has a `time` argument.
+    return time.time()
 
-def memoize(prefix, time=60):
+
+def memoize(prefix, time=60, local=0, lock=False):
     """
     A simple memoize that caches into memcache, using a simple
     key based on stringing args and kwargs. Keep args simple.
+
+    `local` also keeps results in this process for that many seconds. Other
+    processes won't notice a `cache.delete(memoize_key(...))` until their
+    copy expires, so don't use it for data that gets invalidated that way.
+
+    `lock` is for expensive functions: once the result expires, the first
+    caller recomputes it while the others keep getting the old value for up
+    to another `time` seconds, instead of all of them recomputing at once.
+
+    Hits, misses and the time taken to compute results are sent to statsd as
+    `memoize.<prefix>.*`, with anything but word characters, dots and dashes
+    in the prefix replaced by underscores.
     """
+    # Colons and pipes would break the statsd line protocol.
+    stat = 'memoize.%s' % re.sub(r'[^\w.-]', '_', prefix)
+
+    def compute(func, key, args, kwargs):
+        with statsd.timer(stat):
+            data = func(*args, **kwargs)
+        if lock and time:
+            cache.set(key, Expiring(data, _now() + time), time * 2)
+        else:
+            cache.set(key, data, time)
+        return data
+
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             key = memoize_key(prefix, *args, **kwargs)
+            if local:
+                data = local_cache.get(key)
+                if data is not None:
+                    statsd.incr('%s.local' % stat)
+                    return data
+
             data = cache.get(key)
-            if data is not None:
-                return data
-            data = func(*args, **kwargs)
-            cache.set(key, data, time)
+            if data is None:
+                statsd.incr('%s.miss' % stat)
+                data = compute(func, key, args, kwargs)
+            elif not isinstance(data, Expiring):
+                statsd.incr('%s.hit' % stat)
+            elif (data.expires < _now() and
+                  cache.add(key + ':lock', 1, settings.MEMOIZE_LOCK_TIMEOUT)):
+                statsd.incr('%s.refresh' % stat)
+                try:
+                    data = compute(func, key, args, kwargs)
+                finally:
+                    cache.delete(key + ':lock')
+            else:
+                statsd.incr('%s.hit' % stat)
+                data = data.value
+            if local:
+                local_cache.set(key, data, local)
             return data
         return wrapper
     return decorator
@@ -683,6 +872,11 @@ def cache_ns_key(namespace, increment=False):
     "%(key)s_namespace" value. Invalidating the namespace simply requires
     editing that key. Your application will no longer request the old keys,
     and they will eventually fall off the end of the LRU and be reclaimed.
+
+    The namespace value is also kept in `local_cache` for
+    CACHE_NS_LOCAL_TIMEOUT seconds to save a memcache round trip on every
+    call, so other processes may use the old namespace for that long after
+    an increment.
     """
     ns_key = 'ns:%s' % namespace
     if increment:
@@ -693,10 +887,13 @@ def cache_ns_key(namespace, increment=False):
             ns_val = epoch(datetime.datetime.now())
             cache.set(ns_key, ns_val, 0)
     else:
-        ns_val = cache.get(ns_key)
+        ns_val = local_cache.get(ns_key)
+        if ns_val is None:
+            ns_val = cache.get(ns_key)
         if ns_val is None:
             ns_val = epoch(datetime.datetime.now())
             cache.set(ns_key, ns_val, 0)
+    local_cache.set(ns_key, ns_val, settings.CACHE_NS_LOCAL_TIMEOUT)
     return '%s:%s' % (ns_val, ns_key)
 
 
@@ -825,6 +1022,109 @@ class ESPaginator(paginator.Paginator):
         return page
 
 
+def estimate_count(qs):
+    """
+    MySQL's estimate of the number of rows `qs` matches, from EXPLAIN, or
+    None if it can't give one: on other databases, or when `qs` joins
+    tables, since then the estimates of each table don't add up to anything.
+
+    EXPLAIN's `rows` is the number of rows MySQL expects to examine, not to
+    return. Where EXPLAIN has a `filtered` column, the estimate is scaled by
+    it. Without one, only index range scans and queries with no WHERE left
+    to apply once the rows are read are estimated.
+    """
+    connection = connections[qs.db]
+    if connection.vendor != 'mysql':
+        return None
+    try:
+        sql, params = qs.query.get_compiler(qs.db).as_sql()
+    except EmptyResultSet:
+        return 0
+    cursor = connection.cursor()
+    cursor.execute('EXPLAIN ' + sql, params)
+    rows = cursor.fetchall()
+    if len(rows) != 1:
+        return None
+    plan = dict(zip([c[0] for c in cursor.description], rows[0]))
+    estimate = float(plan['rows'] or 0)
+    if plan.get('filtered') is not None:
+        estimate *= float(plan['filtered']) / 100
+    elif (plan['type'] != 'range' and
+          'Using where' in (plan['Extra'] or '')):
+        return None
+    return int(estimate)
+
+
+def cached_count(qs, estimate_over=None):
+    """
+    Returns (count, is_estimate) for the queryset `qs`, cached for
+    CACHE_COUNT_TIMEOUT seconds.
+
+    If `estimate_over` is given and the database estimates at least that
+    many rows, the estimate is used rather than counting them.
+    """
+    try:
+        sql, params = qs.query.get_compiler(qs.db).as_sql()
+    except EmptyResultSet:
+        return 0, False
+    key = 'count:%s' % hashlib.md5(
+        smart_str(u'%s:%s:%r' % (qs.db, sql, params))).hexdigest()
+    result = cache.get(key)
+    if result is None:
+        estimate = None
+        if estimate_over is not None:
+            estimate = estimate_count(qs)
+        if estimate is not None and estimate >= estimate_over:
+            result = (estimate, True)
+        else:
+            result = (qs.count(), False)
+        cache.set(key, result, settings.CACHE_COUNT_TIMEOUT)
+    return result
+
+
+class CachedCountPaginator(paginator.Paginator):
+    """
+    A Paginator for large querysets, where counting the rows can cost more
+    than fetching the page. The count is cached briefly and, past
+    `estimate_over` rows, estimated; `count_is_estimate` says which.
+    """
+
+    def __init__(self, object_list, per_page, estimate_over=None, **kw):
+        super(CachedCountPaginator, self).__init__(object_list, per_page,
+                                                   **kw)
+        self.estimate_over = estimate_over
+        self.count_is_estimate = False
+
+    def _get_count(self):
+        if self._count is None:
+            if hasattr(self.object_list, 'query'):
+                self._count, self.count_is_estimate = cached_count(
+                    self.object_list, self.estimate_over)
+            else:
+                self._count = len(self.object_list)
+        return self._count
+    count = property(_get_count)
+
+    def page(self, number):
+        self.count  # Find out whether it's an estimate.
+        if not self.count_is_estimate:
+            return super(CachedCountPaginator, self).page(number)
+        # An estimate may be short, so pages past it are fetched anyway and
+        # only turned away when they come back empty.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise paginator.PageNotAnInteger('That page number is not an '
+                                             'integer')
+        if number < 1:
+            raise paginator.EmptyPage('That page number is less than 1')
+        bottom = (number - 1) * self.per_page
+        objects = self.object_list[bottom:bottom + self.per_page]
+        if number > 1 and not objects:
+            raise paginator.EmptyPage('That page contains no results')
+        return paginator.Page(objects, number, self)
+
+
 def smart_path(string):
     """Returns a string you can pass to path.path safely."""
     if os.path.supports_unicode_filenames:
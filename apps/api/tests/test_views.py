@@ -4,6 +4,7 @@ from decimal import Decimal
 from textwrap import dedent
 
 from django.conf import settings
+from django.core.cache import cache
 from django.test.client import Client
 from django.utils import translation
 
@@ -23,7 +24,7 @@ from amo.urlresolvers import reverse
 from amo.views import handler500
 import api
 from api.views import addon_filter
-from api.utils import addon_to_dict
+from api.utils import addon_to_dict, addons_to_dicts, clear_addon_dicts
 from applications.models import Application, AppVersion
 from bandwagon.models import Collection, CollectionAddon, FeaturedCollection
 from files.models import File, Platform
@@ -88,6 +89,47 @@ class UtilsTest(TestCase):
         d = addon_to_dict(self.a)
         assert 'contribution' not in d
 
+    @patch('api.utils.addon_to_dict')
+    def test_dicts_cached(self, addon_to_dict):
+        addon_to_dict.return_value = {'id': 3615}
+        eq_(addons_to_dicts([self.a]), [{'id': 3615}])
+        eq_(addons_to_dicts([self.a]), [{'id': 3615}])
+        eq_(addon_to_dict.call_count, 1)
+
+        # Different variants are cached separately.
+        addons_to_dicts([self.a], disco=True, src='discovery-personalrec')
+        eq_(addon_to_dict.call_count, 2)
+        with self.activate(locale='fr'):
+            addons_to_dicts([self.a])
+        eq_(addon_to_dict.call_count, 3)
+
+    @patch('api.utils.addon_to_dict')
+    def test_clear_addon_dicts(self, addon_to_dict):
+        addon_to_dict.return_value = {'id': 3615}
+        addons_to_dicts([self.a])
+        clear_addon_dicts(self.a.id)
+        addons_to_dicts([self.a])
+        eq_(addon_to_dict.call_count, 2)
+
+    def test_dicts_one_round_trip(self):
+        addons = list(Addon.objects.all())
+        addons_to_dicts(addons)
+        with patch.object(cache, 'get_many', wraps=cache.get_many) as get:
+            addons_to_dicts(addons)
+        # The namespaces, then the dicts.
+        eq_(get.call_count, 2)
+
+    def test_dicts_cleared(self):
+        eq_(addons_to_dicts([self.a])[0]['name'], unicode(self.a.name))
+        self.a.update(name='Updated name')
+        eq_(addons_to_dicts([self.a])[0]['name'], 'Updated name')
+
+    def test_dicts_cleared_by_version(self):
+        version = self.a.current_version
+        eq_(addons_to_dicts([self.a])[0]['version'], version.version)
+        version.update(version='99.9')
+        eq_(addons_to_dicts([self.a])[0]['version'], '99.9')
+
 
 class No500ErrorsTest(TestCase):
     """
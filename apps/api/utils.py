@@ -1,12 +1,15 @@
+import datetime
 import re
 
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
 from django.utils.html import strip_tags
 
 import amo
 from amo.helpers import absolutify
-from amo.urlresolvers import reverse
-from amo.utils import urlparams, epoch
+from amo.urlresolvers import get_url_prefix, reverse
+from amo.utils import cache_ns_key, epoch, urlparams
 from addons.models import Category
 from tags.models import Tag
 from versions.compare import version_int
@@ -85,6 +88,56 @@ def addon_to_dict(addon, disco=False, src='api'):
     return d
 
 
+def addon_dict_namespaces(addons):
+    """
+    The cache_ns_key() of the dicts of each of `addons`, fetched with one
+    get_many instead of a round trip per add-on.
+    """
+    ns_keys = ['ns:addon-dict:%s' % addon.id for addon in addons]
+    values = cache.get_many(ns_keys)
+    missing = dict((key, epoch(datetime.datetime.now()))
+                   for key in ns_keys if key not in values)
+    if missing:
+        cache.set_many(missing, 0)
+        values.update(missing)
+    return ['%s:%s' % (values[key], key) for key in ns_keys]
+
+
+def addon_dict_key(namespace, lang, app, disco, src):
+    return '%s:%s:%s:%s:%s' % (namespace, lang.lower(), app, int(disco), src)
+
+
+def addons_to_dicts(addons, disco=False, src='api'):
+    """
+    Like calling addon_to_dict() on each of `addons`, but the dicts are
+    cached for ADDON_DICT_CACHE_TIMEOUT seconds and fetched with a single
+    get_many. They depend on the current locale and app too.
+
+    Saving an add-on or its versions, previews or authors clears them, see
+    addons.models.clear_api_dicts.
+    """
+    prefixer = get_url_prefix()
+    app = getattr(prefixer, 'app', None) or ''
+    lang = translation.get_language()
+    keys = [addon_dict_key(ns, lang, app, disco, src)
+            for ns in addon_dict_namespaces(addons)]
+    cached = cache.get_many(keys)
+
+    rv, missing = [], {}
+    for addon, key in zip(addons, keys):
+        if key not in cached:
+            cached[key] = missing[key] = addon_to_dict(addon, disco, src)
+        rv.append(cached[key])
+    if missing:
+        cache.set_many(missing, settings.ADDON_DICT_CACHE_TIMEOUT)
+    return rv
+
+
+def clear_addon_dicts(addon_id):
+    """Clear the cached addons_to_dicts() output for the add-on `addon_id`."""
+    cache_ns_key('addon-dict:%s' % addon_id, increment=True)
+
+
 def extract_from_query(term, filter, regexp, end_of_word_boundary=True):
     """
     This pulls out a keyword filter from a search term and returns the value
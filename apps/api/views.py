@@ -31,7 +31,7 @@ from amo.urlresolvers import get_url_prefix
 from amo.utils import JSONEncoder
 from api.authentication import AMOOAuthAuthentication
 from api.forms import PerformanceForm
-from api.utils import addon_to_dict, extract_filters
+from api.utils import addons_to_dicts, extract_filters
 from perf.models import (Performance, PerformanceAppVersions,
                          PerformanceOSVersion)
 from search.views import (name_query, _build_suggestions,
@@ -266,7 +266,8 @@ class AddonDetailView(APIView):
         return self.render('api/addon_detail.xml', {'addon': addon})
 
     def render_json(self, context):
-        return json.dumps(addon_to_dict(context['addon']), cls=JSONEncoder)
+        return json.dumps(addons_to_dicts([context['addon']])[0],
+                          cls=JSONEncoder)
 
 
 def guid_search(request, api_version, guids):
@@ -451,7 +452,7 @@ class ListView(APIView):
                            {'addons': addon_filter(addons, *args)})
 
     def render_json(self, context):
-        return json.dumps([addon_to_dict(a) for a in context['addons']],
+        return json.dumps(addons_to_dicts(list(context['addons'])),
                           cls=JSONEncoder)
 
 
@@ -21,7 +21,7 @@ from amo.utils import paginate, redirect_for_login, urlparams
 from access import acl
 from addons.models import Addon
 from addons.views import BaseFilter
-from api.utils import addon_to_dict
+from api.utils import addons_to_dicts
 from tags.models import Tag
 from translations.query import order_by_translation
 from users.models import UserProfile
@@ -226,7 +226,7 @@ def collection_detail_json(request, username, slug):
     if not (c.listed or acl.check_collection_ownership(request, c)):
         raise PermissionDenied
     # We evaluate the QuerySet with `list` to work around bug 866454.
-    addons_dict = [addon_to_dict(a) for a in list(c.addons.valid())]
+    addons_dict = addons_to_dicts(list(c.addons.valid()))
     return {
         'name': c.name,
         'url': c.get_abs_url(),
@@ -15,7 +15,7 @@ import jingo
 
 from amo.utils import sorted_groupby
 from amo.tasks import flush_front_end_cache_urls
-from versions.compare import version_int
+from versions.compare import version_int, version_ints
 from .models import (BlocklistApp, BlocklistCA, BlocklistDetail, BlocklistGfx,
                      BlocklistItem, BlocklistPlugin)
 
@@ -113,13 +113,13 @@ def get_plugins(apiver, app, appver=None):
                               'app_min': 'blapps.min',
                               'app_max': 'blapps.max'}))
     if apiver < 3 and appver is not None:
-        def between(ver, min, max):
-            if not (min and max):
-                return True
-            return version_int(min) < ver < version_int(max)
+        plugins = list(plugins)
         app_version = version_int(appver)
-        plugins = [p for p in plugins if between(app_version, p.app_min,
-                                                 p.app_max)]
+        mins = version_ints(p.app_min for p in plugins)
+        maxes = version_ints(p.app_max for p in plugins)
+        plugins = [p for p, min, max in zip(plugins, mins, maxes)
+                   if not (p.app_min and p.app_max) or
+                   min < app_version < max]
     return list(plugins)
 
 
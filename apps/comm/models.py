@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from django.db import models
+from django.db.models import F
 
 from uuidfield.fields import UUIDField
 
@@ -26,6 +27,10 @@ class CommunicationThread(CommunicationPermissionModel):
     addon = models.ForeignKey('addons.Addon', related_name='threads')
     version = models.ForeignKey('versions.Version', related_name='threads',
                                 null=True)
+    # Kept up to date as notes are written, so thread listings don't have to
+    # look at the notes.
+    notes_count = models.PositiveIntegerField(default=0)
+    last_activity = models.DateTimeField(null=True)
 
     class Meta:
         db_table = 'comm_threads'
@@ -56,9 +61,19 @@ class CommunicationNote(CommunicationPermissionModel):
         db_table = 'comm_thread_notes'
 
     def save(self, *args, **kwargs):
+        creating = not self.pk
         super(CommunicationNote, self).save(*args, **kwargs)
-        self.thread.modified = self.created
-        self.thread.save()
+        # A single UPDATE, so notes written at the same time don't lose each
+        # other's count.
+        updates = {'modified': self.created, 'last_activity': self.created}
+        if creating:
+            updates['notes_count'] = F('notes_count') + 1
+        (CommunicationThread.objects.filter(pk=self.thread_id)
+                                    .update(**updates))
+        thread = self.thread
+        thread.modified = thread.last_activity = self.created
+        if creating:
+            thread.notes_count += 1
 
 
 class CommunicationNoteRead(models.Model):
@@ -92,5 +107,14 @@ class CommunicationThreadToken(amo.models.ModelBase):
         self.uuid = UUIDField()._create_uuid().hex
 
 
+def update_notes_count(sender, instance, **kw):
+    (CommunicationThread.objects
+     .filter(pk=instance.thread_id, notes_count__gt=0)
+     .update(notes_count=F('notes_count') - 1))
+
+
 models.signals.pre_save.connect(save_signal, sender=CommunicationNote,
                                 dispatch_uid='comm_thread_notes_translations')
+models.signals.post_delete.connect(update_notes_count,
+                                   sender=CommunicationNote,
+                                   dispatch_uid='comm_thread_notes_count')
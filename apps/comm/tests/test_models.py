@@ -1,8 +1,11 @@
 from datetime import datetime
 
+from nose.tools import eq_
+
 from addons.models import Addon
 from amo.tests import TestCase
-from comm.models import CommunicationThread, CommunicationThreadToken
+from comm.models import (CommunicationNote, CommunicationThread,
+                         CommunicationThreadToken)
 from mkt.constants import comm as const
 from users.models import UserProfile
 
@@ -57,3 +60,41 @@ class TestThreadTokenModel(TestCase):
         self.token.reset_uuid()
         assert self.token.uuid
         assert uuid != self.token.uuid
+
+
+class TestThreadNotesCount(TestCase):
+    fixtures = ['base/addon_3615', 'base/user_999']
+
+    def setUp(self):
+        self.thread = CommunicationThread.objects.create(
+            addon=Addon.objects.get(pk=3615))
+        self.user = UserProfile.objects.all()[0]
+
+    def add_note(self):
+        return CommunicationNote.objects.create(thread=self.thread,
+            author=self.user, note_type=const.NO_ACTION, body='hi')
+
+    def reload(self):
+        return CommunicationThread.objects.no_cache().get(pk=self.thread.pk)
+
+    def test_create(self):
+        eq_(self.thread.notes_count, 0)
+        eq_(self.thread.last_activity, None)
+        self.add_note()
+        note = self.add_note()
+        thread = self.reload()
+        eq_(thread.notes_count, 2)
+        eq_(thread.last_activity,
+            CommunicationNote.objects.no_cache().get(pk=note.pk).created)
+
+    def test_resave_does_not_count(self):
+        note = self.add_note()
+        note.body = 'edited'
+        note.save()
+        eq_(self.reload().notes_count, 1)
+
+    def test_delete(self):
+        note = self.add_note()
+        self.add_note()
+        note.delete()
+        eq_(self.reload().notes_count, 1)
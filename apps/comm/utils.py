@@ -1,6 +1,9 @@
+from collections import defaultdict
 from email import message_from_string
 from email.utils import parseaddr
 
+from django.db import connections, router
+
 import commonware.log
 from email_reply_parser import EmailReplyParser
 import waffle
@@ -156,6 +159,45 @@ def filter_notes_by_read_status(queryset, profile, read_status=True):
         return queryset.exclude(pk__in=notes) if notes else queryset.all()
 
 
+def attach_recent_notes(threads, profile, limit=comm.RECENT_NOTES):
+    """
+    Attach the latest `limit` notes of each thread as `recent_notes_list`,
+    each with `is_read` set for `profile`, in three queries however many
+    threads there are.
+    """
+    threads = list(threads)
+    recent = defaultdict(list)
+    thread_ids = set(t.id for t in threads)
+    if thread_ids and limit:
+        # One LIMIT per thread, so a thread with thousands of notes only
+        # reads `limit` of them off the (thread_id, created) index.
+        select = ('(SELECT id, thread_id, created FROM %s '
+                  'WHERE thread_id = %%s ORDER BY created DESC, id DESC '
+                  'LIMIT %d)' % (CommunicationNote._meta.db_table, limit))
+        cursor = connections[router.db_for_read(CommunicationNote)].cursor()
+        cursor.execute(' UNION ALL '.join([select] * len(thread_ids)),
+                       list(thread_ids))
+        rows = sorted(cursor.fetchall(), key=lambda r: (r[2], r[0]),
+                      reverse=True)
+        for note_id, thread_id, created in rows:
+            recent[thread_id].append(note_id)
+
+    ids = [pk for pks in recent.values() for pk in pks]
+    notes, read = {}, set()
+    if ids:
+        notes = dict((n.id, n) for n in CommunicationNote.objects.no_cache()
+                     .filter(id__in=ids).select_related('author'))
+        read = set(CommunicationNoteRead.objects
+                   .filter(user=profile, note__in=ids)
+                   .values_list('note', flat=True))
+    for note in notes.values():
+        note.is_read = note.id in read
+    for thread in threads:
+        thread.recent_notes_list = [notes[pk] for pk in recent[thread.id]
+                                    if pk in notes]
+    return threads
+
+
 def get_reply_token(thread, user_id):
     tok, created = CommunicationThreadToken.objects.get_or_create(
         thread=thread, user_id=user_id)
@@ -11,7 +11,7 @@ import amo.utils
 from addons.models import Addon
 from search.utils import floor_version
 from stats.models import UpdateCount
-from versions.compare import version_int as vint
+from versions.compare import version_int as vint, version_ints
 from lib.es.utils import get_indices
 
 from .models import AppCompat, CompatReport, CompatTotals
@@ -27,6 +27,10 @@ def compatibility_report(index=None, aliased=True):
     # Gather all the data for the index.
     for app in amo.APP_USAGE:
         versions = [c for c in amo.COMPAT if c['app'] == app.id]
+        # (previous, main, main version) for finding a report's version.
+        ranges = zip(version_ints(v['previous'] for v in versions),
+                     version_ints(v['main'] for v in versions),
+                     [v['main'] for v in versions])
 
         log.info(u'Making compat report for %s.' % app.pretty)
         latest = UpdateCount.objects.aggregate(d=Max('date'))['d']
@@ -70,8 +74,8 @@ def compatibility_report(index=None, aliased=True):
                            .annotate(Count('id')))
                 for ver, works_properly, cnt in reports:
                     ver = vint(floor_version(ver))
-                    major = [v['main'] for v in versions
-                             if vint(v['previous']) < ver <= vint(v['main'])]
+                    major = [main for previous, main_int, main in ranges
+                             if previous < ver <= main_int]
                     if major:
                         w = doc['works'][app.id][vint(major[0])]
                         # Tally number of success and failure reports.
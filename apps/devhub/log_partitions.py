@@ -0,0 +1,179 @@
+"""
+The activity log and the tables indexing it are partitioned by month, so
+expired entries are dropped a month at a time instead of being deleted row
+by row. Entries with a `keep` action go in a partition of their own that
+never expires:
+
+    PARTITION BY RANGE COLUMNS(keep, created) (
+        PARTITION p201309 VALUES LESS THAN (0, '2013-10-01'),
+        PARTITION p201310 VALUES LESS THAN (0, '2013-11-01'),
+        PARTITION pfuture VALUES LESS THAN (0, MAXVALUE),
+        PARTITION pkeep VALUES LESS THAN (MAXVALUE, MAXVALUE))
+
+Partitions are made MONTHS_AHEAD of time so pfuture stays empty and
+splitting it is cheap. `manage.py partition_activity_log` moves existing
+tables over. Where they aren't partitioned, like in tests, expire_logs
+deletes expired entries a batch at a time instead.
+"""
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+
+import commonware.log
+
+import amo
+from devhub.models import (ActivityLog, ActivityLogAttachment, AddonLog,
+                           AppLog, CommentLog, GroupLog, UserLog, VersionLog)
+
+log = commonware.log.getLogger('z.devhub')
+
+MONTHS_AHEAD = 2
+DELETE_BATCH = 10000
+MONTH_RE = re.compile(r'^p(\d{4})(\d{2})$')
+
+
+class LogTables(object):
+    """Names of the activity log tables, optionally with a prefix."""
+
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+        self.log = prefix + ActivityLog._meta.db_table
+        self.indexes = [prefix + m._meta.db_table for m in
+                        (AddonLog, AppLog, CommentLog, GroupLog, UserLog,
+                         VersionLog)]
+        # Only the Marketplace has attachments.
+        self.attachments = None
+        if settings.MARKETPLACE:
+            self.attachments = (prefix +
+                                ActivityLogAttachment._meta.db_table)
+
+    @property
+    def partitioned(self):
+        """The tables that are partitioned, the log first."""
+        return [self.log] + self.indexes
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, months):
+    month = month.month - 1 + months + month.year * 12
+    return date(month / 12, month % 12 + 1, 1)
+
+
+def partition(month):
+    return ('PARTITION p%s VALUES LESS THAN (0, %r)' %
+            (month.strftime('%Y%m'), add_months(month, 1).isoformat()))
+
+
+def partition_clause(first, last):
+    """PARTITION BY for months `first` to `last`, plus pfuture and pkeep."""
+    parts, month = [], first
+    while month <= last:
+        parts.append(partition(month))
+        month = add_months(month, 1)
+    parts += ['PARTITION pfuture VALUES LESS THAN (0, MAXVALUE)',
+              'PARTITION pkeep VALUES LESS THAN (MAXVALUE, MAXVALUE)']
+    return 'PARTITION BY RANGE COLUMNS(keep, created) (%s)' % ', '.join(parts)
+
+
+def get_partitions(cursor, table):
+    """Names of the partitions of `table`, empty if it isn't partitioned."""
+    if connection.vendor != 'mysql':
+        return []
+    cursor.execute('SELECT PARTITION_NAME FROM information_schema.PARTITIONS '
+                   'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s '
+                   'AND PARTITION_NAME IS NOT NULL '
+                   'ORDER BY PARTITION_ORDINAL_POSITION', [table])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_months(partitions):
+    months = []
+    for name in partitions:
+        match = MONTH_RE.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return months
+
+
+def add_partitions(cursor, table, partitions, until):
+    """Split months up to `until` off pfuture."""
+    months = get_months(partitions)
+    if months:
+        month = add_months(max(months), 1)
+    else:
+        month = month_start(date.today())
+    parts = []
+    while month <= until:
+        parts.append(partition(month))
+        month = add_months(month, 1)
+    if parts:
+        log.info('Adding %s partitions to %s' % (len(parts), table))
+        cursor.execute('ALTER TABLE %s REORGANIZE PARTITION pfuture INTO '
+                       '(%s, PARTITION pfuture VALUES LESS THAN (0, MAXVALUE))'
+                       % (table, ', '.join(parts)))
+
+
+def drop_partitions(cursor, table, partitions, before):
+    """Drop the months that ended before `before`."""
+    expired = ['p%s' % month.strftime('%Y%m')
+               for month in get_months(partitions)
+               if add_months(month, 1) <= before]
+    if expired:
+        log.info('Dropping partitions %s of %s' % (', '.join(expired), table))
+        cursor.execute('ALTER TABLE %s DROP PARTITION %s' %
+                       (table, ', '.join(expired)))
+
+
+def delete_expired(cursor, tables, before):
+    """Delete entries before `before` and their index rows, in batches."""
+    keep = ','.join(map(str, amo.LOG_KEEP))
+    while True:
+        cursor.execute('SELECT id FROM %s WHERE created < %%s '
+                       'AND action NOT IN (%s) LIMIT %s'
+                       % (tables.log, keep, DELETE_BATCH), [before])
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        log.info('Deleting %s logs' % len(rows))
+        ids = ','.join(str(row[0]) for row in rows)
+        for table in filter(None, tables.indexes + [tables.attachments]):
+            cursor.execute('DELETE FROM %s WHERE activity_log_id IN (%s)'
+                           % (table, ids))
+        cursor.execute('DELETE FROM %s WHERE id IN (%s)' % (tables.log, ids))
+        transaction.commit_unless_managed()
+
+
+def delete_orphaned_attachments(cursor, tables):
+    if not tables.attachments:
+        return
+    cursor.execute('DELETE a FROM %s a LEFT JOIN %s l '
+                   'ON l.id = a.activity_log_id WHERE l.id IS NULL'
+                   % (tables.attachments, tables.log))
+    transaction.commit_unless_managed()
+
+
+def expire_logs(before, tables=None):
+    """
+    Get rid of activity log entries created before `before`, except those
+    with a `keep` action.
+
+    Partitioned tables drop whole months, so entries are kept for up to a
+    month longer.
+    """
+    tables = tables or LogTables()
+    cursor = connection.cursor()
+    if 'pkeep' not in get_partitions(cursor, tables.log):
+        delete_expired(cursor, tables, before)
+        return
+    before = before.date() if hasattr(before, 'date') else before
+    until = add_months(month_start(date.today()), MONTHS_AHEAD)
+    for table in tables.partitioned:
+        partitions = get_partitions(cursor, table)
+        add_partitions(cursor, table, partitions, until)
+        drop_partitions(cursor, table, partitions, before)
+    delete_orphaned_attachments(cursor, tables)
@@ -0,0 +1,290 @@
+import time
+from datetime import date, timedelta
+from optparse import make_option
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand, CommandError
+
+import amo
+from devhub.log_partitions import (add_months, delete_orphaned_attachments,
+                                   expire_logs, get_partitions, LogTables,
+                                   month_start, MONTHS_AHEAD,
+                                   partition_clause)
+from devhub.models import AddonLog, UserLog
+
+HELP = 'Move the activity log tables over to monthly partitions'
+
+
+class Command(BaseCommand):
+    """
+    Moves the activity log and the tables indexing it over to monthly
+    partitions (see devhub.log_partitions), so expired entries can be
+    dropped a month at a time.
+
+    Each table is copied a batch at a time into a partitioned copy while the
+    site keeps writing to it. The rows written in the meantime are then
+    copied across with the old tables locked, the copies take over their
+    AUTO_INCREMENT, and they're swapped in with one RENAME. Entries already
+    past --days aren't copied, they'd only be dropped again. The old tables
+    are dropped afterwards unless --keep-old is given.
+
+    MySQL can't RENAME locked tables, so the lock is released just before
+    the swap. Stop writes to the activity log for the swap (the end of the
+    run) to be safe: anything written in between is copied over after the
+    swap, but the command stops with an error, leaving the old tables, if
+    there was more of it than the ids left free for it (--batch).
+
+    --synthetic=N runs it all on tables of N made up entries over the last
+    year instead, then drops them, to show how long it takes and how much
+    space it frees. Expiring the next month is timed too.
+
+    Usage:
+
+        python manage.py partition_activity_log --synthetic=3000000
+        python manage.py partition_activity_log --keep-old
+
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--days', type='int', default=90,
+                    help='Days of entries to keep.'),
+        make_option('--batch', type='int', default=10000,
+                    help='Rows to copy at a time.'),
+        make_option('--synthetic', type='int', default=0,
+                    help='Run on this many made up entries.'),
+        make_option('--keep-old', action='store_true', default=False,
+                    help="Don't drop the unpartitioned tables."),
+    )
+    help = HELP
+
+    def handle(self, *args, **kw):
+        if connection.vendor != 'mysql':
+            raise CommandError('Partitioning needs MySQL.')
+        self.cursor = connection.cursor()
+        self.batch = kw['batch']
+        cutoff = date.today() - timedelta(days=kw['days'])
+
+        if kw['synthetic']:
+            tables = LogTables('synthetic_')
+            try:
+                self.make_synthetic(tables, kw['synthetic'])
+                self.partition(tables, cutoff)
+                self.expire_next(tables, cutoff)
+            finally:
+                self.drop(tables, '')
+                self.drop(tables, '_old')
+                self.drop(tables, '_new')
+            return
+
+        tables = LogTables()
+        if 'pkeep' in get_partitions(self.cursor, tables.log):
+            raise CommandError('%s is already partitioned.' % tables.log)
+        self.partition(tables, cutoff)
+        if not kw['keep_old']:
+            self.drop(tables, '_old')
+
+    def execute(self, sql, params=None):
+        self.cursor.execute(sql, params)
+        transaction.commit_unless_managed()
+
+    def drop(self, tables, suffix):
+        for table in tables.partitioned + [tables.attachments]:
+            if table:
+                self.execute('DROP TABLE IF EXISTS %s%s' % (table, suffix))
+
+    def size(self, tables):
+        """Bytes of data and indexes in `tables`."""
+        for table in tables:
+            self.execute('ANALYZE TABLE %s' % table)
+        self.cursor.execute(
+            'SELECT SUM(DATA_LENGTH + INDEX_LENGTH) '
+            'FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() '
+            'AND TABLE_NAME IN (%s)' % ', '.join(['%s'] * len(tables)),
+            tables)
+        return int(self.cursor.fetchone()[0] or 0)
+
+    def partition(self, tables, cutoff):
+        first = month_start(cutoff)
+        last = add_months(month_start(date.today()), MONTHS_AHEAD)
+        old = [t + '_old' for t in tables.partitioned]
+        before = self.size(tables.partitioned)
+        start = time.time()
+
+        for table in tables.partitioned:
+            new = table + '_new'
+            self.execute('CREATE TABLE %s LIKE %s' % (new, table))
+            # Partitioned tables need the partition columns in the primary
+            # key, and can't have foreign keys.
+            self.execute('ALTER TABLE %s DROP PRIMARY KEY, '
+                         'ADD PRIMARY KEY (id, keep, created)' % new)
+            self.execute('ALTER TABLE %s %s' %
+                         (new, partition_clause(first, last)))
+
+        copied = {}
+        for table in tables.partitioned:
+            copied[table] = self.copy(tables, table, table, table + '_new',
+                                      tables.log + '_new', first, 0)
+
+        # Catch up with what was written during the copy, with writes to
+        # the old tables held off.
+        self.lock(tables)
+        try:
+            log_copied = copied[tables.log]
+            for table in tables.partitioned:
+                copied[table] = self.copy(tables, table, table,
+                                          table + '_new', tables.log + '_new',
+                                          first, copied[table], log_copied)
+            # Ids from here on are free in the new tables, save for some
+            # room for rows written between the unlock and the swap.
+            starts = {}
+            for table in tables.partitioned:
+                starts[table] = self.auto_increment(table) + self.batch
+                self.execute('ALTER TABLE %s_new AUTO_INCREMENT = %s' %
+                             (table, starts[table]))
+        finally:
+            self.execute('UNLOCK TABLES')
+
+        self.drop_foreign_keys(tables)
+        self.execute('RENAME TABLE %s' % ', '.join(
+            '%s TO %s_old, %s_new TO %s' % (t, t, t, t)
+            for t in tables.partitioned))
+
+        # Whatever was written between the unlock and the swap.
+        for table in tables.partitioned:
+            self.cursor.execute('SELECT MAX(id) FROM %s_old' % table)
+            if (self.cursor.fetchone()[0] or 0) >= starts[table]:
+                raise CommandError(
+                    'More than %s rows were written to %s during the swap, '
+                    'their ids are taken. Stop writes to the activity log '
+                    'and copy the rest of %s_old over by hand.'
+                    % (self.batch, table, table))
+        for table in tables.partitioned:
+            self.copy(tables, table, table + '_old', table, tables.log,
+                      first, copied[table])
+        delete_orphaned_attachments(self.cursor, tables)
+
+        print 'Partitioned %s tables in %.1fs: %.1fMB now, %.1fMB before.' % (
+            len(tables.partitioned), time.time() - start,
+            self.size(tables.partitioned) / 1e6, before / 1e6)
+        print 'Unpartitioned tables: %s' % ', '.join(old)
+
+    def copy(self, tables, table, source, target, log, first, after,
+             log_after=None):
+        """
+        Copy the rows of `source` with ids above `after` into `target` and
+        return the last id copied. Index rows take `keep` from the entry in
+        `log` they belong to, and are skipped if it wasn't copied.
+
+        With `log_after`, index rows with ids up to `after` are copied too if
+        they belong to a log entry above `log_after`, the ones skipped
+        before because their entry hadn't been copied yet.
+        """
+        columns = [c[0] for c in connection.introspection
+                   .get_table_description(self.cursor, source)]
+        keep = ','.join(map(str, amo.LOG_KEEP))
+        if table == tables.log:
+            select = ', '.join('s.action IN (%s)' % keep if c == 'keep'
+                               else 's.`%s`' % c for c in columns)
+            sql = ('SELECT %s FROM %s s WHERE s.id > %%s AND s.id <= %%s '
+                   'AND (s.created >= %%s OR s.action IN (%s))'
+                   % (select, source, keep))
+            params = [first]
+        else:
+            select = ', '.join('l.keep' if c == 'keep' else 's.`%s`' % c
+                               for c in columns)
+            sql = ('SELECT %s FROM %s s JOIN %s l '
+                   'ON l.id = s.activity_log_id '
+                   'WHERE s.id > %%s AND s.id <= %%s' % (select, source, log))
+            params = []
+        insert = 'INSERT INTO %s (%s) ' % (
+            target, ', '.join('`%s`' % c for c in columns))
+
+        if log_after is not None and table != tables.log:
+            self.execute(insert + sql + ' AND s.activity_log_id > %s',
+                         [0, after, log_after])
+
+        self.cursor.execute('SELECT MAX(id) FROM %s' % source)
+        last = self.cursor.fetchone()[0] or 0
+        start = after
+        while after < last:
+            self.execute(insert + sql, [after, after + self.batch] + params)
+            after += self.batch
+        return max(start, last)
+
+    def auto_increment(self, table):
+        self.cursor.execute(
+            'SELECT AUTO_INCREMENT FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', [table])
+        return self.cursor.fetchone()[0] or 1
+
+    def lock(self, tables):
+        """
+        Hold off writes to the old tables, and lock everything copy() needs
+        under the names it uses.
+        """
+        locks = ['%s AS l READ' % (tables.log + '_new')]
+        for table in tables.partitioned:
+            locks += ['%s READ' % table, '%s AS s READ' % table,
+                      '%s_new WRITE' % table]
+        self.execute('LOCK TABLES %s' % ', '.join(locks))
+
+    def drop_foreign_keys(self, tables):
+        """
+        Drop foreign keys on the log tables from other tables, which would
+        otherwise follow the tables being renamed.
+        """
+        names = tables.partitioned
+        self.cursor.execute(
+            'SELECT TABLE_NAME, CONSTRAINT_NAME '
+            'FROM information_schema.KEY_COLUMN_USAGE '
+            'WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IN '
+            '(%s) AND TABLE_NAME NOT IN (%s)' %
+            (', '.join(['%s'] * len(names)), ', '.join(['%s'] * len(names))),
+            names + names)
+        for table, name in self.cursor.fetchall():
+            self.execute('ALTER TABLE %s DROP FOREIGN KEY %s' % (table, name))
+
+    def make_synthetic(self, tables, count):
+        real = LogTables()
+        for table, synthetic in zip(real.partitioned + [real.attachments],
+                                    tables.partitioned + [tables.attachments]):
+            if table:
+                self.execute('CREATE TABLE %s LIKE %s' % (synthetic, table))
+
+        # Entries spread over the last year, one in ten with a kept action.
+        start = time.time()
+        actions = [a for a in amo.LOG_BY_ID if a not in amo.LOG_KEEP][:9]
+        actions.append(amo.LOG_KEEP[0])
+        for action in actions:
+            self.execute("INSERT INTO %s (created, modified, action, "
+                         "arguments, details) VALUES (NOW(), NOW(), %%s, "
+                         "'[]', '')" % tables.log, [action])
+        rows = len(actions)
+        while rows < count:
+            self.execute(
+                'INSERT INTO %s (created, modified, user_id, action, '
+                'arguments, details) SELECT NOW() - INTERVAL FLOOR(RAND() * '
+                '365 * 86400) SECOND, modified, user_id, action, arguments, '
+                'details FROM %s LIMIT %s'
+                % (tables.log, tables.log, min(rows, count - rows)))
+            rows += min(rows, count - rows)
+
+        # Every entry is indexed by its user, every other one by an add-on.
+        user = tables.prefix + UserLog._meta.db_table
+        addon = tables.prefix + AddonLog._meta.db_table
+        self.execute('INSERT INTO %s (created, modified, activity_log_id, '
+                     'user_id) SELECT created, modified, id, 1 FROM %s'
+                     % (user, tables.log))
+        self.execute('INSERT INTO %s (created, modified, activity_log_id, '
+                     'addon_id) SELECT created, modified, id, id %% 1000 '
+                     'FROM %s WHERE id %% 2 = 0' % (addon, tables.log))
+        print 'Made %s entries in %.1fs.' % (count, time.time() - start)
+
+    def expire_next(self, tables, cutoff):
+        """Time expiring the month after `cutoff`."""
+        before = self.size(tables.partitioned)
+        start = time.time()
+        expire_logs(add_months(month_start(cutoff), 1), tables)
+        print 'Expired a month in %.2fs, freeing %.1fMB.' % (
+            time.time() - start,
+            (before - self.size(tables.partitioned)) / 1e6)
@@ -95,7 +95,23 @@ class HubEvent(amo.models.ModelBase):
         return ['*/developers*']
 
 
-class AddonLog(amo.models.ModelBase):
+class ActivityLogIndex(amo.models.ModelBase):
+    """
+    Base for the tables indexing the activity log. Index rows take `keep`
+    from their log entry, so they're partitioned and expire along with it
+    (see devhub.log_partitions).
+    """
+    keep = models.BooleanField(default=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kw):
+        self.keep = self.activity_log.keep
+        return super(ActivityLogIndex, self).save(*args, **kw)
+
+
+class AddonLog(ActivityLogIndex):
     """
     This table is for indexing the activity log by addon.
     """
@@ -109,7 +125,7 @@ class AddonLog(amo.models.ModelBase):
         ordering = ('-created',)
 
 
-class AppLog(amo.models.ModelBase):
+class AppLog(ActivityLogIndex):
     """
     This table is for indexing the activity log by app.
     """
@@ -121,7 +137,7 @@ class AppLog(amo.models.ModelBase):
         ordering = ('-created',)
 
 
-class CommentLog(amo.models.ModelBase):
+class CommentLog(ActivityLogIndex):
     """
     This table is for indexing the activity log by comment.
     """
@@ -133,7 +149,7 @@ class CommentLog(amo.models.ModelBase):
         ordering = ('-created',)
 
 
-class VersionLog(amo.models.ModelBase):
+class VersionLog(ActivityLogIndex):
     """
     This table is for indexing the activity log by version.
     """
@@ -145,7 +161,7 @@ class VersionLog(amo.models.ModelBase):
         ordering = ('-created',)
 
 
-class UserLog(amo.models.ModelBase):
+class UserLog(ActivityLogIndex):
     """
     This table is for indexing the activity log by user.
     Note: This includes activity performed unto the user.
@@ -158,7 +174,7 @@ class UserLog(amo.models.ModelBase):
         ordering = ('-created',)
 
 
-class GroupLog(amo.models.ModelBase):
+class GroupLog(ActivityLogIndex):
     """
     This table is for indexing the activity log by access group.
     """
@@ -270,6 +286,8 @@ class ActivityLog(amo.models.ModelBase):
     action = models.SmallIntegerField(choices=TYPES, db_index=True)
     _arguments = models.TextField(blank=True, db_column='arguments')
     _details = models.TextField(blank=True, db_column='details')
+    # Entries with a `keep` action never expire.
+    keep = models.BooleanField(default=False)
     objects = ActivityLogManager()
 
     formatter = SafeFormatter()
@@ -278,6 +296,10 @@ class ActivityLog(amo.models.ModelBase):
         db_table = table_name('log_activity')
         ordering = ('-created',)
 
+    def save(self, *args, **kw):
+        self.keep = self.action in amo.LOG_KEEP
+        return super(ActivityLog, self).save(*args, **kw)
+
     def f(self, *args, **kw):
         """Calls SafeFormatter.format and returns a Markup string."""
         # SafeFormatter escapes everything so this is safe.
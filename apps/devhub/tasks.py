@@ -20,7 +20,7 @@ from tower import ugettext as _
 
 import amo
 from amo.decorators import write, set_modified_on
-from amo.utils import (guard, remove_icons, resize_image,
+from amo.utils import (guard, remove_icons, resize_image, resize_images,
                        send_html_mail_jinja)
 from addons.models import Addon
 from applications.management.commands import dump_apps
@@ -205,13 +205,8 @@ def resize_icon(src, dst, size, locally=False, **kw):
     log.info('[1@None] Resizing icon: %s' % dst)
     try:
         if isinstance(size, list):
-            for s in size:
-                resize_image(src, '%s-%s.png' % (dst, s), (s, s),
-                             remove_src=False, locally=locally)
-            if locally:
-                os.remove(src)
-            else:
-                storage.delete(src)
+            resize_images(src, [('%s-%s.png' % (dst, s), (s, s))
+                                for s in size], locally=locally)
         else:
             resize_image(src, dst, (size, size), remove_src=True,
                          locally=locally)
@@ -228,12 +223,9 @@ def resize_preview(src, instance, **kw):
     sizes = {}
     log.info('[1@None] Resizing preview and storing size: %s' % thumb_dst)
     try:
-        sizes['thumbnail'] = resize_image(src, thumb_dst,
-                                          amo.ADDON_PREVIEW_SIZES[0],
-                                          remove_src=False)
-        sizes['image'] = resize_image(src, full_dst,
-                                      amo.ADDON_PREVIEW_SIZES[1],
-                                      remove_src=False)
+        sizes['thumbnail'], sizes['image'] = resize_images(
+            src, [(thumb_dst, amo.ADDON_PREVIEW_SIZES[0]),
+                  (full_dst, amo.ADDON_PREVIEW_SIZES[1])], remove_src=False)
         instance.sizes = sizes
         instance.save()
         return True
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+import mock
+from nose.tools import eq_
+
+import amo
+import amo.tests
+from addons.models import Addon
+from devhub.log_partitions import (add_months, add_partitions,
+                                   drop_partitions, expire_logs,
+                                   partition_clause)
+from devhub.models import ActivityLog, AddonLog, UserLog
+from users.models import UserProfile
+
+
+def test_add_months():
+    eq_(add_months(date(2013, 11, 1), 1), date(2013, 12, 1))
+    eq_(add_months(date(2013, 12, 1), 1), date(2014, 1, 1))
+    eq_(add_months(date(2014, 1, 1), -1), date(2013, 12, 1))
+    eq_(add_months(date(2013, 1, 1), 14), date(2014, 3, 1))
+
+
+def test_partition_clause():
+    eq_(partition_clause(date(2013, 11, 1), date(2013, 12, 1)),
+        "PARTITION BY RANGE COLUMNS(keep, created) ("
+        "PARTITION p201311 VALUES LESS THAN (0, '2013-12-01'), "
+        "PARTITION p201312 VALUES LESS THAN (0, '2014-01-01'), "
+        "PARTITION pfuture VALUES LESS THAN (0, MAXVALUE), "
+        "PARTITION pkeep VALUES LESS THAN (MAXVALUE, MAXVALUE))")
+
+
+class TestPartitions(amo.tests.TestCase):
+
+    def setUp(self):
+        self.cursor = mock.Mock()
+        self.partitions = ['p201310', 'p201311', 'pfuture', 'pkeep']
+
+    def test_add(self):
+        add_partitions(self.cursor, 'log', self.partitions, date(2014, 1, 1))
+        self.cursor.execute.assert_called_with(
+            "ALTER TABLE log REORGANIZE PARTITION pfuture INTO ("
+            "PARTITION p201312 VALUES LESS THAN (0, '2014-01-01'), "
+            "PARTITION p201401 VALUES LESS THAN (0, '2014-02-01'), "
+            "PARTITION pfuture VALUES LESS THAN (0, MAXVALUE))")
+
+    def test_add_nothing(self):
+        add_partitions(self.cursor, 'log', self.partitions, date(2013, 11, 1))
+        assert not self.cursor.execute.called
+
+    def test_drop(self):
+        drop_partitions(self.cursor, 'log', self.partitions, date(2013, 12, 1))
+        self.cursor.execute.assert_called_with(
+            'ALTER TABLE log DROP PARTITION p201310, p201311')
+
+    def test_drop_whole_months(self):
+        drop_partitions(self.cursor, 'log', self.partitions,
+                        date(2013, 11, 30))
+        self.cursor.execute.assert_called_with(
+            'ALTER TABLE log DROP PARTITION p201310')
+
+
+class TestExpireLogs(amo.tests.TestCase):
+    fixtures = ['base/addon_3615']
+
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='yolo')
+        self.addon = Addon.objects.get(pk=3615)
+
+    def log(self, action, created):
+        entry = amo.log(action, self.addon, user=self.user)
+        ActivityLog.objects.filter(pk=entry.pk).update(created=created)
+        return entry
+
+    def test_expire(self):
+        old = self.log(amo.LOG.EDIT_PROPERTIES, datetime(2001, 1, 1))
+        kept = self.log(amo.LOG.CREATE_ADDON, datetime(2001, 1, 1))
+        new = self.log(amo.LOG.EDIT_PROPERTIES, datetime.now())
+        expire_logs(datetime(2002, 1, 1))
+        eq_(sorted(ActivityLog.objects.values_list('id', flat=True)),
+            [kept.id, new.id])
+        for model in (AddonLog, UserLog):
+            eq_(model.objects.filter(activity_log=old).count(), 0)
+            eq_(model.objects.filter(activity_log=kept).count(), 1)
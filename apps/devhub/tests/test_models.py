@@ -69,6 +69,16 @@ class TestActivityLog(amo.tests.TestCase):
         amo.log(amo.LOG.CREATE_ADDON, (Addon, a.id))
         eq_(AddonLog.objects.count(), 1)
 
+    def test_keep(self):
+        a = Addon.objects.get()
+        kept = amo.log(amo.LOG.CREATE_ADDON, a)
+        assert kept.keep
+        assert kept.addonlog_set.get().keep
+        assert kept.userlog_set.get().keep
+        expires = amo.log(amo.LOG.EDIT_PROPERTIES, a)
+        assert not expires.keep
+        assert not expires.addonlog_set.get().keep
+
     def test_fancy_rendering(self):
         """HTML for Review, and Collection."""
         a = ActivityLog.objects.create(action=amo.LOG.ADD_REVIEW.id)
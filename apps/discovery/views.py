@@ -248,9 +248,9 @@ def _recommendations(request, version, platform, limit, token, ids, qs,
     addons = api.views.addon_filter(qs, 'ALL', 0, request.APP, platform,
                                     version, compat_mode, shuffle=False)
     addons = dict((a.id, a) for a in addons)
-    addons = [api.utils.addon_to_dict(addons[i], disco=True,
-                                      src='discovery-personalrec')
-              for i in ids if i in addons][:limit]
+    addons = api.utils.addons_to_dicts([addons[i] for i in ids
+                                        if i in addons][:limit],
+                                       disco=True, src='discovery-personalrec')
     data = {'token2': token, 'addons': addons}
     content = json.dumps(data, cls=amo.utils.JSONEncoder)
     return http.HttpResponse(content, content_type='application/json')
@@ -1,3 +1,9 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.encoding import smart_str
+
 from django_tables.base import BaseTable, Rows, TableOptions
 
 
@@ -24,9 +30,19 @@ class SQLRows(Rows):
         """Use the queryset count() method to get the length, instead of
         loading all results into memory. This allows, for example,
         smart paginators that use len() to perform better.
+
+        The count is cached for CACHE_COUNT_TIMEOUT seconds, keyed on the
+        SQL, like CachedCountPaginator's.
         """
         if getattr(self, '_length', None) is None:
-            self._length = self.table.data.count()
+            qs = self.table.queryset
+            key = 'count:%s' % hashlib.md5(smart_str(u'%s:%r' % (
+                qs.as_sql(), sorted(qs.base_query['_args'].items()))
+            )).hexdigest()
+            self._length = cache.get(key)
+            if self._length is None:
+                self._length = qs.count()
+                cache.set(key, self._length, settings.CACHE_COUNT_TIMEOUT)
         return self._length
 
     # for compatibility with QuerySetPaginator
@@ -102,7 +102,7 @@ def eventlog(request):
         if form.cleaned_data['filter']:
             eventlog = eventlog.filter(action=form.cleaned_data['filter'].id)
 
-    pager = amo.utils.paginate(request, eventlog, 50)
+    pager = amo.utils.paginate(request, eventlog, 50, cache_count=True)
 
     data = context(form=form, pager=pager)
     return jingo.render(request, 'editors/eventlog.html', data)
@@ -344,7 +344,7 @@ def _queue(request, TableObj, tab, qs=None):
         per_page = default
     if per_page <= 0 or per_page > 200:
         per_page = default
-    page = paginate(request, table.rows, per_page=per_page)
+    page = paginate(request, table.rows, per_page=per_page, cache_count=True)
     table.set_page(page)
     return jingo.render(request, 'editors/queue.html',
                         context(table=table, page=page, tab=tab,
@@ -676,7 +676,7 @@ def reviewlog(request):
                 Q(user__display_name__icontains=term) |
                 Q(user__username__icontains=term)).distinct()
 
-    pager = amo.utils.paginate(request, approvals, 50)
+    pager = amo.utils.paginate(request, approvals, 50, cache_count=True)
     ad = {
         amo.LOG.APPROVE_VERSION.id: _('was approved'),
         amo.LOG.PRELIMINARY_VERSION.id: _('given preliminary review'),
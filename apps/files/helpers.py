@@ -304,7 +304,7 @@ class FileViewer(object):
                 return short
         return 'plain'
 
-    @memoize(prefix='file-viewer', time=60 * 60)
+    @memoize(prefix='file-viewer', time=60 * 60, lock=True)
     def _get_files(self):
         all_files, res = [], SortedDict()
         # Not using os.path.walk so we get just the right order.
@@ -0,0 +1,112 @@
+import random
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+import mock
+
+import amo
+from addons.models import Addon
+from amo import perf
+from amo.utils import chunked
+from reviews import tasks
+from reviews.models import Review
+from users.models import UserProfile
+
+HELP = 'Time review denormalization and rating aggregates on made up reviews'
+PREFIX = 'bench-reviews-'
+
+
+class Command(BaseCommand):
+    """
+    Makes up --reviews reviews of --addons add-ons, as if they'd just been
+    imported without their denormalized fields set, and times
+    reviews.tasks.update_denorm over every (addon, user) pair and
+    addon_review_aggregates over every add-on, with the number of queries
+    and cache writes each does. Both are run a second time, when nothing
+    changes, then the made up rows are deleted.
+
+    Usage:
+
+        python manage.py bench_reviews --reviews=100000 --addons=1000
+
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--reviews', type='int', default=100000,
+                    help='Number of reviews to make up.'),
+        make_option('--addons', type='int', default=1000,
+                    help='Number of add-ons they review.'),
+    )
+    help = HELP
+
+    def handle(self, *args, **kw):
+        try:
+            addons, pairs = self.make_reviews(kw['reviews'], kw['addons'])
+            for run in ('first', 'unchanged'):
+                self.run(run, 'update_denorm', tasks.update_denorm,
+                         pairs)
+                self.run(run, 'aggregates', tasks.addon_review_aggregates,
+                         addons)
+        finally:
+            self.delete()
+
+    def run(self, run, name, task, args):
+        # Run the bayesian ratings right away instead of in celery.
+        bayesian = lambda args, **kw: tasks.addon_bayesian_rating(*args)
+        with mock.patch.object(tasks.addon_bayesian_rating, 'apply_async',
+                               bayesian):
+            with perf.collect() as stats:
+                start = time.time()
+                task(*args, using='default')
+                took = time.time() - start
+        print '%-10s %-14s %7.2fs  %6s queries  %6s cache writes' % (
+            run, name, took, stats.queries, stats.counts['cache.set'])
+
+    def make_reviews(self, count, addons):
+        start = time.time()
+        Addon.objects.bulk_create(
+            Addon(guid='%s%s' % (PREFIX, i), type=amo.ADDON_EXTENSION,
+                  status=amo.STATUS_PUBLIC) for i in range(addons))
+        # About two reviews per user, so there's something to denormalize.
+        users = max(1, count / 20)
+        UserProfile.objects.bulk_create(
+            UserProfile(username='%s%s' % (PREFIX, i),
+                        email='%s%s@example.com' % (PREFIX, i))
+            for i in range(users))
+        addon_ids = list(Addon.with_deleted.filter(guid__startswith=PREFIX)
+                         .values_list('id', flat=True))
+        user_ids = list(UserProfile.objects
+                        .filter(username__startswith=PREFIX)
+                        .values_list('id', flat=True))
+
+        pairs = set()
+        for chunk in chunked(xrange(count), 5000):
+            reviews = []
+            for i in chunk:
+                pair = (random.choice(addon_ids), random.choice(user_ids))
+                pairs.add(pair)
+                reviews.append(Review(addon_id=pair[0], user_id=pair[1],
+                                      rating=random.randint(1, 5),
+                                      previous_count=0, is_latest=True))
+            Review.objects.bulk_create(reviews)
+        transaction.commit_unless_managed()
+        print 'Made %s reviews of %s add-ons by %s users in %.1fs.' % (
+            count, addons, users, time.time() - start)
+        return addon_ids, list(pairs)
+
+    def delete(self):
+        # Straight SQL, deleting through the models would refresh every
+        # review's add-on.
+        cursor = connection.cursor()
+        cursor.execute('DELETE FROM %s WHERE addon_id IN (SELECT id FROM %s '
+                       'WHERE guid LIKE %%s)' % (Review._meta.db_table,
+                                                 Addon._meta.db_table),
+                       [PREFIX + '%'])
+        cursor.execute('DELETE FROM %s WHERE guid LIKE %%s' %
+                       Addon._meta.db_table, [PREFIX + '%'])
+        cursor.execute('DELETE FROM %s WHERE username LIKE %%s' %
+                       UserProfile._meta.db_table, [PREFIX + '%'])
+        transaction.commit_unless_managed()
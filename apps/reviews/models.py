@@ -185,6 +185,24 @@ class GroupedRating(object):
         cache.set(cls.key(addon), ratings)
         return ratings
 
+    @classmethod
+    def set_many(cls, counts):
+        """
+        Like `set` for many add-ons at once, from {addon: {rating: count}}.
+        Only the add-ons whose ratings changed are written.
+        """
+        keys = dict((cls.key(addon), addon) for addon in counts)
+        current = cache.get_many(keys.keys())
+        changed = {}
+        for key, addon in keys.items():
+            ratings = [(rating, counts[addon].get(rating, 0))
+                       for rating in range(1, 6)]
+            if current.get(key) != ratings:
+                changed[key] = ratings
+        if changed:
+            cache.set_many(changed)
+        return changed
+
 
 class Spam(object):
 
@@ -1,58 +1,106 @@
 import logging
+from collections import defaultdict
 
-from django.db.models import Count, Avg, F
+from django.db.models import Count, Avg
 
 import caching.base as caching
 from celeryutils import task
 
 from addons.models import Addon
+from amo.utils import chunked
 from .models import Review, GroupedRating
 
 log = logging.getLogger('z.task')
 
+# Add-ons, or (addon, user) pairs, handled per query.
+BATCH_SIZE = 500
+
 
 @task(rate_limit='50/m')
 def update_denorm(*pairs, **kw):
     """
     Takes a bunch of (addon, user) pairs and sets the denormalized fields for
     all reviews matching that pair.
+
+    The reviews of a batch of pairs are read in one query and only those that
+    change are written, with one UPDATE for each new set of values.
     """
     log.info('[%s@%s] Updating review denorms.' %
              (len(pairs), update_denorm.rate_limit))
     using = kw.get('using')
-    for addon, user in pairs:
-        reviews = list(Review.objects.valid().no_cache().using(using)
-                       .filter(addon=addon, user=user).order_by('created'))
-        if not reviews:
-            continue
-
-        for idx, review in enumerate(reviews):
-            review.previous_count = idx
-            review.is_latest = False
-        reviews[-1].is_latest = True
-
-        for review in reviews:
-            review.save()
+    for chunk in chunked(pairs, BATCH_SIZE):
+        wanted = set(tuple(pair) for pair in chunk)
+        reviews = defaultdict(list)
+        qs = (Review.objects.valid().no_cache().using(using)
+              .filter(addon__in=set(addon for addon, user in wanted),
+                      user__in=set(user for addon, user in wanted))
+              .order_by('created', 'id')
+              .values_list('id', 'addon', 'user', 'previous_count',
+                           'is_latest'))
+        for id, addon, user, previous_count, is_latest in qs:
+            if (addon, user) in wanted:
+                reviews[addon, user].append((id, previous_count, is_latest))
+
+        changes = defaultdict(list)
+        for rows in reviews.values():
+            for idx, (id, previous_count, is_latest) in enumerate(rows):
+                values = idx, idx == len(rows) - 1
+                if (previous_count, bool(is_latest)) != values:
+                    changes[values].append(id)
+        for (previous_count, is_latest), ids in changes.items():
+            Review.objects.filter(id__in=ids).update(
+                previous_count=previous_count, is_latest=is_latest)
+
+        changed = sum(changes.values(), [])
+        if changed:
+            # Queryset updates don't invalidate anything on their own.
+            Review.objects.invalidate(*Review.objects.no_cache().using(using)
+                                      .filter(id__in=changed))
+
+
+def rating_counts(addons, using=None):
+    """
+    {addon: {rating: count}} of the latest reviews of `addons`, in one query.
+    Reviews without a rating are counted under None.
+    """
+    counts = dict((addon, {}) for addon in addons)
+    qs = (Review.objects.valid().no_cache().using(using)
+          .filter(addon__in=addons, is_latest=True)
+          .order_by().values_list('addon', 'rating').annotate(Count('id')))
+    for addon, rating, count in qs:
+        counts.setdefault(addon, {})[rating] = count
+    return counts
 
 
 @task
 def addon_review_aggregates(*addons, **kw):
+    """
+    Sets the total reviews and average rating of `addons`, and their grouped
+    ratings, from one query per batch. Only the add-ons whose numbers change
+    are saved.
+    """
     log.info('[%s@%s] Updating total reviews and average ratings.' %
              (len(addons), addon_review_aggregates.rate_limit))
     using = kw.get('using')
-    addon_objs = list(Addon.objects.filter(pk__in=addons))
-    stats = dict((x[0], x[1:]) for x in
-                 Review.objects.valid().no_cache().using(using)
-                 .filter(addon__in=addons, is_latest=True)
-                 .values_list('addon')
-                 .annotate(Avg('rating'), Count('addon')))
-    for addon in addon_objs:
-        rating, reviews = stats.get(addon.id, [0, 0])
-        addon.update(total_reviews=reviews, average_rating=rating)
+    for chunk in chunked(addons, BATCH_SIZE):
+        counts = rating_counts(chunk, using=using)
+        for addon in Addon.objects.no_cache().filter(pk__in=chunk):
+            ratings = counts.get(addon.id, {})
+            reviews = sum(ratings.values())
+            rated = dict((r, n) for r, n in ratings.items() if r is not None)
+            if rated:
+                rating = (float(sum(r * n for r, n in rated.items())) /
+                          sum(rated.values()))
+            else:
+                # Like AVG(), None if no review has a rating.
+                rating = None if reviews else 0
+            if (addon.total_reviews, addon.average_rating) != (reviews,
+                                                               rating):
+                addon.update(total_reviews=reviews, average_rating=rating)
+        GroupedRating.set_many(counts)
 
     # Delay bayesian calculations to avoid slave lag.
     addon_bayesian_rating.apply_async(args=addons, countdown=5)
-    addon_grouped_rating.apply_async(args=addons, kwargs={'using': using})
 
 
 @task
@@ -66,18 +114,23 @@ def addon_bayesian_rating(*addons, **kw):
     if avg['rating'] is None:
         return
     mc = avg['reviews'] * avg['rating']
-    for addon in Addon.uncached.filter(id__in=addons):
-        if addon.average_rating is None:
-            # Ignoring addons with no average rating.
-            continue
-
-        q = Addon.objects.filter(id=addon.id)
-        if addon.total_reviews:
-            num = mc + F('total_reviews') * F('average_rating')
-            denom = avg['reviews'] + F('total_reviews')
-            q.update(bayesian_rating=num / denom)
-        else:
-            q.update(bayesian_rating=0)
+    for chunk in chunked(addons, BATCH_SIZE):
+        changes = defaultdict(list)
+        for id, total, rating, bayesian in (
+                Addon.uncached.filter(id__in=chunk)
+                .values_list('id', 'total_reviews', 'average_rating',
+                             'bayesian_rating')):
+            if rating is None:
+                # Ignoring addons with no average rating.
+                continue
+            if total:
+                value = (mc + total * rating) / (avg['reviews'] + total)
+            else:
+                value = 0
+            if value != bayesian:
+                changes[value].append(id)
+        for value, ids in changes.items():
+            Addon.objects.filter(id__in=ids).update(bayesian_rating=value)
 
 
 @task
@@ -87,5 +140,5 @@ def addon_grouped_rating(*addons, **kw):
     log.info('[%s@%s] Updating addon grouped ratings.' %
              (len(addons), addon_grouped_rating.rate_limit))
     using = kw.get('using')
-    for addon in addons:
-        GroupedRating.set(addon, using=using)
+    for chunk in chunked(addons, BATCH_SIZE):
+        GroupedRating.set_many(rating_counts(chunk, using=using))
@@ -1,6 +1,8 @@
+from django.core.cache import cache
 from django.utils import translation
 
-from nose.tools import eq_
+import mock
+from nose.tools import eq_, ok_
 import test_utils
 
 import amo.tests
@@ -57,6 +59,53 @@ class TestGroupedRating(amo.tests.TestCase):
         eq_(GroupedRating.get(1865, update_none=True), self.grouped_ratings)
 
 
+class TestTasks(amo.tests.TestCase):
+    fixtures = ['base/apps', 'base/platforms', 'reviews/test_models']
+
+    def denorms(self):
+        return [(r.previous_count, bool(r.is_latest)) for r in
+                Review.objects.no_cache().filter(addon=4).order_by('id')]
+
+    def test_update_denorm(self):
+        tasks.update_denorm((4, 1))
+        eq_(self.denorms(), [(0, False), (1, True)])
+
+    def test_update_denorm_unchanged(self):
+        tasks.update_denorm((4, 1))
+        with mock.patch.object(Review.objects, 'invalidate') as invalidate:
+            tasks.update_denorm((4, 1), (4, 999))
+        ok_(not invalidate.called)
+        eq_(self.denorms(), [(0, False), (1, True)])
+
+    def test_review_aggregates(self):
+        tasks.update_denorm((4, 1))
+        Review.objects.filter(id=2).update(rating=2)
+        tasks.addon_review_aggregates(4, 3615)
+        addon = Addon.objects.no_cache().get(id=4)
+        eq_(addon.total_reviews, 1)
+        eq_(addon.average_rating, 2.0)
+        eq_(GroupedRating.get(4, update_none=False),
+            [(1, 0), (2, 1), (3, 0), (4, 0), (5, 0)])
+
+    def test_review_aggregates_unchanged(self):
+        tasks.update_denorm((4, 1))
+        tasks.addon_review_aggregates(4)
+        with mock.patch.object(Addon, 'update') as update:
+            with mock.patch.object(cache, 'set_many') as set_many:
+                tasks.addon_review_aggregates(4)
+        ok_(not update.called)
+        ok_(not set_many.called)
+
+    def test_review_aggregates_no_reviews(self):
+        Review.objects.all().delete()
+        Addon.objects.filter(id=4).update(total_reviews=3, average_rating=2)
+        tasks.addon_review_aggregates(4)
+        addon = Addon.objects.no_cache().get(id=4)
+        eq_(addon.total_reviews, 0)
+        eq_(addon.average_rating, 0)
+        eq_(addon.bayesian_rating, 0)
+
+
 class TestSpamTest(amo.tests.TestCase):
     fixtures = ['base/apps', 'base/platforms', 'reviews/test_models']
 
@@ -61,7 +61,8 @@ def review_list(request, addon, review_id=None, user_id=None, template=None):
         ctx['page'] = 'list'
         q = q.filter(is_latest=True)
 
-    ctx['reviews'] = reviews = amo.utils.paginate(request, q)
+    ctx['reviews'] = reviews = amo.utils.paginate(request, q,
+                                                  cache_count=True)
     ctx['replies'] = Review.get_replies(reviews.object_list)
     if request.user.is_authenticated():
         ctx['review_perms'] = {
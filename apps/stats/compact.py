@@ -0,0 +1,238 @@
+"""
+A compact encoding for the dictionaries stored in StatsDictField columns.
+
+Stored values look like ``~1<base64 payload>``: ``~`` never starts a JSON or
+phpserialize value so the three formats can live side by side in the same
+column, and the character after it selects the shared key dictionary used to
+write the payload.
+
+The payload is a tagged binary tree:
+
+* small non-negative ints (< 128) take a single byte,
+* larger ints are varints,
+* strings found in the shared dictionary are written as their index,
+* strings seen earlier in the same payload are written as a back reference
+  (application versions repeat a lot inside ``applications``),
+* anything else is written once as length-prefixed utf8.
+
+The column is ``text`` so the payload is base64 encoded; even so, typical
+update_counts rows come out at a third of their JSON size or less.
+"""
+import base64
+import binascii
+import struct
+
+MARKER = '~'
+
+# Tags. Anything with the high bit set is a small int in the low seven bits.
+T_NONE = 0x00
+T_TRUE = 0x01
+T_FALSE = 0x02
+T_INT = 0x03
+T_NEG_INT = 0x04
+T_FLOAT = 0x05
+T_STR = 0x06
+T_SHARED = 0x07
+T_BACKREF = 0x08
+T_DICT = 0x09
+T_LIST = 0x0a
+T_SMALL_INT = 0x80
+
+# Shared key dictionaries, keyed by the version character written after the
+# marker. These are part of the on-disk format: never reorder or remove
+# entries. To add keys, add a new version and bump CURRENT_VERSION.
+SHARED_KEYS = {
+    '1': (
+        # Application GUIDs.
+        u'{ec8030f7-c20a-464f-9b0e-13a3a9e97384}',  # Firefox
+        u'{3550f703-e582-4d05-9a08-453d09bdfdc6}',  # Thunderbird
+        u'{92650c4d-4b8e-4d2a-b7eb-24ecf4f6b63a}',  # SeaMonkey
+        u'{a23983c0-fd0e-11dc-95ff-0800200c9a66}',  # Mobile
+        u'{aa3c5121-dab2-40e2-81ca-7ea25febc110}',  # Android
+        u'{718e30fb-e89b-41dd-9da7-e25a45638b28}',  # Sunbird
+        # Operating systems.
+        u'WINNT', u'Darwin', u'Linux', u'Android', u'SunOS', u'FreeBSD',
+        u'OpenBSD', u'NetBSD', u'BSD_OS', u'WINCE', u'Maemo',
+        # Add-on statuses.
+        u'userEnabled', u'userDisabled', u'incompatible', u'blocklisted',
+        u'null',
+        # Locales.
+        u'en-US', u'en-GB', u'de', u'fr', u'es-ES', u'es-AR', u'es-MX',
+        u'es-CL', u'it', u'ja', u'ja-JP-mac', u'pl', u'pt-BR', u'pt-PT',
+        u'ru', u'nl', u'sv-SE', u'zh-CN', u'zh-TW', u'ko', u'cs', u'da',
+        u'fi', u'hu', u'tr', u'uk', u'el', u'ro', u'sk', u'ar', u'he',
+        u'id', u'vi', u'ca', u'nb-NO', u'nn-NO', u'bg', u'lt', u'sl',
+        u'sr', u'fa', u'th', u'et', u'lv', u'gl', u'eu', u'af', u'ga-IE',
+        u'mn', u'sq', u'hr', u'be', u'en-ZA', u'ms', u'bn-IN', u'hi-IN',
+        u'en-us', u'de-de', u'fr-fr',
+        # Download sources.
+        u'search', u'category', u'homepagepromo', u'homepagebrowse',
+        u'dp-btn-primary', u'dp-hc-upsell', u'discovery-pane',
+        u'discovery-details', u'discovery-upsell', u'addondetail',
+        u'addon-detail-version', u'api', u'collection', u'creatured',
+        u'featured', u'sharingapi', u'oftenusedwith', u'userprofile',
+        u'developers', u'recommended', u'external-sharing', u'mostpopular',
+        u'hotness', u'rating', u'created', u'updated', u'popular', u'None',
+    ),
+}
+CURRENT_VERSION = '1'
+
+_SHARED_INDEX = dict((version, dict((k, i) for i, k in enumerate(keys)))
+                     for version, keys in SHARED_KEYS.items())
+
+_double = struct.Struct('>d')
+
+
+def is_compact(value):
+    """Is ``value`` a string written by :func:`encode`?"""
+    return bool(value) and value[0] == MARKER
+
+
+def _write_varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _write(out, value, shared, seen):
+    if value is None:
+        out.append(T_NONE)
+    elif value is True:
+        out.append(T_TRUE)
+    elif value is False:
+        out.append(T_FALSE)
+    elif isinstance(value, (int, long)):
+        if 0 <= value < 0x80:
+            out.append(T_SMALL_INT | value)
+        elif value >= 0:
+            out.append(T_INT)
+            _write_varint(out, value)
+        else:
+            out.append(T_NEG_INT)
+            _write_varint(out, -value)
+    elif isinstance(value, float):
+        out.append(T_FLOAT)
+        out.extend(_double.pack(value))
+    elif isinstance(value, basestring):
+        if isinstance(value, str):
+            value = value.decode('utf8')
+        if value in shared:
+            out.append(T_SHARED)
+            _write_varint(out, shared[value])
+        elif value in seen:
+            out.append(T_BACKREF)
+            _write_varint(out, seen[value])
+        else:
+            seen[value] = len(seen)
+            data = value.encode('utf8')
+            out.append(T_STR)
+            _write_varint(out, len(data))
+            out.extend(data)
+    elif isinstance(value, dict):
+        out.append(T_DICT)
+        _write_varint(out, len(value))
+        for k, v in value.iteritems():
+            _write(out, k, shared, seen)
+            _write(out, v, shared, seen)
+    elif isinstance(value, (list, tuple)):
+        out.append(T_LIST)
+        _write_varint(out, len(value))
+        for v in value:
+            _write(out, v, shared, seen)
+    else:
+        raise TypeError('Cannot encode %r' % type(value))
+
+
+def encode(value, version=CURRENT_VERSION):
+    """
+    Encode ``value`` (normally a dict) as a compact string.
+
+    Raises TypeError for values that can't be represented, the same way
+    ``json.dumps`` does.
+    """
+    out = bytearray()
+    _write(out, value, _SHARED_INDEX[version], {})
+    return MARKER + version + base64.b64encode(str(out))
+
+
+def decode(value):
+    """
+    Decode a string written by :func:`encode`.
+
+    Raises ValueError if the payload is corrupt or uses an unknown dictionary.
+    """
+    if isinstance(value, unicode):
+        value = value.encode('ascii')
+    if not is_compact(value) or len(value) < 2:
+        raise ValueError('Not a compact stats value.')
+    try:
+        shared = SHARED_KEYS[value[1]]
+    except KeyError:
+        raise ValueError('Unknown compact stats version: %r' % value[1])
+    try:
+        data = bytearray(base64.b64decode(value[2:]))
+    except (TypeError, binascii.Error):
+        raise ValueError('Corrupt compact stats value.')
+
+    seen = []
+    # pos is a one item list so the nested readers can advance it.
+    pos = [0]
+
+    def varint():
+        n, shift = 0, 0
+        while True:
+            b = data[pos[0]]
+            pos[0] += 1
+            n |= (b & 0x7f) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def read():
+        tag = data[pos[0]]
+        pos[0] += 1
+        if tag & T_SMALL_INT:
+            return tag & 0x7f
+        elif tag == T_SHARED:
+            return shared[varint()]
+        elif tag == T_BACKREF:
+            return seen[varint()]
+        elif tag == T_STR:
+            length = varint()
+            start = pos[0]
+            pos[0] += length
+            s = str(data[start:pos[0]]).decode('utf8')
+            seen.append(s)
+            return s
+        elif tag == T_DICT:
+            d = {}
+            for i in xrange(varint()):
+                k = read()
+                d[k] = read()
+            return d
+        elif tag == T_INT:
+            return varint()
+        elif tag == T_NEG_INT:
+            return -varint()
+        elif tag == T_LIST:
+            return [read() for i in xrange(varint())]
+        elif tag == T_FLOAT:
+            start = pos[0]
+            pos[0] += 8
+            return _double.unpack(str(data[start:pos[0]]))[0]
+        elif tag == T_NONE:
+            return None
+        elif tag == T_TRUE:
+            return True
+        elif tag == T_FALSE:
+            return False
+        raise ValueError('Unknown compact stats tag: %r' % tag)
+
+    try:
+        result = read()
+    except (IndexError, UnicodeDecodeError):
+        raise ValueError('Corrupt compact stats value.')
+    if pos[0] != len(data):
+        raise ValueError('Trailing data in compact stats value.')
+    return result
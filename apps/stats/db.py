@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 import phpserialize as php
@@ -6,8 +7,15 @@ try:
 except ImportError:
     import json
 
+from . import compact
+
 
 class StatsDictField(models.TextField):
+    """
+    Reads dicts stored as serialized php, JSON or the compact encoding from
+    :mod:`stats.compact`. New values are written as JSON unless
+    ``settings.STATS_COMPACT_DICTS`` is set.
+    """
 
     description = 'A dictionary of counts stored as serialized php.'
     __metaclass__ = models.SubfieldBase
@@ -23,7 +31,12 @@ class StatsDictField(models.TextField):
             return value
 
         # string case
-        if value and value[0] in '[{':
+        if compact.is_compact(value):
+            try:
+                d = compact.decode(value)
+            except ValueError:
+                d = None
+        elif value and value[0] in '[{':
             # JSON
             try:
                 d = json.loads(value)
@@ -45,7 +58,18 @@ class StatsDictField(models.TextField):
         if value is None or value == '':
             return value
         try:
-            value = json.dumps(dict(value))
+            value = dict(value)
+        except (TypeError, ValueError):
+            return None
+        if settings.STATS_COMPACT_DICTS:
+            try:
+                return compact.encode(value)
+            except TypeError:
+                # Fall back to JSON for anything the compact format can't
+                # represent.
+                pass
+        try:
+            value = json.dumps(value)
         except TypeError:
             value = None
         return value
@@ -0,0 +1,176 @@
+import logging
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+from stats import compact
+from stats.db import StatsDictField
+from stats.models import Contribution, DownloadCount, UpdateCount
+
+log = logging.getLogger('z.stats')
+
+MODELS = {
+    'update': UpdateCount,
+    'download': DownloadCount,
+    'contribution': Contribution,
+}
+
+HELP = """\
+Rewrite StatsDictField columns using the compact encoding from stats.compact.
+
+Rows are processed in primary key order, `--batch` rows at a time, pausing
+`--sleep` seconds between batches so replication can keep up. Rows already
+in the compact format are skipped, so the command can be stopped and
+restarted (use `--start` to skip ahead).
+
+To limit the tables:
+
+    `--models=update,download`
+
+To measure storage and decode speed on a sample of rows instead of
+rewriting anything:
+
+    `--benchmark=5000`
+"""
+
+
+def dict_fields(model):
+    return [f for f in model._meta.fields if isinstance(f, StatsDictField)]
+
+
+def rewrite(value, field):
+    """
+    Return the compact encoding of a raw column value, or None if the value
+    should be left alone (empty, already compact, unparseable or not
+    representable).
+    """
+    if not value or compact.is_compact(value):
+        return None
+    d = field.to_python(value)
+    if d is None:
+        return None
+    try:
+        return compact.encode(d)
+    except TypeError:
+        return None
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--models', default=','.join(sorted(MODELS)),
+                    help='Tables to process, from: %s.' %
+                         ', '.join(sorted(MODELS))),
+        make_option('--batch', type='int', default=1000,
+                    help='Rows to rewrite per batch.'),
+        make_option('--sleep', type='float', default=0.5,
+                    help='Seconds to pause between batches.'),
+        make_option('--start', type='int', default=0,
+                    help='Only process rows with an id above this one.'),
+        make_option('--benchmark', type='int', default=0,
+                    help='Sample this many rows per table and report sizes '
+                         'and decode speed instead of rewriting.'),
+    )
+    help = HELP
+
+    def handle(self, *args, **kw):
+        names = [n.strip() for n in kw['models'].split(',') if n.strip()]
+        for name in names:
+            if name not in MODELS:
+                raise CommandError('Unknown model: %s' % name)
+
+        for name in names:
+            if kw['benchmark']:
+                benchmark(MODELS[name], kw['benchmark'])
+            else:
+                migrate(MODELS[name], kw['batch'], kw['sleep'], kw['start'])
+
+
+def migrate(model, batch, sleep, start):
+    fields = dict_fields(model)
+    columns = [f.column for f in fields]
+    table = model._meta.db_table
+    cursor = connection.cursor()
+    last, total, changed = start, 0, 0
+
+    while True:
+        rows = list(model.objects.filter(id__gt=last).order_by('id')
+                    .values_list('id', *[f.attname for f in fields])[:batch])
+        if not rows:
+            break
+        last = rows[-1][0]
+
+        for pos, (column, field) in enumerate(zip(columns, fields), 1):
+            updates = []
+            for row in rows:
+                value = rewrite(row[pos], field)
+                if value is not None:
+                    updates.append((value, row[0]))
+            if updates:
+                cursor.executemany('UPDATE %s SET %s=%%s WHERE id=%%s' %
+                                   (table, column), updates)
+                changed += len(updates)
+        transaction.commit_unless_managed()
+
+        total += len(rows)
+        log.info('[%s] Compacted %s values in %s rows, up to id %s.' %
+                 (table, changed, total, last))
+        if sleep:
+            time.sleep(sleep)
+
+    log.info('[%s] Done: %s values rewritten in %s rows.' %
+             (table, changed, total))
+
+
+def benchmark(model, sample):
+    fields = dict_fields(model)
+    table = model._meta.db_table
+    rows = (model.objects.order_by('-id')
+            .values_list(*[f.attname for f in fields])[:sample])
+
+    old_values, new_values = [], []
+    for row in rows:
+        for value, field in zip(row, fields):
+            if not value or compact.is_compact(value):
+                continue
+            d = field.to_python(value)
+            if d is None:
+                continue
+            try:
+                new = compact.encode(d)
+            except TypeError:
+                continue
+            old_values.append((value, field))
+            new_values.append(new)
+
+    if not old_values:
+        print '%s: no rows to sample.' % table
+        return
+
+    # What we'd write today if the row was saved again.
+    json_values = [json.dumps(field.to_python(v)) for v, field in old_values]
+
+    def timed(fn, values):
+        start = time.time()
+        for v in values:
+            fn(v)
+        return (time.time() - start) * 1e6 / len(values)
+
+    field = fields[0]
+    old_size = sum(len(v) for v, f in old_values)
+    json_size = sum(len(v) for v in json_values)
+    new_size = sum(len(v) for v in new_values)
+    print '%s: %s values from %s rows' % (table, len(old_values), len(rows))
+    print '  stored: %10d bytes  %6.1f us/decode' % (
+        old_size, timed(lambda pair: pair[1].to_python(pair[0]), old_values))
+    print '  json:   %10d bytes  %6.1f us/decode' % (
+        json_size, timed(field.to_python, json_values))
+    print '  compact:%10d bytes  %6.1f us/decode (%.0f%% of stored)' % (
+        new_size, timed(field.to_python, new_values),
+        100.0 * new_size / old_size)
@@ -4,6 +4,7 @@ import json
 
 from django.conf import settings
 from django.core import mail
+from django.core.management import call_command
 from django.db import models
 from django.test.client import RequestFactory
 from django.utils import translation
@@ -14,7 +15,8 @@ from nose.tools import eq_
 import amo
 import amo.tests
 from addons.models import Addon
-from stats.models import ClientData, Contribution
+from stats import compact
+from stats.models import ClientData, Contribution, UpdateCount
 from stats.db import StatsDictField
 from users.models import UserProfile
 from market.models import Refund
@@ -37,6 +39,61 @@ class TestStatsDictField(amo.tests.TestCase):
         val = {'a': 1}
         eq_(StatsDictField().to_python(json.dumps(val)), val)
 
+    def test_to_python_compact(self):
+        val = {u'{ec8030f7-c20a-464f-9b0e-13a3a9e97384}': {u'3.6': 10,
+                                                          u'4.0': 1000},
+               u'WINNT': 12, u'caf\xe9': -1, u'none': None, u'f': 1.5}
+        eq_(StatsDictField().to_python(compact.encode(val)), val)
+
+    def test_to_python_compact_corrupt(self):
+        eq_(StatsDictField().to_python('~1CQE='), None)
+        eq_(StatsDictField().to_python('~9CQA='), None)
+
+    def test_get_db_prep_value_json(self):
+        val = {'a': 1}
+        with self.settings(STATS_COMPACT_DICTS=False):
+            eq_(StatsDictField().get_db_prep_value(val, None), json.dumps(val))
+
+    def test_get_db_prep_value_compact(self):
+        val = {'a': 1, 'WINNT': 300}
+        with self.settings(STATS_COMPACT_DICTS=True):
+            prep = StatsDictField().get_db_prep_value(val, None)
+        assert compact.is_compact(prep)
+        eq_(compact.decode(prep), val)
+
+    def test_get_db_prep_value_compact_fallback(self):
+        val = {'a': object()}
+        with self.settings(STATS_COMPACT_DICTS=True):
+            eq_(StatsDictField().get_db_prep_value(val, None), None)
+
+
+class TestCompactStats(amo.tests.TestCase):
+
+    def setUp(self):
+        addon = Addon.objects.create(type=amo.ADDON_EXTENSION)
+        self.update = UpdateCount.objects.create(
+            addon=addon, count=5, date=datetime.today(),
+            oses={'WINNT': 4, 'Darwin': 1}, locales={'en-US': 5})
+
+    def raw(self, column):
+        return (UpdateCount.objects.filter(pk=self.update.pk)
+                .values_list(column, flat=True)[0])
+
+    def test_migrate(self):
+        assert not compact.is_compact(self.raw('oses'))
+        call_command('compact_stats', models='update', sleep=0)
+        assert compact.is_compact(self.raw('oses'))
+        assert compact.is_compact(self.raw('locales'))
+        eq_(self.raw('versions'), None)
+        update = UpdateCount.objects.get(pk=self.update.pk)
+        eq_(update.oses, {'WINNT': 4, 'Darwin': 1})
+        eq_(update.locales, {'en-US': 5})
+
+    def test_migrate_start(self):
+        call_command('compact_stats', models='update', sleep=0,
+                     start=self.update.pk)
+        assert not compact.is_compact(self.raw('oses'))
+
 
 class TestContributionModel(amo.tests.TestCase):
     fixtures = ['stats/test_models.json']
@@ -0,0 +1,50 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from celery import group
+
+from amo.utils import chunked
+from translations.fields import LinkifiedField, PurifiedField
+from translations.tasks import update_purified
+
+
+def purified_ids():
+    """Yield (kind, ids) for every purified and linkified field."""
+    for model in models.get_models():
+        for field in getattr(model._meta, 'translated_fields', []):
+            if isinstance(field, LinkifiedField):
+                kind = 'linkified'
+            elif isinstance(field, PurifiedField):
+                kind = 'purified'
+            else:
+                continue
+            ids = (model._base_manager.exclude(**{field.attname: None})
+                   .values_list(field.attname, flat=True))
+            yield kind, list(ids)
+
+
+class Command(BaseCommand):
+    """
+    Runs clean() again on every purified and linkified translation, in
+    parallel celery tasks, saving the ones whose output changed. Run it after
+    bumping `purifier_version` or upgrading bleach.
+
+    The output truncated to each of --lengths is cached as well, so pages
+    don't have to parse it on the way out.
+    """
+    option_list = BaseCommand.option_list + (
+        make_option('--lengths', default='250',
+                    help='Comma separated truncate lengths to cache.'),
+    )
+
+    def handle(self, *args, **options):
+        lengths = [int(l) for l in options['lengths'].split(',') if l]
+        grouping = []
+        for kind, ids in purified_ids():
+            for chunk in chunked(ids, 100):
+                grouping.append(update_purified.subtask(
+                    args=[kind, chunk], kwargs={'lengths': lengths}))
+        if grouping:
+            group(grouping).apply_async()
@@ -1,7 +1,12 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models, connection
 from django.utils import encoding
 
 import bleach
+import jinja2
 
 import amo.models
 from amo import urlresolvers
@@ -106,12 +111,34 @@ class Translation(amo.models.ModelBase):
 class PurifiedTranslation(Translation):
     """Run the string through bleach to get a safe, linkified version."""
 
+    # Bump this when clean() changes, so cached output isn't used and
+    # `manage.py warm_purified` redoes the stored output.
+    purifier_version = 1
+
     class Meta:
         proxy = True
 
+    def purified_cache_key(self, text, *extra):
+        """
+        The cache key for output made from `text` by this class's clean()
+        in the current bleach and outgoing URL configuration.
+        """
+        parts = [self.__class__.__name__, self.purifier_version,
+                 bleach.__version__, settings.REDIRECT_URL,
+                 settings.REDIRECT_SECRET_KEY, self.autoid, text]
+        key = hashlib.md5(':'.join(encoding.smart_str(p)
+                                   for p in parts + list(extra)))
+        return 'purified:%s' % key.hexdigest()
+
     def __unicode__(self):
         if not self.localized_string_clean:
-            self.clean()
+            # Only strings saved before the clean column existed get here.
+            key = self.purified_cache_key(self.localized_string)
+            self.localized_string_clean = cache.get(key)
+            if self.localized_string_clean is None:
+                self.clean()
+                cache.set(key, self.localized_string_clean,
+                          settings.PURIFIED_CACHE_TIMEOUT)
         return unicode(self.localized_string_clean)
 
     def __html__(self):
@@ -126,7 +153,13 @@ class PurifiedTranslation(Translation):
         self.localized_string_clean = clean_nl(linkified).strip()
 
     def __truncate__(self, length, killwords, end):
-        return utils.truncate(unicode(self), length, killwords, end)
+        html = unicode(self)
+        key = self.purified_cache_key(html, length, killwords, end)
+        short = cache.get(key)
+        if short is None:
+            short = unicode(utils.truncate(html, length, killwords, end))
+            cache.set(key, short, settings.PURIFIED_CACHE_TIMEOUT)
+        return jinja2.Markup(short)
 
 
 class LinkifiedTranslation(PurifiedTranslation):
@@ -0,0 +1,33 @@
+import logging
+
+from celeryutils import task
+
+from amo.decorators import write
+
+from .models import LinkifiedTranslation, PurifiedTranslation
+
+log = logging.getLogger('z.translations')
+
+KINDS = {'purified': PurifiedTranslation,
+         'linkified': LinkifiedTranslation}
+
+
+@task
+@write
+def update_purified(kind, ids, lengths=(), **kw):
+    """
+    Run clean() again on the translations in `ids`, saving the ones whose
+    output changed, and cache their output truncated to each of `lengths`.
+    """
+    log.info('[%s@%s] Updating %s translations starting at id: %s...'
+             % (len(ids), update_purified.rate_limit, kind, ids[0]))
+    cls = KINDS[kind]
+    for trans in cls.objects.filter(id__in=ids):
+        if trans.localized_string:
+            old = trans.localized_string_clean
+            trans.clean()
+            if trans.localized_string_clean != old:
+                cls.objects.filter(autoid=trans.autoid).update(
+                    localized_string_clean=trans.localized_string_clean)
+        for length in lengths:
+            trans.__truncate__(length, True, '...')
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 from django.conf import settings
+from django.core.cache import cache
 from django import test
 from django.utils import translation
 from django.utils.functional import lazy
 
 import jinja2
+import mock
 from nose.tools import eq_
 from test_utils import ExtraAppTestCase, trans_eq
 
@@ -13,6 +15,7 @@ from translations.models import (Translation, PurifiedTranslation,
                                  TranslationSequence)
 from translations import widgets
 from translations.query import order_by_translation
+from translations.tasks import update_purified
 
 
 def ids(qs):
@@ -383,3 +386,44 @@ def test_comparison_with_lazy():
     lazy_u = lazy(lambda x: x, unicode)
     x == lazy_u('xxx')
     lazy_u('xxx') == x
+
+
+class TestPurifiedCache(test.TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_truncate_cached(self):
+        x = PurifiedTranslation(localized_string=u'<b>heyhey</b> ho')
+        with mock.patch('translations.models.utils.truncate') as truncate:
+            truncate.return_value = jinja2.Markup(u'<b>hey</b>...')
+            eq_(x.__truncate__(3, True, '...'), u'<b>hey</b>...')
+            eq_(x.__truncate__(3, True, '...'), u'<b>hey</b>...')
+            eq_(truncate.call_count, 1)
+            x.__truncate__(4, True, '...')
+            eq_(truncate.call_count, 2)
+
+    def test_truncate_changed(self):
+        x = PurifiedTranslation(localized_string=u'<b>heyhey</b> ho')
+        assert x.__truncate__(3, True, '...').startswith('<b>')
+        x = PurifiedTranslation(localized_string=u'<i>heyhey</i> ho')
+        assert x.__truncate__(3, True, '...').startswith('<i>')
+
+    def test_clean_cached(self):
+        s = u'<script>x</script>'
+        with mock.patch('translations.models.bleach.clean') as clean:
+            clean.return_value = u'&lt;script&gt;'
+            first = unicode(PurifiedTranslation(localized_string=s))
+            eq_(unicode(PurifiedTranslation(localized_string=s)), first)
+            eq_(clean.call_count, 1)
+
+    def test_update_purified(self):
+        trans = PurifiedTranslation.objects.create(
+            id=999, locale='en-US', localized_string=u'<script>x</script>')
+        PurifiedTranslation.objects.filter(autoid=trans.autoid).update(
+            localized_string_clean='stale')
+        update_purified('purified', [999], lengths=[250])
+        trans = PurifiedTranslation.objects.get(autoid=trans.autoid)
+        eq_(trans.localized_string_clean, u'&lt;script&gt;x&lt;/script&gt;')
+        key = trans.purified_cache_key(unicode(trans), 250, True, '...')
+        eq_(cache.get(key), u'&lt;script&gt;x&lt;/script&gt;')
@@ -8,6 +8,7 @@ from django.db.utils import IntegrityError
 import jingo
 
 from access.admin import GroupUserInline
+from amo.utils import CachedCountPaginator
 from .models import UserProfile, BlacklistedUsername, BlacklistedEmailDomain
 from . import forms
 
@@ -41,6 +42,14 @@ class UserAdmin(admin.ModelAdmin):
     search_fields_response = 'email'
     inlines = (GroupUserInline,)
 
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # There are too many users to count them on every page view.
+        return CachedCountPaginator(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            estimate_over=settings.ESTIMATED_COUNT_THRESHOLD)
+
     # XXX TODO: Ability to edit the picture
     # XXX TODO: Ability to change the password (use AdminPasswordChangeForm)
     fieldsets = (
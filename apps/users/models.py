@@ -469,7 +469,7 @@ class UserProfile(amo.models.OnChangeMixin, amo.models.ModelBase):
         from amo.utils import memoize
         from market.models import AddonPurchase
 
-        @memoize(prefix='users:purchase-ids')
+        @memoize(prefix='users:purchase-ids', lock=True)
         def ids(pk):
             return (AddonPurchase.objects.filter(user=pk)
                                  .values_list('addon_id', flat=True)
@@ -59,7 +59,11 @@ def version_dict(version):
     return d
 
 
-def version_int(version):
+def _version_int(version):
+    """
+    The plain version of version_int, which it must agree with. Kept for
+    the tests and bench_versions.
+    """
     d = version_dict(smart_str(version))
     for key in ['alpha_ver', 'major', 'minor1', 'minor2', 'minor3',
                 'pre_ver']:
@@ -73,3 +77,62 @@ def version_int(version):
             d['minor2'], d['minor3'], d['alpha'], d['alpha_ver'], d['pre'],
             d['pre_ver'])
     return min(int(v), MAXVERSION)
+
+
+# version_int of strings seen before. It's emptied when it gets to
+# VERSION_INT_CACHE_SIZE, the same few versions come up over and over.
+VERSION_INT_CACHE_SIZE = 10000
+_version_ints = {}
+ALPHAS = {'a': 0, 'b': 1}
+
+
+def _number(part):
+    if not part:
+        return 0
+    return 99 if part == '*' else int(part)
+
+
+def _parse(version):
+    match = version_re.match(version)
+    if match is None:
+        # What no version at all comes to.
+        return 200100
+    (major, minor1, minor2, minor3, alpha, alpha_ver, pre,
+     pre_ver) = match.groups()
+    major, minor1, minor2, minor3, alpha_ver, pre_ver = (
+        _number(major), _number(minor1), _number(minor2), _number(minor3),
+        _number(alpha_ver), _number(pre_ver))
+    alpha = ALPHAS.get(alpha, 2)
+    pre = 0 if pre else 1
+    if minor1 > 99 or minor2 > 99 or minor3 > 99 or alpha_ver > 99:
+        # Wider parts push the others along, as they do in _version_int.
+        v = int('%d%02d%02d%02d%d%02d%d%02d' % (
+            major, minor1, minor2, minor3, alpha, alpha_ver, pre, pre_ver))
+    else:
+        v = (major * 1000000000000 + minor1 * 10000000000 +
+             minor2 * 100000000 + minor3 * 1000000 + alpha * 100000 +
+             alpha_ver * 1000 + pre * 100 + pre_ver)
+    return min(v, MAXVERSION)
+
+
+def version_int(version):
+    """Turn a version string into an integer which sorts like the version."""
+    version = smart_str(version)
+    try:
+        return _version_ints[version]
+    except KeyError:
+        if len(_version_ints) >= VERSION_INT_CACHE_SIZE:
+            _version_ints.clear()
+        v = _version_ints[version] = _parse(version)
+        return v
+
+
+def version_ints(versions):
+    """version_int of each of `versions`, as a list."""
+    cached = _version_ints.get
+    ints = []
+    for version in versions:
+        version = smart_str(version)
+        v = cached(version)
+        ints.append(version_int(version) if v is None else v)
+    return ints
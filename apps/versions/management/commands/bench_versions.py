@@ -0,0 +1,57 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from applications.models import AppVersion
+from versions import compare
+from versions.models import Version
+
+HELP = 'Time turning version strings into version_ints'
+
+
+class Command(BaseCommand):
+    """
+    Times version_int on the app versions and the latest add-on versions
+    in the database: the plain implementation, the parser on its own, with
+    the cache warm and version_ints on the whole list.
+
+    Usage:
+
+        python manage.py bench_versions --versions=50000 --rounds=5
+
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--versions', type='int', default=50000,
+                    help='Number of add-on versions to use.'),
+        make_option('--rounds', type='int', default=3,
+                    help='Number of times to convert them all.'),
+    )
+    help = HELP
+
+    def handle(self, *args, **kw):
+        versions = list(AppVersion.objects.values_list('version', flat=True))
+        versions += list(Version.objects.order_by('-id')
+                         .values_list('version', flat=True)[:kw['versions']])
+        rounds = kw['rounds']
+
+        def run(fn, clear=False):
+            start = time.time()
+            for i in xrange(rounds):
+                if clear:
+                    compare._version_ints.clear()
+                fn()
+            return len(versions) * rounds / (time.time() - start)
+
+        print '%s versions, %s distinct' % (len(versions), len(set(versions)))
+        print '_version_int:  %10.0f/s' % run(
+            lambda: [compare._version_int(v) for v in versions])
+        print '_parse:        %10.0f/s' % run(
+            lambda: [compare._parse(v) for v in versions])
+        print 'version_int:   %10.0f/s' % run(
+            lambda: [compare.version_int(v) for v in versions])
+        print 'version_ints:  %10.0f/s' % run(
+            lambda: compare.version_ints(versions))
+        print 'uncached:      %10.0f/s' % run(
+            lambda: compare.version_ints(versions), clear=True)
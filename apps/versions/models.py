@@ -330,9 +330,10 @@ class Version(amo.models.ModelBase):
         if not cos:
             return []
         app_versions = []
+        vint = version_int(self.version)
         for co in cos:
             for range in co.collapsed_ranges():
-                if (version_int(range.min) <= version_int(self.version)
+                if (version_int(range.min) <= vint
                                            <= version_int(range.max)):
                     app_versions.extend([(a.min, a.max) for a in range.apps])
         return app_versions
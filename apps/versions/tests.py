@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import hashlib
+import random
 
 from datetime import datetime, timedelta
 from django.conf import settings
@@ -23,8 +24,9 @@ from files.tests.test_models import UploadTest
 from users.models import UserProfile
 from versions import views
 from versions.models import Version, ApplicationsVersions
-from versions.compare import (MAXVERSION, version_int, dict_from_int,
-                              version_dict)
+from versions import compare
+from versions.compare import (MAXVERSION, version_int, version_ints,
+                              dict_from_int, version_dict)
 
 
 def test_version_int():
@@ -66,6 +68,41 @@ def test_version_int_unicode():
     eq_(version_int(u'\u2322 ugh stephend'), 200100)
 
 
+# Pieces of version strings, likely and unlikely.
+VERSION_PARTS = ['0', '1', '5', '05', '10', '99', '100', '123456', '*', '.',
+                 'a', 'b', '|', 'pre', 'x', '-', ' ', u'\u2322', '9' * 20]
+
+
+def random_versions(count, seed=0):
+    rand = random.Random(seed)
+    for i in xrange(count):
+        yield ''.join(rand.choice(VERSION_PARTS)
+                      for j in xrange(rand.randint(0, 8)))
+
+
+def test_version_int_matches_version_dict():
+    for version in random_versions(20000):
+        eq_(version_int(version), compare._version_int(version),
+            'version_int(%r)' % version)
+    for version in (None, 3, 3.5, MAXVERSION, '3.6.*', '4.0b12pre3'):
+        eq_(version_int(version), compare._version_int(version))
+
+
+def test_version_ints():
+    versions = list(random_versions(100, seed=1)) + [None, '3.6.*']
+    eq_(version_ints(versions), [compare._version_int(v) for v in versions])
+    eq_(version_ints(iter(['1.0', '2.0'])),
+        [version_int('1.0'), version_int('2.0')])
+
+
+@mock.patch.object(compare, 'VERSION_INT_CACHE_SIZE', 3)
+def test_version_int_cache_bounded():
+    compare._version_ints.clear()
+    version_ints(['1.0', '2.0', '3.0', '4.0'])
+    eq_(compare._version_ints, {'4.0': version_int('4.0')})
+    eq_(version_int('3.0'), 3000000200100)
+
+
 def test_dict_from_int():
     d = dict_from_int(3050000001002)
     eq_(d['major'], 3)
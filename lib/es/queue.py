@@ -0,0 +1,106 @@
+"""
+Coalesce search index updates.
+
+Saving a model several times in quick succession (a developer edit, a review
+action...) used to fire one full index task per save. Instead, callers queue
+ids here:
+
+    queue.register('webapps', index_webapps)
+    queue.add('webapps', [app.id])
+
+The first `add` for an id sets a marker in the cache and schedules a single
+index task ES_INDEX_QUEUE_WINDOW seconds later. Further adds during that
+window find the marker and do nothing. The task clears the markers before it
+indexes, so saves made while it runs are picked up by the next one.
+
+Sending `lib.es.signals.process` (see `lib.es.decorators.send` and
+`lib.es.context.send`) indexes everything this thread queued right away, for
+tests and admin actions that need the change visible immediately.
+"""
+from threading import local
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished
+
+import commonware.log
+from celery.signals import task_postrun
+from celeryutils import task
+
+from lib.es.signals import process, reset
+
+log = commonware.log.getLogger('z.es')
+
+# Index tasks by queue name, filled by `register`.
+_tasks = {}
+# Ids queued by this thread since the last flush, by queue name.
+_queued = local()
+
+
+def register(name, index_task):
+    """Register `index_task`, which takes a list of ids, as queue `name`."""
+    _tasks[name] = index_task
+
+
+def _key(name, id):
+    return 'index-queue:%s:%s' % (name, id)
+
+
+def _pending():
+    if not hasattr(_queued, 'ids'):
+        _queued.ids = {}
+    return _queued.ids
+
+
+def add(name, ids):
+    """Queue `ids` to be indexed by the task registered as `name`."""
+    window = settings.ES_INDEX_QUEUE_WINDOW
+    if not window:
+        _tasks[name].delay(ids)
+        return
+
+    _pending().setdefault(name, set()).update(ids)
+    # cache.add() only succeeds for the first caller, so each id gets
+    # scheduled at most once per window. The timeout only matters if the
+    # task is lost.
+    new = [id for id in ids if cache.add(_key(name, id), 1, window + 300)]
+    if new:
+        drain.apply_async(args=[name, new], countdown=window)
+
+
+@task(acks_late=True)
+def drain(name, ids, **kw):
+    cache.delete_many([_key(name, id) for id in ids])
+    # No need to flush these again if the task ran in this thread.
+    _pending().get(name, set()).difference_update(ids)
+    log.info('Indexing %s queued %s.' % (len(ids), name))
+    _tasks[name](ids)
+
+
+def flush(sender=None, **kw):
+    """Index everything this thread has queued now."""
+    pending, _queued.ids = _pending(), {}
+    for name, ids in pending.items():
+        if ids:
+            _tasks[name](sorted(ids))
+
+
+def clear(sender=None, **kw):
+    """Forget what this thread has queued. Scheduled tasks still run."""
+    _queued.ids = {}
+
+
+def clear_task(sender=None, task=None, **kw):
+    """
+    Celery workers never finish a request, so forget what each task queued
+    once it's done. Eager tasks run within their caller, which may still
+    want its queue.
+    """
+    if not task.request.is_eager:
+        clear()
+
+
+process.connect(flush, dispatch_uid='lib.es.queue.flush')
+reset.connect(clear, dispatch_uid='lib.es.queue.clear')
+request_finished.connect(clear, dispatch_uid='lib.es.queue.clear')
+task_postrun.connect(clear_task, dispatch_uid='lib.es.queue.clear_task')
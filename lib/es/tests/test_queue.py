@@ -0,0 +1,93 @@
+from django.core.cache import cache
+
+from celery.signals import task_postrun
+import mock
+from nose.tools import eq_
+
+import amo.tests
+from lib.es import queue
+from lib.es.signals import process, reset
+
+
+class TestQueue(amo.tests.TestCase):
+
+    def setUp(self):
+        cache.clear()
+        reset.send(None)
+        self.index = mock.Mock()
+        queue.register('test', self.index)
+        patcher = mock.patch.object(queue.drain, 'apply_async')
+        self.drain = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(queue._tasks.pop, 'test')
+
+    def test_coalesce(self):
+        with self.settings(ES_INDEX_QUEUE_WINDOW=10):
+            queue.add('test', [1])
+            queue.add('test', [1, 2])
+            queue.add('test', [2])
+        eq_(self.drain.call_count, 2)
+        eq_(self.drain.call_args_list[0][1],
+            {'args': ['test', [1]], 'countdown': 10})
+        eq_(self.drain.call_args_list[1][1],
+            {'args': ['test', [2]], 'countdown': 10})
+        assert not self.index.called
+
+    def test_drain(self):
+        with self.settings(ES_INDEX_QUEUE_WINDOW=10):
+            queue.add('test', [1, 2])
+            queue.drain('test', [1, 2])
+            self.index.assert_called_with([1, 2])
+            # The markers are gone so the next save schedules a new task.
+            queue.add('test', [1])
+        eq_(self.drain.call_count, 2)
+
+    def test_drain_clears_pending(self):
+        with self.settings(ES_INDEX_QUEUE_WINDOW=10):
+            queue.add('test', [1, 2])
+            queue.drain('test', [1])
+        self.index.reset_mock()
+        process.send(None)
+        self.index.assert_called_with([2])
+
+    def test_process(self):
+        with self.settings(ES_INDEX_QUEUE_WINDOW=10):
+            queue.add('test', [3, 1])
+            queue.add('test', [2])
+        process.send(None)
+        self.index.assert_called_with([1, 2, 3])
+        self.index.reset_mock()
+        process.send(None)
+        assert not self.index.called
+
+    def test_reset(self):
+        with self.settings(ES_INDEX_QUEUE_WINDOW=10):
+            queue.add('test', [1])
+        reset.send(None)
+        process.send(None)
+        assert not self.index.called
+
+    def test_no_window(self):
+        with self.settings(ES_INDEX_QUEUE_WINDOW=0):
+            queue.add('test', [1])
+            queue.add('test', [1])
+        eq_(self.index.delay.call_count, 2)
+        assert not self.drain.called
+
+    def test_task_postrun(self):
+        with self.settings(ES_INDEX_QUEUE_WINDOW=10):
+            queue.add('test', [1])
+        task = mock.Mock()
+        task.request.is_eager = False
+        task_postrun.send(sender=task, task=task)
+        process.send(None)
+        assert not self.index.called
+
+    def test_eager_task_postrun(self):
+        with self.settings(ES_INDEX_QUEUE_WINDOW=10):
+            queue.add('test', [1])
+        task = mock.Mock()
+        task.request.is_eager = True
+        task_postrun.send(sender=task, task=task)
+        process.send(None)
+        self.index.assert_called_with([1])
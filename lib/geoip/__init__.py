@@ -6,17 +6,27 @@ from django_statsd.clients import statsd
 
 from mkt import regions
 
+from .local import LocalGeoIP
+
 log = logging.getLogger('z.geoip')
 
 
 class GeoIP:
-    """Call to geodude server to resolve an IP to Geo Info block."""
+    """
+    Resolve an IP to a country code, using the local database if there is
+    one and falling back to the geodude server.
+    """
 
     def __init__(self, settings):
         self.timeout = float(getattr(settings, 'GEOIP_DEFAULT_TIMEOUT', .2))
         self.url = getattr(settings, 'GEOIP_URL', '')
         self.default_val = getattr(settings, 'GEOIP_DEFAULT_VAL',
                                    regions.WORLDWIDE.slug).lower()
+        self.local = None
+        db_path = getattr(settings, 'GEOIP_DB_PATH', '')
+        if db_path:
+            self.local = LocalGeoIP(
+                db_path, getattr(settings, 'GEOIP_DB_RELOAD_INTERVAL', 60))
 
     def lookup(self, address):
         """Resolve an IP address to a block of geo information.
@@ -25,6 +35,12 @@ class GeoIP:
         return the default as defined by the settings, or "worldwide".
 
         """
+        if self.local:
+            res = self.local.lookup(address)
+            if res:
+                return res
+            statsd.incr('z.geoip.local.miss')
+
         if self.url and waffle.switch_is_active('geoip-geodude'):
             with statsd.timer('z.geoip'):
                 res = None
@@ -0,0 +1,169 @@
+"""
+An in-process IPv4 -> country lookup.
+
+The database is a flat file built by :func:`compile_csv` and memory mapped,
+so every worker on a box shares the same pages. It contains::
+
+    header:    MAGIC, range count (n), country count (c)
+    starts:    n big-endian uint32, sorted ascending
+    ends:      n big-endian uint32
+    countries: n uint8, index into the country table
+    table:     c two letter country codes
+
+A lookup is a binary search over `starts`.
+"""
+import csv
+import logging
+import mmap
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+
+log = logging.getLogger('z.geoip')
+
+MAGIC = 'ZGEOIP01'
+HEADER = struct.Struct('>8sII')
+UINT32 = struct.Struct('>I')
+
+
+def ip_to_int(address):
+    """Return an IPv4 address as an int, or None if it isn't one."""
+    try:
+        return UINT32.unpack(socket.inet_aton(address))[0]
+    except (socket.error, TypeError, UnicodeEncodeError):
+        return None
+
+
+def compile_csv(src, dest):
+    """
+    Compile a GeoIP country CSV into a database file for :class:`LocalGeoIP`.
+
+    `src` is an open file in the MaxMind GeoIP Country CSV layout (start ip,
+    end ip, start number, end number, country code, country name). `dest` is
+    replaced atomically so running workers never see a partial file.
+
+    Returns the number of ranges written.
+    """
+    ranges = []
+    for row in csv.reader(src):
+        if len(row) < 5:
+            continue
+        try:
+            start, end = int(row[2]), int(row[3])
+        except ValueError:
+            # Probably a header line.
+            continue
+        ranges.append((start, end, row[4].strip().lower()))
+    ranges.sort()
+
+    codes = sorted(set(r[2] for r in ranges))
+    if len(codes) > 255:
+        raise ValueError('Too many countries: %s' % len(codes))
+    index = dict((c, i) for i, c in enumerate(codes))
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dest)))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(ranges), len(codes)))
+        f.write(struct.pack('>%sI' % len(ranges), *[r[0] for r in ranges]))
+        f.write(struct.pack('>%sI' % len(ranges), *[r[1] for r in ranges]))
+        f.write(struct.pack('%sB' % len(ranges),
+                            *[index[r[2]] for r in ranges]))
+        f.write(''.join(c[:2].ljust(2) for c in codes))
+    os.chmod(tmp, 0644)
+    os.rename(tmp, dest)
+    return len(ranges)
+
+
+class LocalGeoIP(object):
+    """
+    Resolve IPv4 addresses to lower case country codes from a database file
+    built by :func:`compile_csv`.
+
+    The file is checked for changes at most every `reload_interval` seconds
+    and reopened when it is replaced. If the file is missing or broken,
+    lookups return None so callers can fall back to something else.
+    """
+
+    def __init__(self, path, reload_interval=60):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._data = None
+        self._stat = None
+        self._load()
+        self._checked = time.time()
+
+    def _load(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            if self._data is not None:
+                log.error('GeoIP database went away: %s' % self.path)
+            self._data, self._stat = None, None
+            return
+
+        key = (st.st_ino, st.st_mtime, st.st_size)
+        if key == self._stat:
+            return
+
+        try:
+            with open(self.path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, countries = HEADER.unpack_from(data, 0)
+            if magic != MAGIC:
+                raise ValueError('Bad magic: %r' % magic)
+            starts = HEADER.size
+            ends = starts + count * 4
+            index = ends + count * 4
+            table = index + count
+            if len(data) != table + countries * 2:
+                raise ValueError('Truncated file')
+        except (EnvironmentError, ValueError, struct.error) as e:
+            log.error('Could not load GeoIP database %s: %s' % (self.path, e))
+            return
+
+        codes = [data[table + i * 2:table + i * 2 + 2].strip()
+                 for i in range(countries)]
+        self._data = (data, count, starts, ends, index, codes)
+        self._stat = key
+        log.info('Loaded GeoIP database %s (%s ranges).' % (self.path, count))
+
+    def _maybe_reload(self):
+        now = time.time()
+        if now - self._checked < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked < self.reload_interval:
+                return
+            self._checked = now
+            self._load()
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def lookup(self, address):
+        """Return the country code for `address`, or None if unknown."""
+        self._maybe_reload()
+        data = self._data
+        ip = ip_to_int(address)
+        if data is None or ip is None:
+            return None
+
+        mm, count, starts, ends, index, codes = data
+        unpack = UINT32.unpack_from
+        # Find the last range starting at or before the address.
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if unpack(mm, starts + mid * 4)[0] <= ip:
+                lo = mid + 1
+            else:
+                hi = mid
+        pos = lo - 1
+        if pos < 0 or unpack(mm, ends + pos * 4)[0] < ip:
+            return None
+        return codes[ord(mm[index + pos])]
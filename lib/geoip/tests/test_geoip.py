@@ -1,3 +1,8 @@
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+
 import mock
 import requests
 from nose.tools import eq_
@@ -5,11 +10,19 @@ from nose.tools import eq_
 import amo.tests
 
 from lib.geoip import GeoIP
+from lib.geoip.local import compile_csv, LocalGeoIP
+
+CSV = '''\
+"1.0.0.0","1.0.0.255","16777216","16777471","AU","Australia"
+"2.0.0.0","2.255.255.255","33554432","50331647","FR","France"
+"1.0.1.0","1.0.3.255","16777472","16778239","CN","China"
+'''
 
 
-def generate_settings(url='', default='worldwide', timeout=0.2):
+def generate_settings(url='', default='worldwide', timeout=0.2, db_path=''):
     return mock.Mock(GEOIP_URL=url, GEOIP_DEFAULT_VAL=default,
-                     GEOIP_DEFAULT_TIMEOUT=timeout)
+                     GEOIP_DEFAULT_TIMEOUT=timeout, GEOIP_DB_PATH=db_path,
+                     GEOIP_DB_RELOAD_INTERVAL=0)
 
 
 class GeoIPTest(amo.tests.TestCase):
@@ -70,3 +83,64 @@ class GeoIPTest(amo.tests.TestCase):
         mock_post.assert_called_with('{0}/country.json'.format(url),
                                      timeout=0.2, data={'ip': ip})
         eq_(result, 'worldwide')
+
+
+class LocalGeoIPTest(amo.tests.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'geoip.dat')
+        compile_csv(StringIO(CSV), self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_lookup(self):
+        geoip = LocalGeoIP(self.path)
+        eq_(geoip.lookup('1.0.0.0'), 'au')
+        eq_(geoip.lookup('1.0.0.255'), 'au')
+        eq_(geoip.lookup('1.0.2.1'), 'cn')
+        eq_(geoip.lookup('2.1.1.1'), 'fr')
+
+    def test_unknown(self):
+        geoip = LocalGeoIP(self.path)
+        eq_(geoip.lookup('0.0.0.1'), None)
+        eq_(geoip.lookup('1.0.4.0'), None)
+        eq_(geoip.lookup('3.0.0.0'), None)
+        eq_(geoip.lookup('::1'), None)
+        eq_(geoip.lookup(None), None)
+
+    def test_missing_file(self):
+        geoip = LocalGeoIP(os.path.join(self.dir, 'nope.dat'))
+        assert not geoip.loaded
+        eq_(geoip.lookup('1.0.0.1'), None)
+
+    def test_bad_file(self):
+        with open(self.path, 'w') as f:
+            f.write('not a database')
+        geoip = LocalGeoIP(self.path)
+        assert not geoip.loaded
+
+    def test_reload(self):
+        geoip = LocalGeoIP(self.path, reload_interval=0)
+        eq_(geoip.lookup('2.1.1.1'), 'fr')
+        compile_csv(StringIO(CSV.replace('"FR","France"', '"DE","Germany"')),
+                    self.path)
+        eq_(geoip.lookup('2.1.1.1'), 'de')
+
+    @mock.patch('requests.post')
+    def test_geoip_uses_local(self, mock_post):
+        self.create_switch(name='geoip-geodude', active=True)
+        geoip = GeoIP(generate_settings(url='localhost', db_path=self.path))
+        eq_(geoip.lookup('1.0.0.1'), 'au')
+        assert not mock_post.called
+
+    @mock.patch('requests.post')
+    def test_geoip_falls_back(self, mock_post):
+        self.create_switch(name='geoip-geodude', active=True)
+        mock_post.return_value = mock.Mock(status_code=200, json=lambda: {
+            'country_code': 'US',
+        })
+        geoip = GeoIP(generate_settings(url='localhost', db_path=self.path))
+        eq_(geoip.lookup('3.0.0.0'), 'us')
+        assert mock_post.called
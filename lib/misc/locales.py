@@ -0,0 +1,85 @@
+"""
+Locale negotiation shared by the site middleware and the services/ WSGI apps.
+
+This only needs a settings object, so it's safe to use from services/
+without importing the rest of zamboni.
+"""
+import collections
+import threading
+
+from django.utils.translation.trans_real import parse_accept_lang_header
+
+
+class LocaleNegotiator(object):
+    """
+    Pick one of our locales for an Accept-Language header.
+
+    The lookup tables are built from `settings` once, and rebuilt if
+    LANGUAGE_URL_MAP, SHORTER_LANGUAGES or LANGUAGE_CODE are replaced (as
+    tests do). Results for the last `size` headers seen are remembered,
+    since browsers send the same few headers over and over.
+    """
+
+    def __init__(self, settings, size=500):
+        self.settings = settings
+        self.size = size
+        self._lock = threading.Lock()
+        self._source = None
+        self._results = collections.OrderedDict()
+
+    def _tables(self):
+        s = self.settings
+        source = (s.LANGUAGE_URL_MAP, s.SHORTER_LANGUAGES, s.LANGUAGE_CODE)
+        current = self._source
+        if current and all(a is b for a, b in zip(source, current[0])):
+            return current[1]
+
+        # Map all our lang codes to the locale code.
+        langs = dict((k.lower(), v) for k, v in s.LANGUAGE_URL_MAP.items())
+        # And language prefixes, upgraded to a longer one if needed
+        # (zh > zh-CN), or downgraded if we have it (es-PE > es).
+        prefixes = {}
+        for prefix, lookup in s.SHORTER_LANGUAGES.items():
+            if lookup.lower() in langs:
+                prefixes[prefix.lower()] = langs[lookup.lower()]
+        prefixes.update(langs)
+
+        tables = (langs, prefixes, s.LANGUAGE_CODE)
+        with self._lock:
+            self._source = (source, tables)
+            self._results.clear()
+        return tables
+
+    def find(self, lang):
+        """Return our locale for the language code `lang`, or None."""
+        langs, prefixes, default = self._tables()
+        lang = lang.lower()
+        return langs.get(lang) or prefixes.get(lang.split('-')[0])
+
+    def from_header(self, header):
+        """
+        Return our locale for an Accept-Language header, or LANGUAGE_CODE if
+        none of the languages in it are supported.
+        """
+        langs, prefixes, default = self._tables()
+        with self._lock:
+            locale = self._results.pop(header, None)
+            if locale is not None:
+                # Move it to the end, the most recently used.
+                self._results[header] = locale
+                return locale
+
+        locale = default
+        for lang, _ in parse_accept_lang_header(header.lower()):
+            found = langs.get(lang) or prefixes.get(lang.split('-')[0])
+            if found:
+                locale = found
+                break
+
+        # Don't let giant headers push everyone else out.
+        if len(header) <= 255:
+            with self._lock:
+                self._results[header] = locale
+                while len(self._results) > self.size:
+                    self._results.popitem(last=False)
+        return locale
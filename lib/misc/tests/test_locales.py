@@ -0,0 +1,47 @@
+import mock
+from nose.tools import eq_
+
+import amo.tests
+from lib.misc.locales import LocaleNegotiator
+
+
+class TestLocaleNegotiator(amo.tests.TestCase):
+
+    def setUp(self):
+        self.settings_ = mock.Mock()
+        self.settings_.LANGUAGE_URL_MAP = {'en-us': 'en-US', 'es': 'es',
+                                           'zh-cn': 'zh-CN', 'fr': 'fr'}
+        self.settings_.SHORTER_LANGUAGES = {'en': 'en-US', 'zh': 'zh-CN'}
+        self.settings_.LANGUAGE_CODE = 'en-US'
+        self.negotiator = LocaleNegotiator(self.settings_, size=2)
+
+    def test_from_header(self):
+        for header, expected in (('', 'en-US'),
+                                 ('xx', 'en-US'),
+                                 ('es-PE', 'es'),
+                                 ('zh', 'zh-CN'),
+                                 ('EN-US', 'en-US'),
+                                 ('xx, fr;q=0.5, es;q=0.8', 'es')):
+            eq_(self.negotiator.from_header(header), expected)
+
+    def test_find(self):
+        eq_(self.negotiator.find('fr-FR'), 'fr')
+        eq_(self.negotiator.find('zh'), 'zh-CN')
+        eq_(self.negotiator.find('xx'), None)
+
+    @mock.patch('lib.misc.locales.parse_accept_lang_header')
+    def test_cached(self, parse):
+        parse.return_value = [('fr', 1.0)]
+        eq_(self.negotiator.from_header('fr'), 'fr')
+        eq_(self.negotiator.from_header('fr'), 'fr')
+        eq_(parse.call_count, 1)
+
+    def test_size(self):
+        for header in ('fr', 'es', 'zh'):
+            self.negotiator.from_header(header)
+        eq_(self.negotiator._results.keys(), ['es', 'zh'])
+
+    def test_settings_changed(self):
+        eq_(self.negotiator.from_header('fr'), 'fr')
+        self.settings_.LANGUAGE_URL_MAP = {'en-us': 'en-US'}
+        eq_(self.negotiator.from_header('fr'), 'en-US')
@@ -3,15 +3,23 @@ import urllib
 import uuid
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Model
 
+from django_statsd.clients import statsd
+
 from base import Client, Encoder, SolitudeError
 from errors import pre_approval_codes
 
 from amo.helpers import absolutify, urlparams
 from amo.urlresolvers import reverse
+from amo.utils import cache_ns_key
 
 client = None
+clients = {}
+
+# Lookups of these are cached, writes to them clear the cache.
+CACHED = ('buyer', 'seller')
 
 
 def model_to_uid(model):
@@ -40,9 +48,38 @@ class ZamboniClient(Client):
     Error = SolitudeError
 
     def get(self, url):
-        url = '%s%s' % (self.config['server'], url)
         return self.call(url, 'get')
 
+    def wrapped(self, target=None, method=None, **kw):
+        """
+        Lookups of buyers and sellers, which purchases make over and over,
+        are cached for SOLITUDE_LOOKUP_TIMEOUT seconds. Only those that
+        found something are, so nothing gets created twice.
+        """
+        if target[1] not in CACHED:
+            return super(ZamboniClient, self).wrapped(target=target,
+                                                      method=method, **kw)
+        namespace = 'solitude:%s' % target[1]
+        if method != 'get':
+            res = super(ZamboniClient, self).wrapped(target=target,
+                                                     method=method, **kw)
+            cache_ns_key(namespace, increment=True)
+            return res
+
+        url = self.wrapped_url(target, kw.get('pk'), kw.get('filters'))
+        key = '%s:%s' % (cache_ns_key(namespace),
+                         hashlib.md5(url).hexdigest())
+        res = cache.get(key)
+        if res is not None:
+            statsd.incr('solitude.cache.hit')
+            return res
+        statsd.incr('solitude.cache.miss')
+        res = super(ZamboniClient, self).wrapped(target=target, method=method,
+                                                 **kw)
+        if res.get('meta', {}).get('total_count', 1):
+            cache.set(key, res, settings.SOLITUDE_LOOKUP_TIMEOUT)
+        return res
+
     def lookup_transaction(self, tx_uuid):
         return self.api.generic.transaction.get_object_or_404(uuid=tx_uuid)
 
@@ -154,20 +191,27 @@ class ZamboniClient(Client):
 
 
 def get_client():
+    """
+    The client for the solitude hosts in settings, made once per process and
+    kept for its connections.
+    """
     # If you haven't specified a solitude host, we can't do anything.
     if settings.SOLITUDE_HOSTS:
         config = {
-            # TODO: when seclusion can cope with multiple hosts, we'll pass
-            # them all through and let seclusion do its magic.
-            'server': settings.SOLITUDE_HOSTS[0],
+            'hosts': settings.SOLITUDE_HOSTS,
             'key': settings.SOLITUDE_KEY,
             'secret': settings.SOLITUDE_SECRET,
-            'timeout': settings.SOLITUDE_TIMEOUT
+            'timeout': settings.SOLITUDE_TIMEOUT,
+            'retry': settings.SOLITUDE_HOST_RETRY,
+            'pool_size': settings.SOLITUDE_POOL_SIZE,
         }
-        client = ZamboniClient(config)
-        client.encoder = ZamboniEncoder
-        client.filter_encoder = filter_encoder
-        return client
+        key = repr(sorted(config.items()))
+        if key not in clients:
+            client = ZamboniClient(config)
+            client.encoder = ZamboniEncoder
+            client.filter_encoder = filter_encoder
+            clients[key] = client
+        return clients[key]
 
 if not client:
     client = get_client()
@@ -1,8 +1,12 @@
 import datetime
 import decimal
+import errno
 from functools import partial
 import json
 import logging
+import socket
+import threading
+import time
 import urllib
 
 from django.conf import settings
@@ -10,6 +14,7 @@ from django.conf import settings
 from curling.lib import API
 from django_statsd.clients import statsd
 import requests
+from requests.adapters import HTTPAdapter
 
 from tower import ugettext_lazy as _
 
@@ -18,6 +23,21 @@ from .errors import lookup
 log = logging.getLogger('s.client')
 
 
+def never_connected(exc):
+    """
+    Whether the requests.ConnectionError `exc` happened before a connection
+    was made, so the request can't have been sent. A connection dropped
+    after that, like a reset while reading the response, doesn't count.
+    """
+    reason = exc.args[0] if exc.args else None
+    # urllib3 wraps the socket error in a MaxRetryError.
+    reason = getattr(reason, 'reason', reason)
+    return (isinstance(reason, socket.gaierror) or
+            getattr(reason, 'errno', None) in (errno.ECONNREFUSED,
+                                               errno.EHOSTUNREACH,
+                                               errno.ENETUNREACH))
+
+
 class SolitudeError(Exception):
 
     def __init__(self, *args, **kwargs):
@@ -83,11 +103,50 @@ class Encoder(json.JSONEncoder):
 general_error = _('Oops, we had an error processing that.')
 
 
+class Hosts(object):
+    """
+    The solitude hosts, taken in turn. A host that couldn't be reached is
+    only tried after the others for `retry` seconds.
+    """
+
+    def __init__(self, hosts, retry):
+        self.hosts = list(hosts)
+        self.retry = retry
+        self.down = {}
+        self.next = 0
+        self.lock = threading.Lock()
+
+    def ordered(self):
+        """The hosts to try, in order."""
+        with self.lock:
+            start = self.next
+            self.next = (start + 1) % len(self.hosts)
+        hosts = self.hosts[start:] + self.hosts[:start]
+        now = time.time()
+        up = [h for h in hosts if self.down.get(h, 0) + self.retry < now]
+        return up + [h for h in hosts if h not in up]
+
+    def failed(self, host):
+        self.down[host] = time.time()
+        statsd.incr('solitude.host.down')
+
+    def succeeded(self, host):
+        self.down.pop(host, None)
+
+
 class Client(object):
 
     def __init__(self, config=None):
         self.config = self.parse(config)
-        self.api = API(config['server'])
+        self.hosts = Hosts(self.config['hosts'], self.config['retry'])
+        # One session for the life of the client, so connections are kept
+        # alive and reused.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.config['hosts']),
+                              pool_maxsize=self.config['pool_size'])
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.api = API(self.config['server'])
         self.api.activate_oauth(settings.SOLITUDE_OAUTH.get('key'),
                                 settings.SOLITUDE_OAUTH.get('secret'))
         self.encoder = None
@@ -100,22 +159,37 @@ class Client(object):
 
         """
         uri = uri.lstrip('/')
-        return self.call('%s/%s' % (self.config['server'], uri), method, data)
+        return self.call('/%s' % uri, method, data)
 
     def _url(self, context, name, pk=None):
-        url = '%s/%s/%s/' % (self.config['server'], context, name)
+        url = '/%s/%s/' % (context, name)
         if pk:
             url = '%s%s/' % (url, pk)
         return url
 
     def parse(self, config=None):
+        hosts = config.get('hosts') or [config.get('server')]
+        if isinstance(hosts, basestring):
+            hosts = [hosts]
         config = {
-            'server': config.get('server')
+            'server': hosts[0],
+            'hosts': list(hosts),
+            'timeout': config.get('timeout', 10),
+            # Seconds before trying a host that couldn't be reached again.
+            'retry': config.get('retry', 30),
+            # Connections kept open to each host.
+            'pool_size': config.get('pool_size', 10),
             # TODO: add in OAuth stuff.
         }
         return config
 
     def call(self, url, method_name, data=None):
+        """
+        Call `url`, a path on the solitude hosts, on the first host that
+        answers. Reads go to the next host on any connection error or
+        timeout. Writes only go to the next host if no connection could be
+        made to this one, so they're never made twice.
+        """
         log.info('Deprecated, please use curling: %s, %s' % (url, method_name))
         if data and method_name.lower() == 'get':
             raise TypeError('You cannot use data in a GET request. '
@@ -123,20 +197,35 @@ class Client(object):
 
         data = (json.dumps(data, cls=self.encoder or Encoder)
                 if data else json.dumps({}))
-        method = getattr(requests, method_name)
+        method = getattr(self.session, method_name)
+        timeout = self.config['timeout']
 
-        try:
-            with statsd.timer('solitude.call.%s' % method_name):
-                result = method(url, data=data,
-                                headers={'content-type': 'application/json'},
-                                timeout=self.config.get('timeout', 10))
-        except requests.ConnectionError:
-            log.error('Solitude not accessible')
-            raise SolitudeOffline(general_error)
-        except requests.Timeout:
-            log.error('Solitude timed out, limit %s'
-                      % self.config.get('timeout', 10))
-            raise SolitudeTimeout(general_error)
+        for host in self.hosts.ordered():
+            try:
+                with statsd.timer('solitude.call.%s' % method_name):
+                    result = method(host + url, data=data,
+                                    headers={'content-type':
+                                             'application/json'},
+                                    timeout=timeout)
+            except requests.ConnectionError, exc:
+                log.error('Solitude not accessible: %s' % host)
+                self.hosts.failed(host)
+                error = SolitudeOffline(general_error)
+                if method_name.lower() == 'get' or never_connected(exc):
+                    continue
+                raise error
+            except requests.Timeout:
+                log.error('Solitude timed out, limit %s: %s' %
+                          (timeout, host))
+                self.hosts.failed(host)
+                error = SolitudeTimeout(general_error)
+                if method_name.lower() == 'get':
+                    continue
+                raise error
+            self.hosts.succeeded(host)
+            break
+        else:
+            raise error
 
         if result.status_code in (200, 201, 202, 204):
             return json.loads(result.text) if result.text else {}
@@ -180,9 +269,15 @@ class Client(object):
 
         return partial(self.wrapped, **{'target': target, 'method': method})
 
-    def wrapped(self, target=None, method=None, data=None, pk=None,
-                filters=None):
+    def wrapped_url(self, target, pk=None, filters=None):
         url = self._url(*target[:2], pk=pk)
         if filters:
             url = '%s?%s' % (url, self.filter_encoder(filters))
-        return self.call(url, method, data=data)
+        return url
+
+    def wrapped(self, target=None, method=None, data=None, pk=None,
+                filters=None):
+        url = self.wrapped_url(target, pk, filters)
+        with statsd.timer('solitude.%s.%s.%s' % (target[0], target[1],
+                                                 method)):
+            return self.call(url, method, data=data)
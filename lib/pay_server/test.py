@@ -1,7 +1,11 @@
+import BaseHTTPServer
 import datetime
 import json
+import socket
+import threading
 
 from django.conf import settings
+from django.core.cache import cache
 
 from mock import patch
 from nose import SkipTest
@@ -12,7 +16,8 @@ from addons.models import Addon
 import amo
 from users.models import UserProfile
 from lib.pay_server import (client, filter_encoder, model_to_uid,
-                            ZamboniEncoder)
+                            ZamboniClient, ZamboniEncoder)
+from lib.pay_server.base import SolitudeOffline
 from lib.pay_server.errors import codes, lookup
 
 
@@ -207,6 +212,126 @@ class TestPay(test_utils.TestCase):
         assert 'uuid' in post_pay.call_args[1]['data']['return_url']
 
 
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    # Keeps connections open.
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address))
+        body = json.dumps({'meta': {'total_count': 1},
+                           'objects': [{'paypal': 'foo'}]})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        # Reads the request, then hangs up without answering.
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append((self.path, self.client_address))
+        self.close_connection = 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPool(test_utils.TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.server, self.live = self.serve()
+        # Nothing listens on a port just closed.
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        self.dead = 'http://127.0.0.1:%s' % sock.getsockname()[1]
+        sock.close()
+
+    def tearDown(self):
+        self.pay.session.close()
+
+    def serve(self):
+        server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), StubHandler)
+        server.requests = []
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, 'http://127.0.0.1:%s' % server.server_port
+
+    def get_client(self, hosts):
+        self.pay = ZamboniClient({'hosts': hosts, 'timeout': 5})
+        return self.pay
+
+    def test_keep_alive(self):
+        client = self.get_client([self.live])
+        for i in range(3):
+            client.get('/generic/transaction/%s/' % i)
+        eq_([path for path, address in self.server.requests],
+            ['/generic/transaction/%s/' % i for i in range(3)])
+        # All over the one connection.
+        eq_(len(set(address for path, address in self.server.requests)), 1)
+
+    def test_failover(self):
+        client = self.get_client([self.dead, self.live])
+        for i in range(4):
+            eq_(client.get('/generic/transaction/%s/' % i)['objects'],
+                [{'paypal': 'foo'}])
+        eq_(len(self.server.requests), 4)
+        eq_(client.hosts.ordered(), [self.live, self.dead])
+        assert self.dead in client.hosts.down
+
+    def test_all_down(self):
+        client = self.get_client([self.dead])
+        with self.assertRaises(SolitudeOffline):
+            client.get('/generic/transaction/1/')
+
+    def test_write_failover(self):
+        client = self.get_client([self.dead, self.live])
+        with self.assertRaises(SolitudeOffline):
+            client.call('/paypal/pay/', 'post', data={'amount': 1})
+        # Still sent, to the host that could be reached.
+        eq_([path for path, address in self.server.requests],
+            ['/paypal/pay/'])
+
+    def test_write_not_repeated(self):
+        other, url = self.serve()
+        client = self.get_client([self.live, url])
+        with self.assertRaises(SolitudeOffline):
+            client.call('/paypal/pay/', 'post', data={'amount': 1})
+        # The connection dropped after the payment was sent, so it isn't
+        # sent to the other host.
+        eq_(len(self.server.requests) + len(other.requests), 1)
+
+    def test_lookups_cached(self):
+        client = self.get_client([self.live])
+        eq_(client.lookup_buyer_paypal('buyer'), 'foo')
+        eq_(client.lookup_buyer_paypal('buyer'), 'foo')
+        eq_(len(self.server.requests), 1)
+        client.get_seller(filters={'uuid': 'seller'})
+        eq_(len(self.server.requests), 2)
+
+    @patch.object(ZamboniClient, 'call')
+    def test_writes_clear_lookups(self, call):
+        client = self.get_client([self.live])
+        call.return_value = {'meta': {'total_count': 1}, 'objects': []}
+        client.get_seller(filters={'uuid': 'seller'})
+        client.get_buyer(filters={'uuid': 'buyer'})
+        client.post_seller_paypal(data={'seller': '/generic/seller/1/'})
+        client.get_seller(filters={'uuid': 'seller'})
+        client.get_buyer(filters={'uuid': 'buyer'})
+        eq_(call.call_count, 4)
+
+    @patch.object(ZamboniClient, 'call')
+    def test_missing_not_cached(self, call):
+        client = self.get_client([self.live])
+        call.return_value = {'meta': {'total_count': 0}, 'objects': []}
+        client.get_buyer(filters={'uuid': 'buyer'})
+        client.get_buyer(filters={'uuid': 'buyer'})
+        eq_(call.call_count, 2)
+
+
 def test_lookup():
     eq_(lookup(0, {}), codes['0'])
     assert 'foo@bar.com' in lookup(100001, {'email': 'foo@bar.com'})
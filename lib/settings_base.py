@@ -336,6 +336,7 @@ MIDDLEWARE_CLASSES = (
     # AMO URL middleware comes first so everyone else sees nice URLs.
     'django_statsd.middleware.GraphiteRequestTimingMiddleware',
     'django_statsd.middleware.GraphiteMiddleware',
+    'amo.middleware.PerfMiddleware',
     'amo.middleware.LocaleAndAppURLMiddleware',
     # Mobile detection should happen in Zeus.
     'mobility.middleware.DetectMobileMiddleware',
@@ -924,9 +925,60 @@ FETCH_BY_ID = True
 # it's not possible to invalidate these queries.
 CACHE_COUNT_TIMEOUT = 60
 
+# Listings paginated with amo.utils.CachedCountPaginator show MySQL's
+# estimate of their size instead of counting, once it's at least this big.
+ESTIMATED_COUNT_THRESHOLD = 10000
+
 # To enable pylibmc compression (in bytes)
 PYLIBMC_MIN_COMPRESS_LEN = 0  # disabled
 
+# Number of entries kept in the per-process cache in front of memcache, used
+# by amo.utils.memoize(local=...) and cache_ns_key().
+LOCAL_CACHE_SIZE = 1000
+
+# Number of seconds cache_ns_key() trusts its per-process copy of a namespace
+# value. Other processes see an incremented namespace after at most this long.
+CACHE_NS_LOCAL_TIMEOUT = 5
+
+# Number of seconds one process gets to recompute an expired
+# memoize(lock=True) value before another one may try.
+MEMOIZE_LOCK_TIMEOUT = 30
+
+# Number of seconds add-on dicts for the API and discovery pane are cached,
+# see api.utils.addons_to_dicts. Saves clear them, but download and user
+# counts are updated behind their back.
+ADDON_DICT_CACHE_TIMEOUT = 60 * 60
+
+# Number of seconds amo.utils.resize_images remembers which source produced
+# each output, so re-processing an unchanged source doesn't rewrite it.
+IMAGE_SOURCE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Number of seconds truncated (and, for old rows, sanitized) HTML of purified
+# and linkified translations is cached. Keys include the source string, so
+# edits never see stale output.
+PURIFIED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Number of seconds the serialized apps of each Marketplace collection are
+# cached, see mkt.collections.serializers.collection_apps. Collection,
+# membership and app feature changes clear them, other app changes don't.
+COLLECTION_APPS_CACHE_TIMEOUT = 60 * 10
+
+# Number of seconds each process keeps the OAuth consumer and access token
+# secrets it looked up, see mkt.api.models.get_access_credentials. Changes
+# to them are picked up within CACHE_NS_LOCAL_TIMEOUT seconds regardless.
+OAUTH_CREDENTIALS_TIMEOUT = 60 * 5
+
+# Number of recent OAuth nonces each process remembers, on top of memcache,
+# to turn down replayed API requests.
+OAUTH_NONCE_CACHE_SIZE = 10000
+
+# Number of seconds between rebuilds of each process' index of apps for search
+# suggestions, see mkt.search.suggestions. Indexed apps are picked up every
+# SUGGESTIONS_POLL_INTERVAL seconds regardless, this is for popularity.
+SUGGESTIONS_REBUILD_INTERVAL = 60 * 10
+# None keeps the index from being refreshed in the background.
+SUGGESTIONS_POLL_INTERVAL = 10
+
 # External tools.
 JAVA_BIN = '/usr/bin/java'
 
@@ -1061,7 +1113,7 @@ CELERY_RESULT_BACKEND = 'amqp'
 CELERY_IGNORE_RESULT = True
 CELERY_SEND_TASK_ERROR_EMAILS = True
 CELERYD_HIJACK_ROOT_LOGGER = False
-CELERY_IMPORTS = ('lib.video.tasks', 'lib.metrics',
+CELERY_IMPORTS = ('lib.video.tasks', 'lib.metrics', 'lib.es.queue',
                   'lib.es.management.commands.reindex',
                   'lib.es.management.commands.reindex_mkt')
 # We have separate celeryds for processing devhub & images as fast as possible
@@ -1393,6 +1445,12 @@ STATSD_PREFIX = 'amo'
 # The django statsd client to use, see django-statsd for more.
 STATSD_CLIENT = 'django_statsd.clients.normal'
 
+# amo.middleware.PerfMiddleware flags requests making more SQL queries than
+# this, or than the budget for their view in PERF_QUERY_BUDGETS, e.g.
+# {'addons.views.addon_detail': 40}. None means no limit.
+PERF_QUERY_BUDGET = 100
+PERF_QUERY_BUDGETS = {}
+
 GRAPHITE_HOST = 'localhost'
 GRAPHITE_PORT = 2003
 GRAPHITE_PREFIX = 'amo'
@@ -1479,6 +1537,14 @@ SOLITUDE_KEY = ''
 SOLITUDE_SECRET = ''
 # The timeout we'll give solitude.
 SOLITUDE_TIMEOUT = 10
+# Seconds before a solitude host that couldn't be reached is tried again
+# ahead of the others.
+SOLITUDE_HOST_RETRY = 30
+# Connections kept open to each solitude host, per process.
+SOLITUDE_POOL_SIZE = 10
+# Seconds buyer and seller lookups are cached. Writes through the client
+# clear them.
+SOLITUDE_LOOKUP_TIMEOUT = 60
 
 # The OAuth keys to connect to the solitude host specified above.
 SOLITUDE_OAUTH = {'key': '', 'secret': ''}
@@ -1584,3 +1650,13 @@ POSTFIX_DOMAIN = 'marketplace.firefox.com'
 AES_KEYS = {
     'api:access:secret': os.path.join(ROOT, 'mkt/api/sample-aes.key'),
 }
+
+# Write StatsDictField values (update_counts, download_counts...) using the
+# compact encoding from stats.compact instead of JSON. All formats are always
+# readable; see the `compact_stats` management command to rewrite old rows.
+STATS_COMPACT_DICTS = False
+
+# Saves of indexed models within this many seconds of each other are
+# coalesced into a single index task, see lib.es.queue. 0 indexes on every
+# save.
+ES_INDEX_QUEUE_WINDOW = 10
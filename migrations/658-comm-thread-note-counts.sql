@@ -0,0 +1,9 @@
+ALTER TABLE comm_threads
+    ADD COLUMN notes_count int(11) unsigned NOT NULL DEFAULT 0,
+    ADD COLUMN last_activity datetime NULL;
+
+UPDATE comm_threads t
+    JOIN (SELECT thread_id, COUNT(*) AS notes, MAX(created) AS latest
+          FROM comm_thread_notes GROUP BY thread_id) n
+    ON n.thread_id = t.id
+    SET t.notes_count = n.notes, t.last_activity = n.latest;
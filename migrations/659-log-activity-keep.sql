@@ -0,0 +1,14 @@
+ALTER TABLE `log_activity` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_addon` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_app` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_comment` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_version` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_user` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_group` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_mkt` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_addon_mkt` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_app_mkt` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_comment_mkt` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_version_mkt` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_user_mkt` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
+ALTER TABLE `log_activity_group_mkt` ADD COLUMN `keep` bool NOT NULL DEFAULT 0;
@@ -138,7 +138,7 @@ class LoginResource(CORSResource, MarketplaceResource):
                              'No profile.')
 
         request.user, request.amo_user = profile.user, profile
-        request.groups = profile.groups.all()
+        request.groups = acl.get_groups(profile)
 
         # TODO: move this to the signal.
         profile.log_login_attempt(True)
@@ -12,10 +12,10 @@ from tastypie.authentication import Authentication
 import waffle
 
 from access.middleware import ACLMiddleware
-from users.models import UserProfile
+from users.models import RequestUser, UserProfile
 from mkt.api.middleware import APIPinningMiddleware
 
-from mkt.api.models import Access, Token, ACCESS_TOKEN
+from mkt.api.models import get_access_credentials, get_token_credentials
 from mkt.api.oauth import OAuthServer
 
 log = commonware.log.getLogger('z.api')
@@ -32,6 +32,14 @@ errors = {
 }
 
 
+def persist_lang(request):
+    """Save the request's language as its user's, if it changed."""
+    profile = getattr(request, 'amo_user', None)
+    lang = getattr(request, 'LANG', None)
+    if profile and lang and profile.lang != lang:
+        profile.update(lang=lang)
+
+
 class OAuthAuthentication(Authentication):
     """
     This is based on https://github.com/amrox/django-tastypie-two-legged-oauth
@@ -75,13 +83,8 @@ class OAuthAuthentication(Authentication):
                 log.error(u'Cannot find APIAccess token with that key: %s'
                           % oauth.attempted_key)
                 return self._error('headers')
-            uid = Token.objects.filter(
-                token_type=ACCESS_TOKEN,
-                key=oauth_request.resource_owner_key).values_list(
-                    'user_id', flat=True)[0]
-            request.amo_user = UserProfile.objects.select_related(
-                'user').get(pk=uid)
-            request.user = request.amo_user.user
+            creds = get_token_credentials(oauth_request.client_key,
+                                          oauth_request.resource_owner_key)
         else:
             # This is 2-legged OAuth.
             log.info('Trying 2 legged OAuth')
@@ -97,13 +100,15 @@ class OAuthAuthentication(Authentication):
                 log.error(u'Cannot find APIAccess token with that key: %s'
                           % oauth.attempted_key)
                 return self._error('headers')
-            uid = Access.objects.filter(
-                key=oauth_request.client_key).values_list(
-                    'user_id', flat=True)[0]
-            request.amo_user = UserProfile.objects.select_related(
-                'user').get(pk=uid)
-            request.user = request.amo_user.user
-        ACLMiddleware().process_request(request)
+            creds = get_access_credentials(oauth_request.client_key)
+        if not creds:
+            # Revoked since the request was verified.
+            return self._error('headers')
+        amo_user = RequestUser.objects.select_related('user').get(
+            pk=creds[1])
+        request.user = amo_user.user
+        # The same as ACLMiddleware does, without fetching the user again.
+        ACLMiddleware().set_user(request, amo_user)
         # We've just become authenticated, time to run the pinning middleware
         # again.
         #
@@ -111,16 +116,11 @@ class OAuthAuthentication(Authentication):
         request.API = True  # We can be pretty sure we are in the API.
         APIPinningMiddleware().process_request(request)
 
-        # Persist the user's language.
-        if (getattr(request, 'amo_user', None) and
-            getattr(request, 'LANG', None) and
-            request.amo_user.lang != request.LANG):
-            request.amo_user.lang = request.LANG
-            request.amo_user.save()
+        persist_lang(request)
 
         # But you cannot have one of these roles.
         denied_groups = set(['Admins'])
-        roles = set(request.amo_user.groups.values_list('name', flat=True))
+        roles = set(group.name for group in request.groups)
         if roles and roles.intersection(denied_groups):
             log.info(u'Attempt to use API with denied role, user: %s'
                      % request.amo_user.pk)
@@ -177,13 +177,7 @@ class SharedSecretAuthentication(Authentication):
                     log.info('Auth token matches absent user (%s)' % email)
                     return False
 
-                # Persist the user's language.
-                if (getattr(request, 'amo_user', None) and
-                    getattr(request, 'LANG', None) and
-                    request.amo_user.lang != request.LANG):
-                    request.amo_user.lang = request.LANG
-                    request.amo_user.save()
-
+                persist_lang(request)
                 ACLMiddleware().process_request(request)
             else:
                 log.info('Shared-secret auth token does not match')
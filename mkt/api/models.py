@@ -1,11 +1,14 @@
+import hashlib
 import os
 import time
 
+from django.conf import settings
 from django.db import models
 
 from aesfield.field import AESField
 
 from amo.models import ModelBase
+from amo.utils import cache_ns_key, local_cache
 
 
 REQUEST_TOKEN = 0
@@ -63,3 +66,66 @@ class Nonce(ModelBase):
 
 def generate():
     return os.urandom(64).encode('hex')
+
+
+def credentials_key(*parts):
+    key = hashlib.md5(u':'.join(map(unicode, parts)).encode('utf8'))
+    return '%s:%s' % (cache_ns_key('oauth-credentials'), key.hexdigest())
+
+
+def _cached_credentials(key, lookup):
+    # Secrets stay in this process rather than going to memcache. Misses
+    # are kept too, so unknown keys take the same path as known ones.
+    creds = local_cache.get(key)
+    if creds is None:
+        creds = lookup()
+        local_cache.set(key, creds, settings.OAUTH_CREDENTIALS_TIMEOUT)
+    return creds or None
+
+
+def get_access_credentials(client_key):
+    """
+    The (secret, user id) of the consumer with `client_key`, or None.
+
+    Credentials are kept for OAUTH_CREDENTIALS_TIMEOUT seconds. Saving or
+    deleting an Access or access Token makes every process look them up
+    again within CACHE_NS_LOCAL_TIMEOUT seconds, see clear_credentials.
+    """
+    def lookup():
+        try:
+            access = Access.objects.no_cache().get(key=client_key)
+        except Access.DoesNotExist:
+            return ()
+        # OAuthlib needs unicode objects, django-aesfield returns a string.
+        return (access.secret.decode('utf8'), access.user_id)
+    return _cached_credentials(credentials_key('access', client_key), lookup)
+
+
+def get_token_credentials(client_key, token_key):
+    """
+    The (secret, user id) of the access token `token_key` issued to the
+    consumer with `client_key`, or None. Cached like get_access_credentials.
+    """
+    def lookup():
+        tokens = (Token.objects.no_cache()
+                  .filter(token_type=ACCESS_TOKEN, creds__key=client_key,
+                          key=token_key)
+                  .values_list('secret', 'user')[:1])
+        return tuple(tokens[0]) if tokens else ()
+    return _cached_credentials(
+        credentials_key('token', client_key, token_key), lookup)
+
+
+def clear_credentials(sender, instance, **kw):
+    if sender is Token and instance.token_type != ACCESS_TOKEN:
+        return
+    cache_ns_key('oauth-credentials', increment=True)
+
+
+for sender in (Access, Token):
+    models.signals.post_save.connect(
+        clear_credentials, sender=sender,
+        dispatch_uid='oauth_credentials_save_%s' % sender.__name__)
+    models.signals.post_delete.connect(
+        clear_credentials, sender=sender,
+        dispatch_uid='oauth_credentials_delete_%s' % sender.__name__)
@@ -1,6 +1,10 @@
+import hashlib
 import string
+import time
 from urllib import urlencode
 
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponse, HttpResponseRedirect
 from django.views.decorators.csrf import csrf_view_exempt
 
@@ -10,8 +14,10 @@ from oauthlib import oauth1
 from oauthlib.common import safe_string_equals
 
 from amo.decorators import login_required
-from amo.utils import urlparams
-from mkt.api.models import Access, Nonce, Token, REQUEST_TOKEN, ACCESS_TOKEN
+from amo.utils import LocalCache, urlparams
+from mkt.api.models import (Access, get_access_credentials,
+                            get_token_credentials, Token, REQUEST_TOKEN,
+                            ACCESS_TOKEN)
 
 DUMMY_CLIENT_KEY = u'DummyOAuthClientKeyString'
 DUMMY_TOKEN = u'DummyOAuthToken'
@@ -19,6 +25,9 @@ DUMMY_SECRET = u'DummyOAuthSecret'
 
 log = commonware.log.getLogger('z.api')
 
+# Nonces used in this process within the last timestamp_lifetime seconds.
+nonces = LocalCache(settings.OAUTH_NONCE_CACHE_SIZE)
+
 
 class OAuthServer(oauth1.Server):
     safe_characters = set(string.printable)
@@ -28,20 +37,20 @@ class OAuthServer(oauth1.Server):
     verifier_length = (8, 128)
     client_key_length = (8, 128)
     enforce_ssl = False  # SSL enforcement is handled by ops. :-)
+    # Seconds a request's timestamp may be off by. Nonces only need to be
+    # remembered for that long.
+    timestamp_lifetime = 600
 
     def validate_client_key(self, key):
         self.attempted_key = key
-        return Access.objects.filter(key=key).exists()
+        return get_access_credentials(key) is not None
 
     def get_client_secret(self, key):
         # This method returns a dummy secret on failure so that auth
         # success and failure take a codepath with the same run time,
         # to prevent timing attacks.
-        try:
-            # OAuthlib needs unicode objects, django-aesfield returns a string.
-            return Access.objects.get(key=key).secret.decode('utf8')
-        except Access.DoesNotExist:
-            return DUMMY_SECRET
+        creds = get_access_credentials(key)
+        return creds[0] if creds else DUMMY_SECRET
 
     @property
     def dummy_client(self):
@@ -57,12 +66,25 @@ class OAuthServer(oauth1.Server):
 
     def validate_timestamp_and_nonce(self, client_key, timestamp, nonce,
                                      request_token=None, access_token=None):
-        n, created = Nonce.objects.safer_get_or_create(
-            defaults={'client_key': client_key},
-            nonce=nonce, timestamp=timestamp,
-            request_token=request_token,
-            access_token=access_token)
-        return created
+        try:
+            timestamp = int(timestamp)
+        except (TypeError, ValueError):
+            return False
+        if abs(time.time() - timestamp) > self.timestamp_lifetime:
+            return False
+        key = hashlib.md5(u':'.join(map(unicode, (
+            client_key, timestamp, nonce, request_token,
+            access_token))).encode('utf8')).hexdigest()
+        if nonces.get(key):
+            return False
+        nonces.set(key, True, self.timestamp_lifetime)
+        # Other processes learn about it through memcache, where add() only
+        # succeeds for the first one. add() also fails when memcache is
+        # down, and then only the local nonces can be checked.
+        cache_key = 'oauth-nonce:%s' % key
+        if cache.add(cache_key, 1, self.timestamp_lifetime):
+            return True
+        return cache.get(cache_key) is None
 
     def validate_requested_realm(self, client_key, realm):
         return True
@@ -84,9 +106,7 @@ class OAuthServer(oauth1.Server):
     def validate_access_token(self, client_key, access_token):
         # This method must take the same amount of time/db lookups for
         # success and failure to prevent timing attacks.
-        return Token.objects.filter(token_type=ACCESS_TOKEN,
-                                    creds__key=client_key,
-                                    key=access_token).exists()
+        return get_token_credentials(client_key, access_token) is not None
 
     def validate_verifier(self, client_key, request_token, verifier):
         # This method must take the same amount of time/db lookups for
@@ -111,13 +131,8 @@ class OAuthServer(oauth1.Server):
     def get_access_token_secret(self, client_key, request_token):
         # This method must take the same amount of time/db lookups for
         # success and failure to prevent timing attacks.
-        try:
-            t = Token.objects.get(key=request_token, creds__key=client_key,
-                                  token_type=ACCESS_TOKEN)
-        except Token.DoesNotExist:
-            return DUMMY_SECRET
-
-        return t.secret
+        creds = get_token_credentials(client_key, request_token)
+        return creds[0] if creds else DUMMY_SECRET
 
 
 @csrf_view_exempt
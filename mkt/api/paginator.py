@@ -1,8 +1,67 @@
+from django.core.paginator import Page, Paginator
+
 from rest_framework import serializers
 from rest_framework import pagination
+from rest_framework.exceptions import ParseError
 from rest_framework.templatetags.rest_framework import replace_query_param
 
 
+class SeekPaginator(Paginator):
+    """
+    Stands in for the Paginator of a SeekPage. Pages past a key aren't
+    numbered and nothing is counted.
+    """
+    count = num_pages = None
+    count_is_estimate = False
+
+
+class SeekPage(Page):
+    """
+    A page of objects with keys above `after`. `next_key` is the key to ask
+    for the following page with, or None on the last page.
+    """
+
+    def __init__(self, object_list, per_page, next_key):
+        super(SeekPage, self).__init__(object_list, None,
+                                       SeekPaginator(object_list, per_page))
+        self.next_key = next_key
+
+    def has_next(self):
+        return self.next_key is not None
+
+    def has_previous(self):
+        return False
+
+
+class SeekPaginationMixin(object):
+    """
+    Lets clients of a list page through it with `?after=<pk>` rather than
+    `?page=`. Each page is then a range scan on the primary key, which costs
+    the same however deep the page is, and needs no count.
+
+    Pages asked for that way are in primary key order, whatever the ordering
+    of the queryset.
+    """
+    seek_param = 'after'
+
+    def paginate_queryset(self, queryset, page_size=None):
+        after = self.request.QUERY_PARAMS.get(self.seek_param)
+        if after is None:
+            return super(SeekPaginationMixin, self).paginate_queryset(
+                queryset, page_size)
+        try:
+            after = int(after)
+        except ValueError:
+            raise ParseError('`%s` must be an integer.' % self.seek_param)
+        page_size = page_size or self.get_paginate_by()
+        objects = list(queryset.filter(pk__gt=after)
+                               .order_by('pk')[:page_size + 1])
+        next_key = None
+        if len(objects) > page_size:
+            next_key = objects[page_size - 1].pk
+        return SeekPage(objects[:page_size], page_size, next_key)
+
+
 class NextPageField(serializers.Field):
     """Wrapper to remove absolute_uri."""
     page_field = 'page'
@@ -10,9 +69,12 @@ class NextPageField(serializers.Field):
     def to_native(self, value):
         if not value.has_next():
             return None
-        page = value.next_page_number()
         request = self.context.get('request')
         url = request and request.get_full_path() or ''
+        if isinstance(value, SeekPage):
+            return replace_query_param(url, SeekPaginationMixin.seek_param,
+                                       value.next_key)
+        page = value.next_page_number()
         return replace_query_param(url, self.page_field, page)
 
 
@@ -29,11 +91,19 @@ class PreviousPageField(serializers.Field):
         return replace_query_param(url, self.page_field, page)
 
 
+class CountIsEstimateField(serializers.Field):
+    """Whether the page's total_count is an estimate rather than exact."""
+
+    def field_to_native(self, obj, field_name):
+        return getattr(obj.paginator, 'count_is_estimate', False)
+
+
 class MetaSerializer(serializers.Serializer):
     next = NextPageField(source='*')
     prev = PreviousPageField(source='*')
     page = serializers.Field(source='number')
     total_count = serializers.Field(source='paginator.count')
+    total_count_is_estimate = CountIsEstimateField()
 
 
 class CustomPaginationSerializer(pagination.BasePaginationSerializer):
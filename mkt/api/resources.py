@@ -21,6 +21,7 @@ from rest_framework.serializers import (BooleanField, CharField,
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
 from tastypie import fields, http
+from tastypie.bundle import Bundle
 from tastypie.serializers import Serializer
 from tastypie.throttle import CacheThrottle
 from tastypie.utils import trailing_slash
@@ -53,7 +54,7 @@ from mkt.regions import get_region, get_region_id, REGIONS_DICT
 from mkt.submit.forms import AppDetailsBasicForm
 from mkt.webapps.models import get_excluded_in
 from mkt.webapps.tasks import _update_manifest
-from mkt.webapps.utils import app_to_dict
+from mkt.webapps.utils import app_to_dict, apps_to_dicts
 
 log = commonware.log.getLogger('z.api')
 
@@ -243,13 +244,54 @@ class AppResource(CORSResource, MarketplaceModelResource):
             ap.price = Price.objects.get(price=bundle.data['price'])
             ap.save()
 
+    def get_list(self, request=None, **kwargs):
+        objects = self.obj_get_list(
+            request=request, **self.remove_api_resource_names(kwargs))
+        sorted_objects = self.apply_sorting(objects, options=request.GET)
+
+        paginator = self._meta.paginator_class(request.GET, sorted_objects,
+            resource_uri=self.get_resource_list_uri(),
+            limit=self._meta.limit)
+        page = paginator.page()
+        page['objects'] = self.full_dehydrate_list(
+            [self.build_bundle(obj=obj, request=request)
+             for obj in page['objects']])
+
+        to_be_serialized = self.alter_list_data_to_serialize(request, page)
+        return self.create_response(request, to_be_serialized)
+
+    def full_dehydrate_list(self, bundles):
+        """
+        Dehydrate a list of bundles sharing the same request, serializing all
+        of the apps with one call to `apps_to_dicts`.
+        """
+        bundles = list(bundles)
+        if not bundles:
+            return []
+        request = bundles[0].request
+        dicts = apps_to_dicts([b.obj for b in bundles],
+                              region=self._region(request),
+                              profile=getattr(request, 'amo_user', None),
+                              request=request)
+        for bundle, data in zip(bundles, dicts):
+            bundle.app_dict = data
+        return [self.full_dehydrate(bundle) for bundle in bundles]
+
+    def dehydrate_objects(self, objects, request=None):
+        return [bundle.data for bundle in self.full_dehydrate_list(
+            Bundle(obj=o, request=request) for o in objects)]
+
+    def _region(self, request):
+        return request.REGION.id if hasattr(request, 'REGION') else None
+
     def dehydrate(self, bundle):
         obj = bundle.obj
-        amo_user = getattr(bundle.request, 'amo_user', None)
-        region = (bundle.request.REGION.id if hasattr(bundle.request, 'REGION')
-                  else None)
-        bundle.data.update(app_to_dict(obj, region=region, profile=amo_user,
-                                       request=bundle.request))
+        data = getattr(bundle, 'app_dict', None)
+        if data is None:
+            amo_user = getattr(bundle.request, 'amo_user', None)
+            data = app_to_dict(obj, region=self._region(bundle.request),
+                               profile=amo_user, request=bundle.request)
+        bundle.data.update(data)
         bundle.data['privacy_policy'] = (
             PrivacyPolicyResource().get_resource_uri(bundle))
 
@@ -354,7 +396,7 @@ def waffles(request):
     return res
 
 
-@memoize(prefix='config-settings')
+@memoize(prefix='config-settings', local=60)
 def get_settings():
     safe = debug.get_safe_settings()
     _settings = ['SITE_URL']
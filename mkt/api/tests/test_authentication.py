@@ -127,6 +127,20 @@ class TestOAuthAuthentication(TestCase):
         self.add_group_user(self.profile, 'App Reviewers')
         ok_(self.auth.is_authenticated(self.call()))
 
+    def test_lang_changed(self):
+        req = self.call()
+        req.LANG = 'de'
+        ok_(self.auth.is_authenticated(req))
+        eq_(UserProfile.objects.no_cache().get(pk=2519).lang, 'de')
+
+    def test_lang_unchanged(self):
+        self.profile.update(lang='de')
+        req = self.call()
+        req.LANG = 'de'
+        with patch.object(UserProfile, 'update') as update:
+            ok_(self.auth.is_authenticated(req))
+        assert not update.called
+
 
 class TestRestOAuthAuthentication(TestOAuthAuthentication):
 
@@ -1,6 +1,7 @@
 from datetime import datetime
 from functools import partial
 import json
+import time
 import urllib
 import urlparse
 
@@ -8,7 +9,8 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.test.client import Client, FakePayload
 
-from nose.tools import eq_
+import mock
+from nose.tools import eq_, ok_
 from oauthlib import oauth1
 from pyquery import PyQuery as pq
 from test_utils import RequestFactory
@@ -19,7 +21,10 @@ from amo.urlresolvers import reverse
 
 from mkt.api import authentication
 from mkt.api.base import CORSResource, MarketplaceResource
-from mkt.api.models import Access, Token, generate, REQUEST_TOKEN, ACCESS_TOKEN
+from mkt.api.models import (Access, get_access_credentials,
+                            get_token_credentials, Token, generate,
+                            REQUEST_TOKEN, ACCESS_TOKEN)
+from mkt.api.oauth import nonces, OAuthServer
 from mkt.api.tests import BaseAPI
 from mkt.site.fixtures import fixture
 
@@ -181,6 +186,79 @@ class TestCORS(BaseOAuth):
         eq_(req.CORS, ['get'])
 
 
+class TestCredentials(TestCase):
+    fixtures = fixture('user_2519')
+
+    def setUp(self):
+        self.user = User.objects.get(pk=2519)
+        self.access = Access.objects.create(key='oauthClientKeyForTests',
+                                            secret=generate(),
+                                            user=self.user)
+
+    def test_access(self):
+        eq_(get_access_credentials(self.access.key),
+            (self.access.secret, self.user.pk))
+        with self.assertNumQueries(0):
+            eq_(get_access_credentials(self.access.key)[1], self.user.pk)
+
+    def test_access_missing(self):
+        eq_(get_access_credentials('unknownClientKey'), None)
+        with self.assertNumQueries(0):
+            eq_(get_access_credentials('unknownClientKey'), None)
+        Access.objects.create(key='unknownClientKey', secret=generate(),
+                              user=self.user)
+        ok_(get_access_credentials('unknownClientKey'))
+
+    def test_access_revoked(self):
+        ok_(get_access_credentials(self.access.key))
+        self.access.delete()
+        eq_(get_access_credentials(self.access.key), None)
+
+    def test_token(self):
+        token = Token.generate_new(ACCESS_TOKEN, self.access, self.user)
+        eq_(get_token_credentials(self.access.key, token.key),
+            (token.secret, self.user.pk))
+        eq_(get_token_credentials('otherClientKey', token.key), None)
+        token.delete()
+        eq_(get_token_credentials(self.access.key, token.key), None)
+
+    def test_request_token(self):
+        token = Token.generate_new(REQUEST_TOKEN, self.access)
+        eq_(get_token_credentials(self.access.key, token.key), None)
+
+
+class TestNonces(TestCase):
+
+    def setUp(self):
+        self.server = OAuthServer()
+        self.now = int(time.time())
+
+    def validate(self, nonce, timestamp=None):
+        return self.server.validate_timestamp_and_nonce(
+            u'clientKey', unicode(timestamp or self.now), nonce)
+
+    def test_replay(self):
+        ok_(self.validate(u'nonce1'))
+        ok_(not self.validate(u'nonce1'))
+        ok_(self.validate(u'nonce2'))
+
+    def test_replay_other_process(self):
+        ok_(self.validate(u'nonce1'))
+        nonces.clear()
+        ok_(not self.validate(u'nonce1'))
+
+    @mock.patch('mkt.api.oauth.cache')
+    def test_cache_down(self, cache):
+        cache.add.return_value = False
+        cache.get.return_value = None
+        ok_(self.validate(u'nonce1'))
+        ok_(not self.validate(u'nonce1'))
+
+    def test_stale_timestamp(self):
+        ok_(not self.validate(u'nonce1', self.now - 3600))
+        ok_(not self.validate(u'nonce1', u'yesterday'))
+
+
 class Test3LeggedOAuthFlow(TestCase):
     fixtures = fixture('user_2519', 'user_999')
 
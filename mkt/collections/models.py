@@ -8,8 +8,8 @@ import amo.models
 import mkt.regions
 from addons.models import Category, clean_slug
 from amo.decorators import use_master
-from amo.utils import to_language
-from mkt.webapps.models import Webapp
+from amo.utils import cache_ns_key, to_language
+from mkt.webapps.models import AppFeatures, Webapp
 from translations.fields import PurifiedField, save_signal
 
 from .constants import COLLECTION_TYPES
@@ -131,5 +131,19 @@ class CollectionMembership(amo.models.ModelBase):
         ordering = ('order',)
 
 
+def clear_collection_apps(sender, **kw):
+    """Clear the cached serialized apps of every collection."""
+    cache_ns_key('collection-apps', increment=True)
+
+
 models.signals.pre_save.connect(save_signal, sender=Collection,
                                 dispatch_uid='collection_translations')
+for sender in (Collection, CollectionMembership):
+    models.signals.post_save.connect(
+        clear_collection_apps, sender=sender,
+        dispatch_uid='collection_apps_save_%s' % sender.__name__)
+    models.signals.post_delete.connect(
+        clear_collection_apps, sender=sender,
+        dispatch_uid='collection_apps_delete_%s' % sender.__name__)
+models.signals.post_save.connect(clear_collection_apps, sender=AppFeatures,
+                                 dispatch_uid='collection_apps_features')
@@ -1,25 +1,126 @@
 # -*- coding: utf-8 -*-
 import os
 import uuid
+from collections import defaultdict
 
 from rest_framework import serializers
-from rest_framework.fields import get_component
 from tastypie.bundle import Bundle
 from tower import ugettext_lazy as _
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.base import File
 from django.core.files.storage import default_storage as storage
+from django.utils import translation
 
+from amo.utils import cache_ns_key
 from mkt.api.fields import TranslationSerializerField
 from mkt.api.resources import AppResource
+from mkt.carriers import get_carrier
 from mkt.constants.features import FeatureProfile
+from mkt.regions import get_region
+from mkt.webapps.models import AppFeatures, Webapp
 
-from .models import Collection
+from .models import Collection, CollectionMembership
 from .constants import COLLECTIONS_TYPE_FEATURED, COLLECTIONS_TYPE_OPERATOR
 
 
+def get_feature_profile(request):
+    """The FeatureProfile in the request's `pro` signature, or None."""
+    sig = request.GET.get('pro') if request else None
+    if sig:
+        try:
+            return FeatureProfile.from_signature(sig)
+        except ValueError:
+            pass
+    return None
+
+
+def collection_apps_key(collection, profile):
+    return '%s:%s:%s:%s:%s:%s' % (
+        cache_ns_key('collection-apps'), collection.pk, get_region(),
+        get_carrier(), profile.to_signature() if profile else '',
+        translation.get_language())
+
+
+def supports_features(profile, features):
+    """
+    Whether a device with `profile` has every feature an app requires,
+    given the AppFeatures of its current version.
+    """
+    if features is None:
+        # Without features an app matches only a profile lacking nothing,
+        # like the JOIN on addons_features we used to do.
+        return not profile.to_kwargs()
+    required = int(features.to_signature().split('.')[0], 16)
+    return not required & ~profile.to_int()
+
+
+def collection_apps(collections, request=None):
+    """
+    Serialize the member apps of all `collections` together. Returns a dict
+    of collection id => list of app dicts, leaving out apps requiring
+    features missing from the request's feature profile.
+
+    Memberships, apps and their features are loaded for every collection at
+    once, and the lists are cached per collection, region, carrier, feature
+    profile and language. Changing a collection, its memberships or any
+    app's features clears them, see models.clear_collection_apps; other app
+    changes show up after COLLECTION_APPS_CACHE_TIMEOUT seconds.
+    """
+    profile = get_feature_profile(request)
+    keys = dict((c.pk, collection_apps_key(c, profile)) for c in collections)
+    cached = cache.get_many(keys.values())
+    result, missing = {}, []
+    for collection in collections:
+        if keys[collection.pk] in cached:
+            result[collection.pk] = cached[keys[collection.pk]]
+        else:
+            missing.append(collection)
+    if not missing:
+        return result
+
+    members = defaultdict(list)
+    for collection_id, app_id in (CollectionMembership.objects
+                                  .filter(collection__in=missing)
+                                  .values_list('collection', 'app')):
+        members[collection_id].append(app_id)
+    apps = dict((a.id, a) for a in Webapp.objects.filter(
+        id__in=set(id for ids in members.values() for id in ids)))
+
+    if profile is not None:
+        features = dict((f.version_id, f) for f in AppFeatures.objects.filter(
+            version__in=filter(None, (a._current_version_id
+                                      for a in apps.values()))))
+        apps = dict((id, app) for id, app in apps.items() if
+                    supports_features(profile,
+                                      features.get(app._current_version_id)))
+
+    bundles = AppResource().full_dehydrate_list(
+        [Bundle(obj=app) for app in apps.values()])
+    data = dict((b.obj.id, b.data) for b in bundles)
+
+    for collection in missing:
+        result[collection.pk] = [data[id] for id in members[collection.pk]
+                                 if id in data]
+    cache.set_many(dict((keys[c.pk], result[c.pk]) for c in missing),
+                   settings.COLLECTION_APPS_CACHE_TIMEOUT)
+    return result
+
+
+def attach_apps(collections, request=None):
+    """
+    Store the collection_apps() of each of `collections` as `app_data`, for
+    CollectionMembershipField to use when serializing a list of them.
+    """
+    collections = list(collections)
+    apps = collection_apps(collections, request)
+    for collection in collections:
+        collection.app_data = apps[collection.pk]
+    return collections
+
+
 class CollectionMembershipField(serializers.RelatedField):
     """
     RelatedField subclass that serializes an M2M to CollectionMembership into
@@ -33,21 +134,11 @@ class CollectionMembershipField(serializers.RelatedField):
         return AppResource().full_dehydrate(bundle).data
 
     def field_to_native(self, obj, field_name):
-        value = get_component(obj, self.source)
-
-        # Filter apps based on feature profiles.
-        if hasattr(self, 'context') and 'request' in self.context:
-            sig = self.context['request'].GET.get('pro')
-            if sig:
-                try:
-                    profile = FeatureProfile.from_signature(sig)
-                except ValueError:
-                    pass
-                else:
-                    value = value.filter(**profile.to_kwargs(
-                        prefix='app___current_version__features__has_'))
-
-        return [self.to_native(item) for item in value.all()]
+        # Lists of collections get theirs from attach_apps() beforehand.
+        if hasattr(obj, 'app_data'):
+            return obj.app_data
+        request = getattr(self, 'context', {}).get('request')
+        return collection_apps([obj], request)[obj.pk]
 
 
 class CollectionSerializer(serializers.ModelSerializer):
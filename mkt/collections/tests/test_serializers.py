@@ -3,12 +3,16 @@ from nose.tools import eq_, ok_
 from tastypie.bundle import Bundle
 from test_utils import RequestFactory
 
+from django.core.cache import cache
+
 import amo.tests
+from amo import perf
 from mkt.api.resources import AppResource
 from mkt.collections.constants import COLLECTIONS_TYPE_BASIC
 from mkt.constants.features import FeatureProfile
 from mkt.collections.models import Collection, CollectionMembership
-from mkt.collections.serializers import (CollectionMembershipField,
+from mkt.collections.serializers import (attach_apps, collection_apps,
+                                         CollectionMembershipField,
                                          CollectionSerializer,
                                          DataURLImageField)
 
@@ -77,6 +81,66 @@ class TestCollectionMembershipField(CollectionDataMixin, amo.tests.TestCase):
         eq_(int(native[0]['id']), self.app.id)
 
 
+class TestCollectionApps(amo.tests.TestCase):
+
+    def setUp(self):
+        self.apps = [amo.tests.app_factory() for i in range(3)]
+        self.collections = []
+        for i in range(3):
+            collection = Collection.objects.create(
+                collection_type=COLLECTIONS_TYPE_BASIC, name='Col %s' % i)
+            for app in self.apps[:i + 1]:
+                collection.add_app(app)
+            self.collections.append(collection)
+        self.request = RequestFactory().get('/')
+
+    def app_ids(self, collection):
+        return [int(app['id']) for app in collection.app_data]
+
+    def test_attach_apps(self):
+        collections = attach_apps(self.collections, self.request)
+        for i, collection in enumerate(collections):
+            eq_(self.app_ids(collection), [a.id for a in self.apps[:i + 1]])
+
+    def test_same_as_membership_field(self):
+        collection = attach_apps(self.collections[:1], self.request)[0]
+        membership = CollectionMembership.objects.get(
+            collection=self.collections[0])
+        eq_(collection.app_data,
+            [CollectionMembershipField().to_native(membership)])
+
+    def test_constant_queries(self):
+        with perf.collect() as one:
+            collection_apps(self.collections[:1], self.request)
+        cache.clear()
+        with perf.collect() as three:
+            collection_apps(self.collections, self.request)
+        eq_(three.queries, one.queries)
+
+    def test_cached(self):
+        collection_apps(self.collections, self.request)
+        with self.assertNumQueries(0):
+            collection_apps(self.collections, self.request)
+
+    def test_deleted_excluded(self):
+        self.apps[0].delete()
+        for i, collection in enumerate(
+                attach_apps(self.collections, self.request)):
+            eq_(self.app_ids(collection), [a.id for a in self.apps[1:i + 1]])
+
+    def test_features_filtered(self):
+        self.apps[0].current_version.features.update(has_geolocation=True)
+        profile = FeatureProfile(apps=True).to_signature()
+        request = RequestFactory().get('/', {'pro': profile})
+        for i, collection in enumerate(
+                attach_apps(self.collections, request)):
+            eq_(self.app_ids(collection), [a.id for a in self.apps[1:i + 1]])
+
+        # Without a profile nothing is filtered.
+        collection = attach_apps(self.collections[:1], self.request)[0]
+        eq_(self.app_ids(collection), [self.apps[0].id])
+
+
 class TestCollectionSerializer(CollectionDataMixin, amo.tests.TestCase):
 
     def setUp(self):
@@ -25,7 +25,8 @@ from mkt.webapps.models import Webapp
 from .authorization import PublisherAuthorization
 from .filters import CollectionFilterSetWithFallback
 from .models import Collection
-from .serializers import CollectionMembershipField, CollectionSerializer
+from .serializers import (attach_apps, CollectionMembershipField,
+                          CollectionSerializer)
 
 
 class CollectionViewSet(CORSMixin, SlugOrIdMixin, viewsets.ModelViewSet):
@@ -46,6 +47,14 @@ class CollectionViewSet(CORSMixin, SlugOrIdMixin, viewsets.ModelViewSet):
         'app_mismatch': 'All apps in this collection must be included.',
     }
 
+    def paginate_queryset(self, queryset, page_size=None):
+        page = super(CollectionViewSet, self).paginate_queryset(queryset,
+                                                                page_size)
+        if page is not None:
+            # Serialize the apps of the whole page in one go.
+            page.object_list = attach_apps(page.object_list, self.request)
+        return page
+
     def return_updated(self, status, collection=None):
         """
         Passed an HTTP status from rest_framework.status, returns a response
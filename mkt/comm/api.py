@@ -8,7 +8,8 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.decorators import (api_view, authentication_classes,
                                        permission_classes)
 from rest_framework.exceptions import ParseError, PermissionDenied
-from rest_framework.fields import BooleanField, CharField
+from rest_framework.fields import (BooleanField, CharField, DateTimeField,
+                                   IntegerField)
 from rest_framework.filters import BaseFilterBackend, OrderingFilter
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin, RetrieveModelMixin)
@@ -20,14 +21,18 @@ from rest_framework.serializers import ModelSerializer, SerializerMethodField
 from rest_framework.viewsets import GenericViewSet
 
 from addons.models import Addon
+from amo.utils import CachedCountPaginator
 from users.models import UserProfile
 from comm.models import (CommunicationNote, CommunicationNoteRead,
                          CommunicationThread)
 from comm.tasks import consume_email, mark_thread_read
-from comm.utils import filter_notes_by_read_status, ThreadObjectPermission
+from comm.utils import (attach_recent_notes, filter_notes_by_read_status,
+                        ThreadObjectPermission)
 from mkt.api.authentication import (RestOAuthAuthentication,
                                     RestSharedSecretAuthentication)
 from mkt.api.base import CORSMixin
+from mkt.api.paginator import SeekPaginationMixin
+from mkt.constants import comm
 from mkt.reviewers.utils import send_note_emails
 from mkt.webpay.forms import PrepareForm
 
@@ -47,6 +52,9 @@ class NoteSerializer(ModelSerializer):
     is_read = SerializerMethodField('is_read_by_user')
 
     def is_read_by_user(self, obj):
+        # Thread listings attach this for a page of notes at once.
+        if hasattr(obj, 'is_read'):
+            return obj.is_read
         return obj.read_by_users.filter(
             pk=self.get_request().amo_user.id).exists()
 
@@ -69,20 +77,21 @@ class AddonSerializer(ModelSerializer):
 class ThreadSerializer(ModelSerializer):
     addon_meta = AddonSerializer(source='addon', read_only=True)
     recent_notes = SerializerMethodField('get_recent_notes')
-    notes_count = SerializerMethodField('get_notes_count')
+    notes_count = IntegerField(read_only=True)
+    last_activity = DateTimeField(read_only=True)
 
     class Meta:
         model = CommunicationThread
         fields = ('id', 'addon', 'addon_meta', 'version', 'notes_count',
-                  'recent_notes', 'created', 'modified')
+                  'recent_notes', 'created', 'modified', 'last_activity')
         view_name = 'comm-thread-detail'
 
     def get_recent_notes(self, obj):
         NoteSerializer.get_request = self.get_request
-        return NoteSerializer(obj.notes.all().order_by('-created')[:5]).data
-
-    def get_notes_count(self, obj):
-        return obj.notes.count()
+        notes = getattr(obj, 'recent_notes_list', None)
+        if notes is None:
+            notes = obj.notes.all().order_by('-created')[:comm.RECENT_NOTES]
+        return NoteSerializer(notes).data
 
 
 class ThreadPermission(BasePermission, ThreadObjectPermission):
@@ -175,9 +184,10 @@ class ReadUnreadFilter(BaseFilterBackend):
                                            show_read)
 
 
-class CommViewSet(CORSMixin, GenericViewSet):
+class CommViewSet(CORSMixin, SeekPaginationMixin, GenericViewSet):
     """Some overriding and mixin stuff to adapt other viewsets."""
     parser_classes = (FormParser, JSONParser)
+    paginator_class = CachedCountPaginator
 
     def patched_get_request(self):
         return lambda x: self.request
@@ -238,6 +248,26 @@ class ThreadViewSet(ListModelMixin, RetrieveModelMixin, DestroyModelMixin,
         self.queryset = queryset
         return ListModelMixin.list(self, request)
 
+    def paginate_queryset(self, queryset, page_size=None):
+        page = super(ThreadViewSet, self).paginate_queryset(queryset,
+                                                            page_size)
+        if page is not None and self.action == 'list':
+            page.object_list = self.attach_listing_data(page.object_list)
+        return page
+
+    def attach_listing_data(self, threads):
+        """
+        Load the add-ons and recent notes of a page of threads together,
+        rather than once per thread while serializing.
+        """
+        threads = list(threads)
+        addons = dict((a.id, a) for a in Addon.with_deleted.filter(
+            id__in=set(t.addon_id for t in threads)))
+        for thread in threads:
+            if thread.addon_id in addons:
+                thread.addon = addons[thread.addon_id]
+        return attach_recent_notes(threads, self.request.amo_user)
+
     def mark_as_read(self, profile):
         mark_thread_read(self.get_object(), profile)
 
@@ -5,14 +5,16 @@ from django.core import mail
 from django.core.urlresolvers import reverse
 
 import mock
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 from test_utils import RequestFactory
 
+from amo import perf
 from amo.tests import addon_factory, req_factory_factory
 from comm.models import (CommunicationNote, CommunicationNoteRead,
                          CommunicationThread, CommunicationThreadCC)
 from mkt.api.tests.test_oauth import RestOAuth
 from mkt.comm.api import EmailCreationPermission, post_email, ThreadPermission
+from mkt.constants import comm
 from mkt.site.fixtures import fixture
 from mkt.webapps.models import Webapp
 
@@ -154,6 +156,79 @@ class TestThreadList(RestOAuth):
         res = self.client.get(self.list_url, {'app': '1000'})
         eq_(res.status_code, 404)
 
+    def create_threads(self, threads, notes):
+        for i in range(threads):
+            thread = CommunicationThread.objects.create(addon=self.addon)
+            for j in range(notes):
+                CommunicationNote.objects.create(author=self.profile,
+                    thread=thread, note_type=0, body='note %s' % j)
+
+    def get_list(self):
+        with perf.collect() as stats:
+            res = self.client.get(self.list_url)
+        eq_(res.status_code, 200)
+        return res, stats.queries
+
+    def test_query_count(self):
+        self.create_threads(1, 1)
+        res, queries = self.get_list()
+        eq_(len(res.json['objects']), 1)
+
+        self.create_threads(4, 7)
+        res, more = self.get_list()
+        eq_(len(res.json['objects']), 5)
+        assert more <= queries, (
+            'Listing 5 threads took %s queries, 1 took %s.' % (more, queries))
+
+    def test_seek(self):
+        self.create_threads(3, 1)
+        first, second, third = CommunicationThread.objects.order_by('id')
+        res = self.client.get(self.list_url, {'after': 0, 'limit': 2})
+        eq_(res.status_code, 200)
+        eq_([t['id'] for t in res.json['objects']], [first.id, second.id])
+        meta = res.json['meta']
+        eq_(meta['total_count'], None)
+        eq_(meta['prev'], None)
+        ok_('after=%s' % second.id in meta['next'])
+
+        res = self.client.get(meta['next'])
+        eq_([t['id'] for t in res.json['objects']], [third.id])
+        eq_(res.json['meta']['next'], None)
+
+    def test_seek_invalid(self):
+        res = self.client.get(self.list_url, {'after': 'x'})
+        eq_(res.status_code, 400)
+
+    def test_total_count(self):
+        self.create_threads(2, 1)
+        res = self.client.get(self.list_url)
+        eq_(res.json['meta']['total_count'], 2)
+        eq_(res.json['meta']['total_count_is_estimate'], False)
+
+    def test_recent_notes(self):
+        self.create_threads(1, 7)
+        note = CommunicationNote.objects.latest('created')
+        CommunicationNoteRead.objects.create(note=note, user=self.profile)
+
+        res, queries = self.get_list()
+        data = res.json['objects'][0]
+        eq_(data['notes_count'], 7)
+        eq_(len(data['recent_notes']), comm.RECENT_NOTES)
+        eq_([n['id'] for n in data['recent_notes']],
+            list(CommunicationNote.objects.order_by('-created', '-id')
+                 .values_list('id', flat=True)[:comm.RECENT_NOTES]))
+        eq_([n['is_read'] for n in data['recent_notes']],
+            [n['id'] == note.id for n in data['recent_notes']])
+
+    def test_recent_notes_per_thread(self):
+        self.create_threads(3, 5)
+        res, queries = self.get_list()
+        for data in res.json['objects']:
+            eq_([n['id'] for n in data['recent_notes']],
+                list(CommunicationNote.objects.filter(thread=data['id'])
+                     .order_by('-created', '-id')
+                     .values_list('id', flat=True)[:comm.RECENT_NOTES]))
+
     def test_creation(self):
         version = self.addon.current_version
         res = self.client.post(self.list_url, data=json.dumps(
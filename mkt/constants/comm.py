@@ -4,6 +4,9 @@ THREAD_TOKEN_EXPIRY = 30
 # Number of times a token can be used.
 MAX_TOKEN_USE_COUNT = 5
 
+# Number of notes shown with each thread in thread listings.
+RECENT_NOTES = 5
+
 NO_ACTION = 0
 APPROVAL = 1
 REJECTION = 2
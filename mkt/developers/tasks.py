@@ -29,8 +29,8 @@ import amo
 from addons.models import Addon
 from amo.decorators import set_modified_on, write
 from amo.helpers import absolutify
-from amo.utils import (remove_icons, resize_image, send_mail_jinja, strip_bom,
-                       to_language)
+from amo.utils import (remove_icons, resize_image, resize_images,
+                       send_mail_jinja, strip_bom, to_language)
 from files.models import FileUpload, File, FileValidation
 from files.utils import SafeUnzip
 
@@ -130,13 +130,8 @@ def resize_icon(src, dst, size, locally=False, **kw):
     log.info('[1@None] Resizing icon: %s' % dst)
     try:
         if isinstance(size, list):
-            for s in size:
-                resize_image(src, '%s-%s.png' % (dst, s), (s, s),
-                             remove_src=False, locally=locally)
-            if locally:
-                os.remove(src)
-            else:
-                storage.delete(src)
+            resize_images(src, [('%s-%s.png' % (dst, s), (s, s))
+                                for s in size], locally=locally)
         else:
             resize_image(src, dst, (size, size), remove_src=True,
                          locally=locally)
@@ -164,12 +159,9 @@ def resize_preview(src, instance, **kw):
             thumbnail_size = thumbnail_size[::-1]
             image_size = image_size[::-1]
 
-        sizes['thumbnail'] = resize_image(src, thumb_dst,
-                                          thumbnail_size,
-                                          remove_src=False)
-        sizes['image'] = resize_image(src, full_dst,
-                                      image_size,
-                                      remove_src=False)
+        sizes['thumbnail'], sizes['image'] = resize_images(
+            src, [(thumb_dst, thumbnail_size), (full_dst, image_size)],
+            remove_src=False)
         instance.sizes = sizes
         instance.save()
         return True
@@ -612,7 +612,7 @@ def logs(request):
                 Q(user__display_name__icontains=term) |
                 Q(user__username__icontains=term)).distinct()
 
-    pager = paginate(request, approvals, 50)
+    pager = paginate(request, approvals, 50, cache_count=True)
     data = context(request, form=form, pager=pager, ACTION_DICT=amo.LOG_BY_ID,
                    tab='apps')
     return jingo.render(request, 'reviewers/logs.html', data)
@@ -417,7 +417,7 @@ def themes_logs(request):
                 Q(user__display_name__icontains=term) |
                 Q(user__username__icontains=term)).distinct()
 
-    pager = paginate(request, theme_logs, 30)
+    pager = paginate(request, theme_logs, 30, cache_count=True)
     data = context(request, form=form, pager=pager,
                    ACTION_DICT=rvw.REVIEW_ACTIONS,
                    REJECT_REASONS=rvw.THEME_REJECT_REASONS, tab='themes')
@@ -18,8 +18,9 @@ from mkt.collections.constants import (COLLECTIONS_TYPE_BASIC,
                                        COLLECTIONS_TYPE_OPERATOR)
 from mkt.collections.filters import CollectionFilterSetWithFallback
 from mkt.collections.models import Collection
-from mkt.collections.serializers import CollectionSerializer
+from mkt.collections.serializers import attach_apps, CollectionSerializer
 from mkt.constants.features import FeatureProfile
+from mkt.search import suggestions
 from mkt.search.views import _filter_search
 from mkt.search.forms import ApiSearchForm
 from mkt.webapps.models import Webapp
@@ -148,7 +149,9 @@ class WithFeaturedResource(SearchResource):
         else:
             qs = Collection.objects.all()
         filterset = CollectionFilterSetWithFallback(filters, queryset=qs)
-        serializer = CollectionSerializer(filterset,
+        # Serialize the apps of all the collections in one go.
+        collections = attach_apps(filterset.qs, request)
+        serializer = CollectionSerializer(collections, many=True,
                                           context={'request': request})
         return serializer.data
 
@@ -176,8 +179,7 @@ class WithFeaturedResource(SearchResource):
 
             bundles = (self.build_bundle(obj=obj, request=request) for obj in
                        qs)
-            data['featured'] = [AppResource().full_dehydrate(bundle)
-                                for bundle in bundles]
+            data['featured'] = AppResource().full_dehydrate_list(bundles)
 
         # Alter the _view_name so that statsd logs seperately from search.
         request._view_name = 'featured'
@@ -202,6 +204,18 @@ class SuggestionsResource(SearchResource):
         self.query = data.get('q', '')
         return data
 
+    def get_list(self, request=None, **kwargs):
+        form_data = self.get_search_data(request)
+        # Answered from memory when possible, see mkt.search.suggestions.
+        results = None
+        if suggestions.can_suggest(request, form_data):
+            results = suggestions.suggest(request, form_data,
+                                          self._meta.limit)
+        if results is None:
+            return super(SuggestionsResource, self).get_list(request,
+                                                             **kwargs)
+        return self.create_response(request, [self.query] + results)
+
     def alter_list_data_to_serialize(self, request, data):
         return data
 
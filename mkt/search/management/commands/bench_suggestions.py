@@ -0,0 +1,80 @@
+import time
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import translation
+
+import mock
+from test_utils import RequestFactory
+
+import amo
+import mkt.regions
+from mkt.search import suggestions
+from mkt.search.api import SuggestionsResource
+from mkt.webapps.models import Webapp
+
+HELP = 'Compare search suggestions from elasticsearch and from memory'
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100.0))]
+
+
+class Command(BaseCommand):
+    """
+    Asks for suggestions the way a search box does, one request per
+    keystroke while typing the names of public apps, from elasticsearch and
+    then from the in-memory index (see mkt.search.suggestions), and reports
+    latency percentiles for each.
+
+    Building the index, which happens in the background in the site's
+    processes, is timed on its own.
+
+    Usage:
+
+        python manage.py bench_suggestions --apps=200
+
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--apps', type='int', default=100,
+                    help='Number of app names to type.'),
+    )
+    help = HELP
+
+    def handle(self, *args, **kw):
+        translation.activate('en-US')
+        names = (Webapp.objects.filter(status=amo.STATUS_PUBLIC)
+                 .order_by('-weekly_downloads')[:kw['apps']])
+        queries = [unicode(app.name)[:i] for app in names
+                   for i in range(1, len(unicode(app.name)) + 1)]
+        print '%s keystrokes over %s names.' % (len(queries), len(names))
+
+        with mock.patch.object(suggestions, 'can_suggest',
+                               lambda *args: False):
+            self.report('elasticsearch', self.run(queries))
+        start = time.time()
+        suggestions.index.refresh()
+        print 'Built the index in %.2fs.' % (time.time() - start)
+        # Nothing to gain from the background refreshes here.
+        with mock.patch.object(settings, 'SUGGESTIONS_POLL_INTERVAL', None):
+            self.report('memory', self.run(queries))
+
+    def run(self, queries):
+        resource = SuggestionsResource()
+        times = []
+        for query in queries:
+            request = RequestFactory().get('/', {'q': query})
+            request.REGION = mkt.regions.WORLDWIDE
+            request.GAIA = request.MOBILE = request.TABLET = False
+            request.amo_user = None
+            start = time.time()
+            resource.get_list(request)
+            times.append(time.time() - start)
+        return sorted(times)
+
+    def report(self, name, times):
+        print '%-14s p50 %7.2fms  p90 %7.2fms  p99 %7.2fms' % (
+            name, percentile(times, 50) * 1000, percentile(times, 90) * 1000,
+            percentile(times, 99) * 1000)
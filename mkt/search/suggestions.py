@@ -0,0 +1,340 @@
+"""
+Search suggestions answered from memory instead of elasticsearch.
+
+Each process keeps a SuggestionIndex of the public apps: every word of every
+localized name, up to the end of the name, in a sorted list so the names
+with a word starting with what's been typed are a bisect away, and what the
+suggestions show for each app.
+
+The index is built and kept up to date by a thread of its own, started by
+the first suggestion asked for, which gets elasticsearch's answer until the
+index is ready. Requests search whatever index was last swapped in and never
+wait on the next one. Apps that are indexed or unindexed are recorded in
+memcache (see `changed`) and the thread reloads just those every
+SUGGESTIONS_POLL_INTERVAL seconds. It rebuilds from scratch when it falls
+too far behind, and every SUGGESTIONS_REBUILD_INTERVAL seconds to pick up
+new download counts.
+"""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import translation
+
+import commonware.log
+import waffle
+
+import amo
+import mkt
+from addons.models import AddonCategory, AddonDeviceType
+from amo.helpers import absolutify
+from amo.utils import attach_trans_dict, chunked
+from files.models import File
+from translations.helpers import truncate
+
+from mkt.search.forms import DEVICE_CHOICES_IDS
+from mkt.webapps.models import AddonExcludedRegion, Webapp
+
+log = commonware.log.getLogger('z.mkt.search')
+
+SEQUENCE_KEY = 'suggestions:sequence'
+CHANGE_KEY = 'suggestions:change:%s'
+# Processes further behind than this rebuild instead of catching up.
+MAX_CHANGES = 500
+CHUNK_SIZE = 500
+
+
+def get_sequence():
+    """The number of the last change, starting a new sequence if needed."""
+    sequence = cache.get(SEQUENCE_KEY)
+    if sequence is None:
+        # Starting a million changes from anything anyone has seen, so
+        # everyone rebuilds.
+        cache.add(SEQUENCE_KEY, int(time.time() * 1000) * 1000000,
+                  settings.SUGGESTIONS_REBUILD_INTERVAL * 10)
+        sequence = cache.get(SEQUENCE_KEY)
+    return sequence
+
+
+def changed(ids):
+    """Have the indexes of all processes reload the apps `ids`."""
+    if not ids:
+        return
+    try:
+        last = cache.incr(SEQUENCE_KEY, len(ids))
+    except ValueError:
+        # Everyone rebuilds when the sequence starts over.
+        get_sequence()
+        return
+    cache.set_many(dict((CHANGE_KEY % (last - i), id)
+                        for i, id in enumerate(reversed(ids))),
+                   settings.SUGGESTIONS_REBUILD_INTERVAL)
+
+
+class SuggestedApp(object):
+    """What the index knows about an app."""
+
+    def __init__(self, app, names, descriptions, categories, devices,
+                 excluded_regions, popularity, uses_flash):
+        self.id = app.id
+        self.default_locale = app.default_locale.lower()
+        self.premium_type = app.premium_type
+        self.app_type = (amo.ADDON_WEBAPP_PACKAGED if app.is_packaged else
+                         amo.ADDON_WEBAPP_HOSTED)
+        self.url = absolutify(app.get_detail_url())
+        self.icon = app.get_icon_url(64)
+        self.names = names
+        self.descriptions = descriptions
+        self.categories = categories
+        self.devices = devices
+        self.excluded_regions = excluded_regions
+        self.popularity = popularity
+        self.uses_flash = uses_flash
+
+    def localized(self, strings, lang):
+        """Like mkt.webapps.utils.get_attr_lang, for `strings` by locale."""
+        return (strings.get(lang) or strings.get(self.default_locale) or
+                strings.get(settings.LANGUAGE_CODE.lower()) or u'')
+
+    def name(self, lang):
+        return self.localized(self.names, lang)
+
+    def description(self, lang):
+        return self.localized(self.descriptions, lang)
+
+
+def load_apps(ids=None):
+    """SuggestedApps of the public apps, or those of `ids` still public."""
+    qs = Webapp.uncached.filter(status=amo.STATUS_PUBLIC,
+                                disabled_by_user=False)
+    if ids is not None:
+        qs = qs.filter(id__in=ids)
+    apps = {}
+    for chunk in chunked(list(qs.values_list('id', flat=True)), CHUNK_SIZE):
+        webapps = list(Webapp.uncached.filter(id__in=chunk))
+        attach_trans_dict(Webapp, webapps)
+        categories = group(AddonCategory.objects.filter(addon__in=chunk)
+                           .values_list('addon', 'category__slug'))
+        devices = group(AddonDeviceType.objects.filter(addon__in=chunk)
+                        .values_list('addon', 'device_type'))
+        excluded = group(AddonExcludedRegion.objects.filter(addon__in=chunk)
+                         .values_list('addon', 'region'))
+        # Like Addon.uses_flash, the latest file of the current version.
+        flash = dict(File.objects.filter(
+            version__in=[w._current_version_id for w in webapps])
+            .order_by('created').values_list('version', 'uses_flash'))
+        for app in webapps:
+            names = dict((locale.lower(), string) for locale, string
+                         in app.translations[app.name_id])
+            descriptions = dict((locale.lower(), truncate(string))
+                                for locale, string
+                                in app.translations[app.description_id])
+            apps[app.id] = SuggestedApp(
+                app, names, descriptions, categories.get(app.id, set()),
+                devices.get(app.id, set()), excluded.get(app.id, set()),
+                app.weekly_downloads,
+                flash.get(app._current_version_id, False))
+    return apps
+
+
+def group(pairs):
+    """{a: set([b, ...])} for `pairs` of (a, b)."""
+    groups = {}
+    for key, value in pairs:
+        groups.setdefault(key, set()).add(value)
+    return groups
+
+
+def name_keys(app):
+    """(words, id, whole name) for each word of each name of `app`."""
+    keys = set()
+    for name in app.names.values():
+        words = name.lower().split()
+        for i in range(len(words)):
+            keys.add((u' '.join(words[i:]), app.id, i == 0))
+    return keys
+
+
+class SuggestionIndex(object):
+    """
+    What's searched is only swapped in once it's complete, so requests keep
+    answering from the previous index while `refresh` builds the next one.
+    """
+
+    def __init__(self):
+        # (apps by id, sorted name keys, apps by popularity), replaced whole.
+        self.state = None
+        self.sequence = None
+        self.built = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def ready(self):
+        return self.state is not None
+
+    def start(self):
+        """Refresh the index from a thread of this process, once."""
+        if (self.thread is not None or
+            settings.SUGGESTIONS_POLL_INTERVAL is None):
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run,
+                                               name='suggestions')
+                self.thread.daemon = True
+                self.thread.start()
+
+    def run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                log.exception('Refreshing search suggestions failed.')
+            finally:
+                # Don't sit on a database connection in between.
+                connection.close()
+            time.sleep(settings.SUGGESTIONS_POLL_INTERVAL)
+
+    def refresh(self):
+        """Catch up with the apps that changed since we last looked."""
+        with self.lock:
+            sequence = get_sequence()
+            if sequence is None or self.sequence is None:
+                # Without memcache there's only the periodic rebuild.
+                behind = 0 if sequence == self.sequence else None
+            else:
+                behind = sequence - self.sequence
+            stale = (time.time() - self.built >
+                     settings.SUGGESTIONS_REBUILD_INTERVAL)
+            if (not self.ready or stale or behind is None or
+                not 0 <= behind <= MAX_CHANGES):
+                self.rebuild()
+            elif behind:
+                keys = [CHANGE_KEY % n for n in xrange(self.sequence + 1,
+                                                       sequence + 1)]
+                ids = cache.get_many(keys)
+                if len(ids) < len(keys):
+                    self.rebuild()
+                else:
+                    self.update(set(ids.values()))
+            self.sequence = sequence
+
+    def rebuild(self):
+        start = time.time()
+        apps = load_apps()
+        keys = set()
+        for app in apps.values():
+            keys.update(name_keys(app))
+        self.swap(apps, sorted(keys))
+        self.built = time.time()
+        log.info('Built suggestions for %s apps in %.2fs.' %
+                 (len(apps), self.built - start))
+
+    def update(self, ids):
+        loaded = load_apps(ids)
+        old_apps, old_keys, _ = self.state
+        apps = dict((id, app) for id, app in old_apps.items()
+                    if id not in ids)
+        apps.update(loaded)
+        keys = [key for key in old_keys if key[1] not in ids]
+        for app in loaded.values():
+            keys.extend(name_keys(app))
+        # Mostly sorted already, so this is quick.
+        keys.sort()
+        self.swap(apps, keys)
+
+    def swap(self, apps, keys):
+        popular = sorted(apps.values(),
+                         key=lambda app: (-app.popularity, app.id))
+        self.state = apps, keys, popular
+
+    def search(self, query, accept, limit):
+        """
+        Up to `limit` apps with a word of their name starting with `query`,
+        for which `accept(app)` is true. Names starting with `query` come
+        first, then the most popular. Without a query, the most popular.
+        """
+        apps, keys, popular = self.state
+        query = u' '.join(query.lower().split())
+        if not query:
+            candidates = popular
+        else:
+            matches = {}
+            i = bisect.bisect_left(keys, (query,))
+            while i < len(keys) and keys[i][0].startswith(query):
+                words, id, whole = keys[i]
+                matches[id] = matches.get(id) or whole
+                i += 1
+            candidates = sorted(
+                (apps[id] for id in matches),
+                key=lambda app: (not matches[app.id], -app.popularity,
+                                 app.id))
+        results = []
+        for app in candidates:
+            if accept(app):
+                results.append(app)
+                if len(results) == limit:
+                    break
+        return results
+
+
+index = SuggestionIndex()
+
+
+def can_suggest(request, data):
+    """Whether the index can answer for the search form `data`."""
+    if data.get('type', amo.ADDON_WEBAPP) != amo.ADDON_WEBAPP:
+        return False
+    if data.get('manifest_url') or data.get('sort'):
+        return False
+    # Feature profiles are left to elasticsearch.
+    return not (request.GET.get('pro') and
+                waffle.switch_is_active('buchets'))
+
+
+def get_filter(request, data):
+    """
+    A function telling whether an app matches the search form `data`, the
+    same way Webapp.from_search and mkt.search.views._filter_search do.
+    """
+    region = getattr(request, 'REGION', mkt.regions.WORLDWIDE)
+    no_flash = request.MOBILE or request.GAIA
+    exclude_paid = not (region.id in settings.PURCHASE_ENABLED_REGIONS or
+                        waffle.flag_is_active(request,
+                                              'allow-paid-app-search'))
+    cat = data.get('cat')
+    device = DEVICE_CHOICES_IDS.get(data.get('device'))
+    premium_types = data.get('premium_types')
+    app_type = data.get('app_type')
+
+    def accept(app):
+        return not (region.id in app.excluded_regions or
+                    (no_flash and app.uses_flash) or
+                    (exclude_paid and app.premium_type in amo.ADDON_PREMIUMS)
+                    or (cat and cat not in app.categories) or
+                    (device and device not in app.devices) or
+                    (premium_types and app.premium_type not in premium_types)
+                    or (app_type and app.app_type != app_type))
+    return accept
+
+
+def suggest(request, data, limit):
+    """
+    [names, descriptions, urls, icons] of up to `limit` apps matching the
+    search form `data`, in the active language. None until this process'
+    index is ready.
+    """
+    index.start()
+    if not index.ready:
+        return None
+    apps = index.search(data.get('q') or u'', get_filter(request, data),
+                        limit)
+    lang = translation.get_language().lower()
+    return [[app.name(lang) for app in apps],
+            [app.description(lang) for app in apps],
+            [app.url for app in apps],
+            [app.icon for app in apps]]
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import mock
+from nose.tools import eq_, ok_
+from test_utils import RequestFactory
+
+import amo
+import amo.tests
+import mkt.regions
+from addons.models import AddonDeviceType
+from amo.helpers import absolutify
+from amo.tests import app_factory
+
+from mkt.search import suggestions
+from mkt.site.fixtures import fixture
+from mkt.webapps.models import AddonExcludedRegion, Webapp
+
+
+class TestSuggestions(amo.tests.TestCase):
+    fixtures = fixture('webapp_337141')
+
+    def setUp(self):
+        self.app = Webapp.objects.get(pk=337141)
+        self.other = app_factory(name=u'Steam Engine')
+        self.request = RequestFactory().get('/')
+        self.request.REGION = mkt.regions.US
+        self.request.MOBILE = self.request.GAIA = False
+        self.index = suggestions.SuggestionIndex()
+        patcher = mock.patch.object(suggestions, 'index', self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def suggest(self, q='', **data):
+        # The first refresh builds the index, later ones catch up.
+        self.index.refresh()
+        data['q'] = q
+        return suggestions.suggest(self.request, data, 10)[0]
+
+    def test_prefix(self):
+        # Names starting with the query come first.
+        eq_(self.suggest('steam'),
+            [u'Steam Engine', u'Something Something Steamcube!'])
+        eq_(self.suggest('STEAMC'), [u'Something Something Steamcube!'])
+        eq_(self.suggest('engine'), [u'Steam Engine'])
+        eq_(self.suggest('something  steam'),
+            [u'Something Something Steamcube!'])
+        eq_(self.suggest('team'), [])
+
+    def test_popularity(self):
+        self.other.update(weekly_downloads=100000)
+        eq_(self.suggest(),
+            [u'Steam Engine', u'Something Something Steamcube!'])
+        eq_(self.suggest('s'),
+            [u'Steam Engine', u'Something Something Steamcube!'])
+
+    def test_results(self):
+        self.index.refresh()
+        names, descriptions, urls, icons = suggestions.suggest(
+            self.request, {'q': 'something'}, 10)
+        eq_(descriptions, [u'Something Something Steamcube description!'])
+        eq_(urls, [absolutify(self.app.get_detail_url())])
+        eq_(icons, [self.app.get_icon_url(64)])
+
+    def test_locale(self):
+        with self.activate(locale='es'):
+            eq_(self.suggest('algo'), [u'Algo Algo Steamcube!'])
+            eq_(self.suggest('steam e'), [u'Steam Engine'])
+
+    def test_region(self):
+        AddonExcludedRegion.objects.create(addon=self.app,
+                                           region=mkt.regions.US.id)
+        eq_(self.suggest('s'), [u'Steam Engine'])
+
+    def test_paid(self):
+        self.other.update(premium_type=amo.ADDON_PREMIUM)
+        eq_(self.suggest('steam'),
+            [u'Steam Engine', u'Something Something Steamcube!'])
+        self.request.REGION = mkt.regions.WORLDWIDE
+        eq_(self.suggest('steam'), [u'Something Something Steamcube!'])
+
+    def test_filters(self):
+        AddonDeviceType.objects.filter(addon=self.other).delete()
+        AddonDeviceType.objects.create(addon=self.other,
+                                       device_type=amo.DEVICE_DESKTOP.id)
+        ok_(u'Steam Engine' in self.suggest('steam', device='desktop'))
+        ok_(u'Steam Engine' not in self.suggest('steam', device='mobile'))
+        eq_(self.suggest('steam', premium_types=[amo.ADDON_PREMIUM]), [])
+
+    def test_changed(self):
+        eq_(self.suggest('steam'),
+            [u'Steam Engine', u'Something Something Steamcube!'])
+        self.other.name = u'Water Engine'
+        self.other.save()
+        self.app.update(status=amo.STATUS_PENDING)
+        with mock.patch.object(suggestions.index, 'rebuild') as rebuild:
+            suggestions.changed([self.other.id, self.app.id])
+            eq_(self.suggest('steam'), [])
+            eq_(self.suggest('water'), [u'Water Engine'])
+        ok_(not rebuild.called)
+
+    def test_changed_too_many(self):
+        self.suggest()
+        suggestions.changed(range(suggestions.MAX_CHANGES + 1))
+        with mock.patch.object(suggestions.index, 'rebuild') as rebuild:
+            self.suggest()
+        ok_(rebuild.called)
+
+    def test_not_ready(self):
+        # Elasticsearch answers until the index is built.
+        eq_(suggestions.suggest(self.request, {'q': 'steam'}, 10), None)
+
+    def test_old_index_served_during_rebuild(self):
+        eq_(self.suggest('steam'),
+            [u'Steam Engine', u'Something Something Steamcube!'])
+        state = self.index.state
+
+        def rebuild():
+            # Requests still get the old index while the new one loads.
+            eq_(suggestions.suggest(self.request, {'q': 'steam'}, 10)[0],
+                [u'Steam Engine', u'Something Something Steamcube!'])
+            ok_(self.index.state is state)
+
+        with mock.patch.object(suggestions, 'load_apps',
+                               side_effect=lambda *args: rebuild() or {}):
+            self.index.rebuild()
+        eq_(self.suggest('steam'), [])
+
+    def test_can_suggest(self):
+        ok_(suggestions.can_suggest(self.request, {'q': 'steam'}))
+        ok_(not suggestions.can_suggest(self.request,
+                                        {'manifest_url': 'http://a.b/m'}))
+        ok_(not suggestions.can_suggest(self.request, {'sort': ['rating']}))
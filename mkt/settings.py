@@ -233,6 +233,11 @@ MINIFY_MOZMARKET = True
 GEOIP_URL = ''
 GEOIP_DEFAULT_VAL = 'worldwide'
 GEOIP_DEFAULT_TIMEOUT = .2
+# Path to a local GeoIP database built with `manage.py compile_geoip`. When
+# set, it is tried before the GeoIP server. Workers check it for changes every
+# GEOIP_DB_RELOAD_INTERVAL seconds.
+GEOIP_DB_PATH = ''
+GEOIP_DB_RELOAD_INTERVAL = 60
 
 SENTRY_DSN = None
 
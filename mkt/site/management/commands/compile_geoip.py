@@ -0,0 +1,63 @@
+import random
+import time
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from lib.geoip.local import compile_csv, LocalGeoIP
+
+HELP = """\
+Compile a GeoIP country CSV into the database used by RegionMiddleware.
+
+    python manage.py compile_geoip GeoIPCountryWhois.csv
+
+The output defaults to settings.GEOIP_DB_PATH and is replaced atomically;
+running workers pick it up within GEOIP_DB_RELOAD_INTERVAL seconds.
+
+To time lookups against an existing database instead:
+
+    python manage.py compile_geoip --benchmark=100000
+"""
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--output', default=None,
+                    help='Where to write the database. Defaults to '
+                         'settings.GEOIP_DB_PATH.'),
+        make_option('--benchmark', type='int', default=0,
+                    help='Time this many lookups of random addresses.'),
+    )
+    args = '<csv file>'
+    help = HELP
+
+    def handle(self, *args, **kw):
+        output = kw['output'] or settings.GEOIP_DB_PATH
+        if not output:
+            raise CommandError('Use --output or set GEOIP_DB_PATH.')
+
+        if args:
+            with open(args[0], 'rb') as src:
+                count = compile_csv(src, output)
+            print 'Wrote %s ranges to %s.' % (count, output)
+        elif not kw['benchmark']:
+            raise CommandError('Nothing to do. Pass a CSV file to compile.')
+
+        if kw['benchmark']:
+            benchmark(output, kw['benchmark'])
+
+
+def benchmark(path, count):
+    geoip = LocalGeoIP(path)
+    if not geoip.loaded:
+        raise CommandError('Could not load %s.' % path)
+
+    addresses = ['%s.%s.%s.%s' % tuple(random.randint(0, 255)
+                                       for i in range(4))
+                 for j in range(count)]
+    start = time.time()
+    found = len(filter(None, (geoip.lookup(a) for a in addresses)))
+    elapsed = time.time() - start
+    print '%s lookups, %s resolved: %.2f us/lookup.' % (
+        count, found, elapsed * 1e6 / count)
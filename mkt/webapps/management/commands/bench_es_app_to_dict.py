@@ -0,0 +1,60 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from mkt.regions import WORLDWIDE
+from mkt.search.utils import S
+from mkt.webapps.models import WebappIndexer
+from mkt.webapps.utils import es_app_to_dict
+
+HELP = 'Compare per-hit cost of serializing search results for the API'
+
+
+class Command(BaseCommand):
+    """
+    Times `es_app_to_dict` over real search hits, once using the API payload
+    stored in the index and once rebuilding it from the document the way
+    documents indexed before the `api` field existed are handled.
+
+    Usage:
+
+        python manage.py bench_es_app_to_dict --hits=100 --rounds=20
+
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--hits', type='int', default=100,
+                    help='Number of search hits to serialize.'),
+        make_option('--rounds', type='int', default=20,
+                    help='Number of times to serialize every hit.'),
+    )
+
+    help = HELP
+
+    def handle(self, *args, **kwargs):
+        objs = list(S(WebappIndexer)[:kwargs['hits']].execute().objects)
+        if not objs:
+            print 'No apps in the index.'
+            return
+
+        def run(objs):
+            start = time.time()
+            for i in range(kwargs['rounds']):
+                for obj in objs:
+                    es_app_to_dict(obj, region=WORLDWIDE.id)
+            return ((time.time() - start) * 1e6 /
+                    (kwargs['rounds'] * len(objs)))
+
+        # Warm up URL resolvers and translations before timing anything.
+        es_app_to_dict(objs[0], region=WORLDWIDE.id)
+
+        stored = [o for o in objs if o._source.get('api')]
+        print '%s hits, %s with a stored API payload.' % (len(objs),
+                                                         len(stored))
+        if stored:
+            print 'stored:  %8.1f us/hit' % run(stored)
+
+        for obj in objs:
+            obj._source.pop('api', None)
+        print 'rebuilt: %8.1f us/hit' % run(objs)
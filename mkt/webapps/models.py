@@ -47,7 +47,8 @@ from versions.models import Version
 import mkt
 from mkt.constants import APP_FEATURES, APP_IMAGE_SIZES, apps
 from mkt.search.utils import S
-from mkt.webapps.utils import get_locale_properties, get_supported_locales
+from mkt.webapps.utils import (es_app_api_base, get_locale_properties,
+                               get_supported_locales)
 from mkt.zadmin.models import FeaturedApp
 
 
@@ -609,7 +610,7 @@ class Webapp(Addon):
             return sorted(ids)
         return []
 
-    def get_regions(self):
+    def get_regions(self, excluded=None):
         """
         Return regions, e.g.:
             [<class 'mkt.constants.regions.BR'>,
@@ -617,9 +618,11 @@ class Webapp(Addon):
              <class 'mkt.constants.regions.UK'>,
              <class 'mkt.constants.regions.US'>,
              <class 'mkt.constants.regions.WORLDWIDE'>]
+
+        If `excluded` is provided it is passed on to `get_region_ids`.
         """
         _regions = map(mkt.regions.REGIONS_CHOICES_ID_DICT.get,
-                       self.get_region_ids(worldwide=True))
+                       self.get_region_ids(worldwide=True, excluded=excluded))
         return sorted(_regions, key=lambda x: x.slug)
 
     def listed_in(self, region=None, category=None):
@@ -1030,6 +1033,9 @@ class WebappIndexer(MappingType, Indexable):
                 '_boost': {'name': '_boost', 'null_value': 1.0},
                 'properties': {
                     'id': {'type': 'long'},
+                    # The precomputed API representation, see
+                    # `mkt.webapps.utils.es_app_api_base`. Only stored.
+                    'api': {'type': 'object', 'enabled': False},
                     'app_slug': {'type': 'string'},
                     'app_type': {'type': 'byte'},
                     'author': {'type': 'string'},
@@ -1085,6 +1091,8 @@ class WebappIndexer(MappingType, Indexable):
                     # Turn off analysis on name so we can sort by it.
                     'name_sort': {'type': 'string', 'index': 'not_analyzed'},
                     'owners': {'type': 'long'},
+                    'payment_account': {'type': 'string',
+                                        'index': 'not_analyzed'},
                     'popularity': {'type': 'long'},
                     'premium_type': {'type': 'byte'},
                     'previews': {
@@ -1163,6 +1171,9 @@ class WebappIndexer(MappingType, Indexable):
     @classmethod
     def extract_document(cls, pk, obj=None):
         """Extracts the ElasticSearch index document for this instance."""
+        # Circular import.
+        from mkt.developers.api import AccountResource
+
         if obj is None:
             obj = cls.get_model().uncached.get(pk=pk)
 
@@ -1229,6 +1240,13 @@ class WebappIndexer(MappingType, Indexable):
         d['name_sort'] = unicode(obj.name).lower()
         d['owners'] = [au.user.id for au in
                        obj.addonuser_set.filter(role=amo.AUTHOR_ROLE_OWNER)]
+        d['payment_account'] = None
+        if obj.is_premium():
+            try:
+                d['payment_account'] = AccountResource().get_resource_uri(
+                    obj.app_payment_account.payment_account)
+            except ObjectDoesNotExist:
+                pass
         d['popularity'] = d['_boost'] = len(installed_ids)
         d['previews'] = [{'filetype': p.filetype,
                           'caption': unicode(p.caption),
@@ -1305,6 +1323,8 @@ class WebappIndexer(MappingType, Indexable):
                     in translations[obj.description_id]
                     if locale.lower() in languages))
 
+        d['api'] = es_app_api_base(d)
+
         return d
 
     @classmethod
@@ -1322,9 +1342,10 @@ Webapp._meta.translated_fields = Addon._meta.translated_fields
 @receiver(dbsignals.post_save, sender=Webapp,
           dispatch_uid='webapp.search.index')
 def update_search_index(sender, instance, **kw):
-    from . import tasks
+    from lib.es import queue
+    from . import tasks  # NOQA: registers the index queue.
     if not kw.get('raw'):
-        tasks.index_webapps.delay([instance.id])
+        queue.add('webapps', [instance.id])
 
 
 models.signals.pre_save.connect(save_signal, sender=Webapp,
@@ -1451,7 +1472,7 @@ class AddonExcludedRegion(amo.models.ModelBase):
         return mkt.regions.REGIONS_CHOICES_ID_DICT.get(self.region)
 
 
-@memoize(prefix='get_excluded_in')
+@memoize(prefix='get_excluded_in', lock=True)
 def get_excluded_in(region_id):
     """Return IDs of Webapp objects excluded from a particular region."""
     return list(AddonExcludedRegion.objects.filter(region=region_id)
@@ -1,9 +1,13 @@
 import datetime
+import gzip
 import hashlib
 import json
 import logging
 import os
-import subprocess
+import shutil
+import tarfile
+import time
+from contextlib import contextmanager
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
@@ -13,6 +17,7 @@ from django.template import Context, loader
 
 from celery.exceptions import RetryTaskError
 from celeryutils import task
+from django_statsd.clients import statsd
 from pyelasticsearch.exceptions import ElasticHttpNotFoundError
 from test_utils import RequestFactory
 
@@ -24,6 +29,7 @@ from amo.utils import chunked, JSONEncoder
 from editors.models import RereviewQueue
 from files.models import FileUpload
 from files.utils import WebAppParser
+from lib.es import queue as index_queue
 from lib.es.utils import get_indices
 from translations.models import delete_translation, Translation
 from users.utils import get_task_user
@@ -250,6 +256,12 @@ def update_supported_locales(ids, **kw):
                 _log(app, u'Updating supported locales failed.', exc_info=True)
 
 
+def suggestions_changed(ids):
+    # Imported here, mkt.search imports the forms importing this module.
+    from mkt.search.suggestions import changed
+    changed(ids)
+
+
 @task(acks_late=True)
 @write
 def index_webapps(ids, **kw):
@@ -266,6 +278,10 @@ def index_webapps(ids, **kw):
         doc = WebappIndexer.extract_document(obj.id, obj)
         for idx in indices:
             WebappIndexer.index(doc, id_=obj.id, es=es, index=idx)
+    suggestions_changed(ids)
+
+
+index_queue.register('webapps', index_webapps)
 
 
 @task(acks_late=True)
@@ -290,53 +306,145 @@ def unindex_webapps(ids, **kw):
                 # Ignore if it's not there.
                 task_log.info(
                     u'[Webapp:%s] Unindexing app but not found in index' % id_)
+    suggestions_changed(ids)
+
+
+def dump_path(id):
+    # Note: not using storage because all these operations should be local.
+    return os.path.join(settings.DUMPED_APPS_PATH, 'apps', str(id / 1000),
+                        str(id) + '.json')
+
+
+@contextmanager
+def dump_stage(name):
+    """Time a stage of the app dump, in the log and in statsd."""
+    start = time.time()
+    with statsd.timer('webapps.dump.%s' % name):
+        yield
+    task_log.info(u'Dump stage {0} took {1:.2f}s'
+                  .format(name, time.time() - start))
+
+
+def write_dump(path, content, mtime):
+    """
+    Write `content` to `path`, unless it's there already, through a
+    temporary file so nobody reads half of it. The file gets `mtime`.
+    """
+    if os.path.exists(path):
+        with open(path, 'rb') as fp:
+            unchanged = fp.read() == content
+    else:
+        unchanged = False
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+    if not unchanged:
+        with open(path + '.tmp', 'wb') as fp:
+            fp.write(content)
+        os.rename(path + '.tmp', path)
+    os.utime(path, (mtime, mtime))
+    return not unchanged
 
 
 @task
 def dump_app(id, **kw):
+    dump_apps([id])
+    path = dump_path(id)
+    if os.path.exists(path):
+        return path
+
+
+@task
+def dump_apps(ids, **kw):
+    """
+    Dump the apps `ids` to JSON files, serialized in one go. Files are only
+    rewritten if what's in them changed: a lot of what's dumped, like the
+    ratings or the weekly downloads, changes without `modified` changing.
+    """
     # Because @robhudson told me to.
     from mkt.api.resources import AppResource
-    # Note: not using storage because all these operations should be local.
-    target_dir = os.path.join(settings.DUMPED_APPS_PATH, 'apps',
-                              str(id / 1000))
-    target_file = os.path.join(target_dir, str(id) + '.json')
+    task_log.info(u'Dumping apps {0} to {1}. [{2}]'
+                  .format(ids[0], ids[-1], len(ids)))
 
-    try:
-        obj = Webapp.objects.get(pk=id)
-    except Webapp.DoesNotExist:
-        task_log.info(u'Webapp does not exist: {0}'.format(id))
+    # The files of dumped apps have the time the app was modified.
+    modified = Webapp.uncached.filter(id__in=ids).values_list('id',
+                                                              'modified')
+    mtimes = dict((id, int(time.mktime(m.timetuple()))) for id, m in modified)
+    if not mtimes:
         return
 
     req = RequestFactory().get('/')
     req.user = AnonymousUser()
     req.REGION = WORLDWIDE
 
-    if not os.path.exists(target_dir):
-        os.makedirs(target_dir)
-
-    task_log.info('Dumping app {0} to {1}'.format(id, target_file))
-    res = AppResource().dehydrate_objects([obj], request=req)
-    json.dump(res[0], open(target_file, 'w'), cls=JSONEncoder)
-    return target_file
+    with dump_stage('serialize'):
+        apps = list(Webapp.uncached.filter(id__in=mtimes))
+        data = AppResource().dehydrate_objects(apps, request=req)
+    with dump_stage('write'):
+        written = 0
+        for app, res in zip(apps, data):
+            written += write_dump(dump_path(app.id),
+                                  json.dumps(res, cls=JSONEncoder),
+                                  mtimes[app.id])
+    task_log.info(u'Dumped {0} apps, {1} changed.'.format(len(apps),
+                                                           written))
 
 
-@task
-def dump_apps(ids, **kw):
-    task_log.info(u'Dumping apps {0} to {0}. [{0}]'
-                  .format(ids[0], ids[-1], len(ids)))
-    for id in ids:
-        dump_app(id)
+def tar_fragment(fileobj, members):
+    """
+    Write `members`, pairs of (name in the archive, path), to `fileobj` as
+    tar without the blocks marking the end of the archive, so that gzipped
+    fragments can be joined into one tarball by copying them one after the
+    other and adding the end.
+    """
+    for name, path in members:
+        with open(path, 'rb') as fp:
+            content = fp.read()
+        info = tarfile.TarInfo(name)
+        info.size = len(content)
+        info.mtime = int(os.path.getmtime(path))
+        info.mode = 0644
+        fileobj.write(info.tobuf(tarfile.GNU_FORMAT))
+        fileobj.write(content)
+        fileobj.write('\0' * (-len(content) % tarfile.BLOCKSIZE))
+
+
+def write_fragment(path, members):
+    with open(path + '.tmp', 'wb') as fp:
+        gz = gzip.GzipFile(fileobj=fp, mode='wb')
+        tar_fragment(gz, members)
+        gz.close()
+    os.rename(path + '.tmp', path)
 
 
 @task
 def zip_apps(*args, **kw):
+    """
+    Build the tarball of the dumped apps from a gzipped tar fragment per
+    directory of apps. Only the fragments of directories where files
+    changed since the last dump are rebuilt, the tarball is the fragments
+    joined together. Files of apps that aren't public anymore are removed.
+    """
     # Note: not using storage because all these operations should be local.
     today = datetime.datetime.today().strftime('%Y-%m-%d')
+    apps_dir = os.path.join(settings.DUMPED_APPS_PATH, 'apps')
+    shards_dir = os.path.join(settings.DUMPED_APPS_PATH, 'shards')
     target_dir = os.path.join(settings.DUMPED_APPS_PATH, 'tarballs')
     target_file = os.path.join(target_dir, today + '.tgz')
-
-    if not os.path.exists(target_dir):
-        os.makedirs(target_dir)
+    manifest_file = os.path.join(shards_dir, 'manifest.json')
+
+    for path in (apps_dir, shards_dir, target_dir):
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+    with dump_stage('prune'):
+        public = set(Webapp.objects.filter(status=amo.STATUS_PUBLIC,
+                                           disabled_by_user=False)
+                                   .values_list('id', flat=True))
+        for root, dirs, files in os.walk(apps_dir):
+            for name in files:
+                id = name.split('.')[0]
+                if not id.isdigit() or int(id) not in public:
+                    os.remove(os.path.join(root, name))
 
     # Put some .txt files in place.
     context = Context({'date': today, 'url': settings.SITE_URL})
@@ -346,10 +454,58 @@ def zip_apps(*args, **kw):
         dest = os.path.join(settings.DUMPED_APPS_PATH, f)
         open(dest, 'w').write(template.render(context))
 
-    cmd = ['tar', 'czf', target_file, '-C',
-           settings.DUMPED_APPS_PATH, 'apps'] + files
-    task_log.info(u'Creating app dump {0}'.format(target_file))
-    subprocess.call(cmd)
+    try:
+        with open(manifest_file) as fp:
+            manifest = json.load(fp)
+    except (IOError, ValueError):
+        manifest = {}
+
+    with dump_stage('shards'):
+        shards, rebuilt = {}, 0
+        for bucket in sorted(os.listdir(apps_dir), key=int):
+            bucket_dir = os.path.join(apps_dir, bucket)
+            members = [('apps/%s/%s' % (bucket, name),
+                        os.path.join(bucket_dir, name))
+                       for name in sorted(os.listdir(bucket_dir))
+                       if name.endswith('.json')]
+            if not members:
+                continue
+            # Names and contents of the files. Their times are the apps'
+            # `modified`, which a lot of what's dumped changes without.
+            signature = hashlib.md5()
+            for name, path in members:
+                with open(path, 'rb') as fp:
+                    signature.update('%s\0%s\0' % (
+                        name, hashlib.md5(fp.read()).hexdigest()))
+            signature = signature.hexdigest()
+            shard = os.path.join(shards_dir, bucket + '.gz')
+            if (manifest.get(bucket) != signature or
+                not os.path.exists(shard)):
+                write_fragment(shard, members)
+                rebuilt += 1
+            shards[bucket] = signature
+        for name in os.listdir(shards_dir):
+            if name.endswith('.gz') and name[:-3] not in shards:
+                os.remove(os.path.join(shards_dir, name))
+        with open(manifest_file + '.tmp', 'w') as fp:
+            json.dump(shards, fp)
+        os.rename(manifest_file + '.tmp', manifest_file)
+    task_log.info(u'Rebuilt {0} of {1} shards.'.format(rebuilt, len(shards)))
+
+    with dump_stage('archive'):
+        head = os.path.join(shards_dir, 'head.gz')
+        write_fragment(head, [(f, os.path.join(settings.DUMPED_APPS_PATH, f))
+                              for f in files])
+        with open(target_file + '.tmp', 'wb') as out:
+            for path in [head] + [os.path.join(shards_dir, bucket + '.gz')
+                                  for bucket in sorted(shards, key=int)]:
+                with open(path, 'rb') as fp:
+                    shutil.copyfileobj(fp, out)
+            end = gzip.GzipFile(fileobj=out, mode='wb')
+            end.write('\0' * tarfile.BLOCKSIZE * 2)
+            end.close()
+        os.rename(target_file + '.tmp', target_file)
+    task_log.info(u'Created app dump {0}'.format(target_file))
     return target_file
 
 
@@ -2,7 +2,9 @@
 import datetime
 import json
 import os
+import shutil
 import stat
+import tarfile
 
 from django.conf import settings
 from django.core.files.storage import default_storage as storage
@@ -23,7 +25,9 @@ from versions.models import Version
 
 from mkt.site.fixtures import fixture
 from mkt.webapps.models import Webapp
-from mkt.webapps.tasks import dump_app, update_manifests, zip_apps
+from mkt.webapps.tasks import (dump_app, dump_apps, dump_path,
+                               update_manifests, write_dump, write_fragment,
+                               zip_apps)
 
 
 original = {
@@ -437,6 +441,9 @@ class TestUpdateManifest(amo.tests.TestCase):
 class TestDumpApps(amo.tests.TestCase):
     fixtures = fixture('webapp_337141')
 
+    def setUp(self):
+        shutil.rmtree(settings.DUMPED_APPS_PATH, ignore_errors=True)
+
     def test_dump_app(self):
         fn = dump_app(337141)
         result = json.load(open(fn, 'r'))
@@ -449,17 +456,67 @@ class TestDumpApps(amo.tests.TestCase):
             ok_(os.path.exists(os.path.join(settings.DUMPED_APPS_PATH, f)))
         ok_(os.stat(fn)[stat.ST_SIZE])
 
-    @mock.patch('mkt.webapps.tasks.dump_app')
-    def test_not_public(self, dump_app):
+    def test_zip_apps_contents(self):
+        dump_app(337141)
+        names = tarfile.open(zip_apps(), 'r:gz').getnames()
+        ok_('apps/337/337141.json' in names)
+        ok_('readme.txt' in names)
+
+    def test_zip_apps_unchanged(self):
+        dump_app(337141)
+        with mock.patch('mkt.webapps.tasks.write_fragment',
+                        wraps=write_fragment) as fragment:
+            zip_apps()
+            eq_(fragment.call_count, 2)
+            zip_apps()
+            # Only the readme and license.
+            eq_(fragment.call_count, 3)
+
+    def test_zip_apps_same_size_change(self):
+        path = dump_app(337141)
+        zip_apps()
+        mtime = os.path.getmtime(path)
+        content = open(path).read()
+        write_dump(path, content.replace('"id"', '"ID"'), mtime)
+        with mock.patch('mkt.webapps.tasks.write_fragment',
+                        wraps=write_fragment) as fragment:
+            zip_apps()
+            # The shard as well as the readme and license.
+            eq_(fragment.call_count, 2)
+
+    def test_zip_apps_prune(self):
+        dump_app(337141)
+        Webapp.objects.get(pk=337141).update(status=amo.STATUS_PENDING)
+        zip_apps()
+        ok_(not os.path.exists(dump_path(337141)))
+
+    @mock.patch('mkt.webapps.tasks.write_dump')
+    def test_not_public(self, write_dump):
         app = Addon.objects.get(pk=337141)
         app.update(status=amo.STATUS_PENDING)
         call_command('process_addons', task='dump_apps')
-        assert not dump_app.called
+        assert not write_dump.called
 
-    @mock.patch('mkt.webapps.tasks.dump_app')
-    def test_public(self, dump_app):
+    @mock.patch('mkt.webapps.tasks.write_dump')
+    def test_public(self, write_dump):
         call_command('process_addons', task='dump_apps')
-        assert dump_app.called
+        assert write_dump.called
+
+    def test_changed_without_modified(self):
+        dump_apps([337141])
+        # Queryset updates don't touch `modified`.
+        Webapp.objects.filter(pk=337141).update(average_rating=4.5)
+        dump_apps([337141])
+        result = json.load(open(dump_path(337141)))
+        eq_(result['ratings']['average'], 4.5)
+
+    def test_write_dump(self):
+        path = dump_path(337141)
+        ok_(write_dump(path, '{}', 1000000000))
+        ok_(not write_dump(path, '{}', 1000000001))
+        eq_(os.path.getmtime(path), 1000000001)
+        ok_(write_dump(path, '[]', 1000000002))
+        eq_(open(path).read(), '[]')
 
 
 class TestFixMissingIcons(amo.tests.TestCase):
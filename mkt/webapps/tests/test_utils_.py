@@ -1,6 +1,8 @@
 from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.db import connection
 from django.test.utils import override_settings
 
 import mock
@@ -12,18 +14,158 @@ from test_utils import RequestFactory
 import amo
 import amo.tests
 
-from addons.models import (AddonCategory, AddonDeviceType, Category,
-                           Preview)
+from addons.models import (AddonCategory, AddonDeviceType, AddonUpsell,
+                           Category, Preview)
+from amo.utils import no_translation
 from market.models import PriceCurrency
 from mkt.constants import regions
 from mkt.site.fixtures import fixture
-from mkt.webapps.models import Installed, Webapp, WebappIndexer
-from mkt.webapps.utils import (app_to_dict, es_app_to_dict,
+from mkt.webapps.models import (AddonExcludedRegion, Installed, Webapp,
+                                WebappIndexer)
+from mkt.webapps.utils import (app_to_dict, apps_to_dicts, es_app_to_dict,
                                get_supported_locales)
 from users.models import UserProfile
 from versions.models import Version
 
 
+def per_app_dict(app, region=None, profile=None, request=None):
+    """
+    How app_to_dict serialized an app before apps_to_dicts, one related
+    manager at a time, to check the bulk version against.
+    """
+    from mkt.api.resources import AppResource
+    from mkt.developers.api import AccountResource
+    from mkt.developers.models import AddonPaymentAccount
+    from mkt.regions.api import RegionResource
+    from mkt.submit.api import PreviewResource
+    from mkt.webapps.models import reverse_version
+
+    supported_locales = getattr(app.current_version, 'supported_locales', '')
+    data = {
+        'app_type': app.app_type,
+        'author': app.developer_name,
+        'categories': list(app.categories.values_list('slug', flat=True)),
+        'content_ratings': dict([(cr.get_body().name, {
+            'name': cr.get_rating().name,
+            'description': unicode(cr.get_rating().description),
+        }) for cr in app.content_ratings.all()]) or None,
+        'created': app.created,
+        'current_version': (app.current_version.version if
+                            getattr(app, 'current_version') else None),
+        'default_locale': app.default_locale,
+        'image_assets': dict([(ia.slug, (ia.image_url, ia.hue))
+                              for ia in app.image_assets.all()]),
+        'icons': dict([(icon_size, app.get_icon_url(icon_size))
+                       for icon_size in (16, 48, 64, 128)]),
+        'is_packaged': app.is_packaged,
+        'manifest_url': app.get_manifest_url(),
+        'payment_required': False,
+        'previews': PreviewResource().dehydrate_objects(app.previews.all()),
+        'premium_type': amo.ADDON_PREMIUM_API[app.premium_type],
+        'public_stats': app.public_stats,
+        'price': None,
+        'price_locale': None,
+        'ratings': {'average': app.average_rating,
+                    'count': app.total_reviews},
+        'regions': RegionResource().dehydrate_objects(app.get_regions()),
+        'slug': app.app_slug,
+        'supported_locales': (supported_locales.split(',') if supported_locales
+                              else []),
+        'weekly_downloads': app.weekly_downloads if app.public_stats else None,
+        'versions': dict((v.version, reverse_version(v)) for
+                         v in app.versions.all())
+    }
+
+    data['upsell'] = False
+    if app.upsell and region in settings.PURCHASE_ENABLED_REGIONS:
+        upsell = app.upsell.premium
+        data['upsell'] = {
+            'id': upsell.id,
+            'app_slug': upsell.app_slug,
+            'icon_url': upsell.get_icon_url(128),
+            'name': unicode(upsell.name),
+            'resource_uri': AppResource().get_resource_uri(upsell),
+        }
+
+    if app.premium:
+        q = AddonPaymentAccount.objects.filter(addon=app)
+        if len(q) > 0 and q[0].payment_account:
+            data['payment_account'] = AccountResource().get_resource_uri(
+                q[0].payment_account)
+        if (region in settings.PURCHASE_ENABLED_REGIONS or
+            (request and
+             waffle.flag_is_active(request, 'allow-paid-app-search'))):
+            data['price'] = app.get_price(region=region)
+            data['price_locale'] = app.get_price_locale(region=region)
+        data['payment_required'] = (bool(app.get_tier().price)
+                                    if app.get_tier() else False)
+
+    with no_translation():
+        data['device_types'] = [n.api_name for n in app.device_types]
+    if profile:
+        data['user'] = {
+            'developed': app.addonuser_set.filter(
+                user=profile, role=amo.AUTHOR_ROLE_OWNER).exists(),
+            'installed': app.has_installed(profile),
+            'purchased': app.pk in profile.purchase_ids(),
+        }
+    return data
+
+
+class TestAppsToDicts(amo.tests.TestCase):
+    fixtures = fixture('user_2519')
+
+    def setUp(self):
+        self.apps = [amo.tests.app_factory() for i in range(4)]
+        self.profile = UserProfile.objects.get(pk=2519)
+        self.apps[1].addonuser_set.create(user=self.profile)
+        Preview.objects.create(addon=self.apps[2], caption='foo')
+
+    def count_queries(self, apps):
+        connection.use_debug_cursor = True
+        start = len(connection.queries)
+        try:
+            apps_to_dicts(apps, profile=self.profile)
+            return len(connection.queries) - start
+        finally:
+            connection.use_debug_cursor = False
+
+    def test_empty(self):
+        eq_(apps_to_dicts([]), [])
+
+    @override_settings(PURCHASE_ENABLED_REGIONS=[regions.US.id])
+    def test_same_as_per_app(self):
+        free, owned, installed, paid = self.apps
+        cat = Category.objects.create(type=amo.ADDON_WEBAPP, slug='cat')
+        AddonCategory.objects.create(addon=free, category=cat)
+        AddonDeviceType.objects.create(addon=owned,
+                                       device_type=amo.DEVICE_TABLET.id)
+        AddonExcludedRegion.objects.create(addon=owned, region=regions.UK.id)
+        installed.installed.create(user=self.profile)
+        self.make_premium(paid, price='0.99')
+        AddonUpsell.objects.create(free=free, premium=paid)
+        ids = [a.pk for a in self.apps]
+
+        expected = [per_app_dict(Webapp.objects.get(pk=pk),
+                                 region=regions.US.id, profile=self.profile)
+                    for pk in ids]
+        eq_(apps_to_dicts([Webapp.objects.get(pk=pk) for pk in ids],
+                          region=regions.US.id, profile=self.profile),
+            expected)
+
+    def test_user(self):
+        res = apps_to_dicts(self.apps, profile=self.profile)
+        eq_([r['user']['developed'] for r in res],
+            [False, True, False, False])
+
+    def test_constant_queries(self):
+        one = self.count_queries([Webapp.objects.get(pk=self.apps[0].pk)])
+        many = self.count_queries(list(Webapp.objects.filter(
+            pk__in=[a.pk for a in self.apps[1:]])))
+        assert many <= one, ('%s queries for 3 apps, %s for one.' %
+                             (many, one))
+
+
 class TestAppToDict(amo.tests.TestCase):
     fixtures = fixture('user_2519')
 
@@ -271,6 +413,13 @@ class TestESAppToDict(amo.tests.ESTestCase):
                     u'Expected value "%s" for field "%s", got "%s"' %
                                                             (expected[k], k, v))
 
+    def test_stored_api(self):
+        obj = self.get_obj()
+        ok_(obj._source.get('api'))
+        res = es_app_to_dict(obj, profile=self.profile)
+        del obj._source['api']
+        eq_(es_app_to_dict(obj, profile=self.profile), res)
+
     def test_show_downloads_count(self):
         """Show weekly_downloads in results if app stats are public."""
         self.app.update(public_stats=True)
@@ -6,11 +6,12 @@ import waffle
 
 import amo
 from access import acl
-from addons.models import AddonUser
+from addons.models import (AddonDeviceType, AddonUpsell, AddonUser, Category,
+                           Preview)
 from amo.helpers import absolutify
-from amo.utils import find_language, no_translation
+from amo.utils import find_language, no_translation, sorted_groupby
 from constants.applications import DEVICE_TYPES
-from market.models import Price
+from market.models import AddonPremium, Price
 from users.models import UserProfile
 from versions.models import Version
 
@@ -52,88 +53,216 @@ def get_supported_locales(manifest):
 
 def app_to_dict(app, region=None, profile=None, request=None):
     """Return app data as dict for API."""
+    return apps_to_dicts([app], region=region, profile=profile,
+                         request=request)[0]
+
+
+def _group(pairs):
+    """Turn (app id, value) pairs into a dict of app id => [value, ...]."""
+    return dict((k, [v for _, v in group])
+                for k, group in sorted_groupby(pairs, lambda x: x[0]))
+
+
+def _prefetch_related(apps, region=None, profile=None):
+    """
+    Load everything `apps_to_dicts` needs for `apps` in a fixed number of
+    queries. Returns a dict of app id => dict of related data.
+
+    Premium, device types, upsell and upsold data are attached to the apps
+    themselves since other code (e.g. `AppResource.dehydrate_extra`) reads
+    them from there.
+    """
+    # Sad circular import issues.
+    from mkt.developers.models import AddonPaymentAccount
+    from mkt.webapps.models import (AddonExcludedRegion, ContentRating,
+                                    ImageAsset, Installed, Webapp)
+
+    apps_dict = dict((app.id, app) for app in apps)
+    ids = apps_dict.keys()
+    related = dict((id, {}) for id in ids)
+
+    def attach(name, groups, default=list):
+        for id in ids:
+            related[id][name] = groups.get(id) or default()
+
+    attach('categories', _group(
+        Category.objects.filter(addoncategory__addon__in=ids)
+        .values_list('addoncategory__addon', 'slug')))
+    attach('content_ratings', _group(
+        (cr.addon_id, cr) for cr in
+        ContentRating.objects.filter(addon__in=ids)))
+    attach('image_assets', _group(
+        (ia.addon_id, ia) for ia in ImageAsset.objects.filter(addon__in=ids)))
+    attach('previews', _group(
+        (p.addon_id, p) for p in Preview.objects.filter(addon__in=ids)))
+    attach('versions', _group(
+        (v[0], v[1:]) for v in Version.objects.filter(addon__in=ids)
+        .no_transforms().values_list('addon', 'id', 'version')))
+    attach('excluded_regions', _group(
+        AddonExcludedRegion.objects.filter(addon__in=ids)
+        .values_list('addon', 'region')))
+
+    missing = [id for id, app in apps_dict.items()
+               if not hasattr(app, '_device_types')]
+    if missing:
+        devices = _group(AddonDeviceType.objects.filter(addon__in=missing)
+                         .order_by('device_type')
+                         .values_list('addon', 'device_type'))
+        for id in missing:
+            apps_dict[id]._device_types = [DEVICE_TYPES[d] for d in
+                                           devices.get(id, [])]
+
+    missing = [id for id, app in apps_dict.items()
+               if not hasattr(app, '_premium')]
+    if missing:
+        premiums = dict((p.addon_id, p) for p in AddonPremium.objects
+                        .filter(addon__in=missing).select_related('price'))
+        for id in missing:
+            apps_dict[id]._premium = premiums.get(id)
+
+    premium_ids = [id for id, app in apps_dict.items() if app.premium]
+    accounts = {}
+    if premium_ids:
+        accounts = dict((a.addon_id, a.payment_account) for a in
+                        AddonPaymentAccount.objects.filter(
+                            addon__in=premium_ids)
+                        .select_related('payment_account'))
+    attach('payment_account', accounts, default=lambda: None)
+
+    # `upsell` and `upsold` are cached properties, so we can fill them in
+    # directly.
+    upsells = dict((u.free_id, u) for u in
+                   AddonUpsell.objects.filter(free__in=ids))
+    if upsells:
+        premium_apps = dict((a.id, a) for a in Webapp.objects.filter(
+            id__in=[u.premium_id for u in upsells.values()]))
+        for upsell in upsells.values():
+            if upsell.premium_id in premium_apps:
+                upsell.premium = premium_apps[upsell.premium_id]
+    upsolds = dict((u.premium_id, u) for u in
+                   AddonUpsell.objects.filter(premium__in=ids)
+                   .select_related('free'))
+    for id, app in apps_dict.items():
+        app.__dict__['upsell'] = upsells.get(id)
+        app.__dict__['upsold'] = upsolds.get(id)
+
+    if profile:
+        owned = set(AddonUser.objects.filter(
+            addon__in=ids, user=profile, role=amo.AUTHOR_ROLE_OWNER)
+            .values_list('addon', flat=True))
+        installed = set()
+        if isinstance(profile, UserProfile):
+            installed = set(Installed.objects.filter(
+                addon__in=ids, user=profile).values_list('addon', flat=True))
+        purchased = set(profile.purchase_ids())
+        for id in ids:
+            related[id]['user'] = {
+                'developed': id in owned,
+                'installed': id in installed,
+                'purchased': id in purchased,
+            }
+
+    return related
+
+
+def apps_to_dicts(apps, region=None, profile=None, request=None):
+    """
+    Return app data as a list of dicts for API, one per app in `apps`.
+
+    Related objects are loaded for all the apps at once, so serializing a
+    page of apps costs the same number of queries whatever its size.
+    """
     # Sad circular import issues.
+    from mkt.api.base import GenericObject
     from mkt.api.resources import AppResource
     from mkt.developers.api import AccountResource
-    from mkt.developers.models import AddonPaymentAccount
     from mkt.submit.api import PreviewResource
     from mkt.webapps.models import reverse_version
 
-    supported_locales = getattr(app.current_version, 'supported_locales', '')
+    apps = list(apps)
+    if not apps:
+        return []
+    related = _prefetch_related(apps, region=region, profile=profile)
+    paid_search = (region in settings.PURCHASE_ENABLED_REGIONS or
+                   (request and
+                    waffle.flag_is_active(request, 'allow-paid-app-search')))
+
+    result = []
+    for app in apps:
+        rel = related[app.id]
+        supported_locales = getattr(app.current_version, 'supported_locales',
+                                    '')
+
+        data = {
+            'app_type': app.app_type,
+            'author': app.developer_name,
+            'categories': rel['categories'],
+            'content_ratings': dict([(cr.get_body().name, {
+                'name': cr.get_rating().name,
+                'description': unicode(cr.get_rating().description),
+            }) for cr in rel['content_ratings']]) or None,
+            'created': app.created,
+            'current_version': (app.current_version.version if
+                                getattr(app, 'current_version') else None),
+            'default_locale': app.default_locale,
+            'image_assets': dict([(ia.slug, (ia.image_url, ia.hue))
+                                  for ia in rel['image_assets']]),
+            'icons': dict([(icon_size,
+                            app.get_icon_url(icon_size))
+                           for icon_size in (16, 48, 64, 128)]),
+            'is_packaged': app.is_packaged,
+            'manifest_url': app.get_manifest_url(),
+            'payment_required': False,
+            'previews': PreviewResource().dehydrate_objects(rel['previews']),
+            'premium_type': amo.ADDON_PREMIUM_API[app.premium_type],
+            'public_stats': app.public_stats,
+            'price': None,
+            'price_locale': None,
+            'ratings': {'average': app.average_rating,
+                        'count': app.total_reviews},
+            'regions': RegionResource().dehydrate_objects(
+                app.get_regions(excluded=rel['excluded_regions'])),
+            'slug': app.app_slug,
+            'supported_locales': (supported_locales.split(',')
+                                  if supported_locales else []),
+            'weekly_downloads': (app.weekly_downloads if app.public_stats
+                                 else None),
+            'versions': dict((version, reverse_version(GenericObject(
+                                 {'pk': pk})))
+                             for pk, version in rel['versions'])
+        }
 
-    data = {
-        'app_type': app.app_type,
-        'author': app.developer_name,
-        'categories': list(app.categories.values_list('slug', flat=True)),
-        'content_ratings': dict([(cr.get_body().name, {
-            'name': cr.get_rating().name,
-            'description': unicode(cr.get_rating().description),
-        }) for cr in app.content_ratings.all()]) or None,
-        'created': app.created,
-        'current_version': (app.current_version.version if
-                            getattr(app, 'current_version') else None),
-        'default_locale': app.default_locale,
-        'image_assets': dict([(ia.slug, (ia.image_url, ia.hue))
-                              for ia in app.image_assets.all()]),
-        'icons': dict([(icon_size,
-                        app.get_icon_url(icon_size))
-                       for icon_size in (16, 48, 64, 128)]),
-        'is_packaged': app.is_packaged,
-        'manifest_url': app.get_manifest_url(),
-        'payment_required': False,
-        'previews': PreviewResource().dehydrate_objects(app.previews.all()),
-        'premium_type': amo.ADDON_PREMIUM_API[app.premium_type],
-        'public_stats': app.public_stats,
-        'price': None,
-        'price_locale': None,
-        'ratings': {'average': app.average_rating,
-                    'count': app.total_reviews},
-        'regions': RegionResource().dehydrate_objects(app.get_regions()),
-        'slug': app.app_slug,
-        'supported_locales': (supported_locales.split(',') if supported_locales
-                              else []),
-        'weekly_downloads': app.weekly_downloads if app.public_stats else None,
-        'versions': dict((v.version, reverse_version(v)) for
-                         v in app.versions.all())
-    }
+        data['upsell'] = False
+        if app.upsell and region in settings.PURCHASE_ENABLED_REGIONS:
+            upsell = app.upsell.premium
+            data['upsell'] = {
+                'id': upsell.id,
+                'app_slug': upsell.app_slug,
+                'icon_url': upsell.get_icon_url(128),
+                'name': unicode(upsell.name),
+                'resource_uri': AppResource().get_resource_uri(upsell),
+            }
 
-    data['upsell'] = False
-    if app.upsell and region in settings.PURCHASE_ENABLED_REGIONS:
-        upsell = app.upsell.premium
-        data['upsell'] = {
-            'id': upsell.id,
-            'app_slug': upsell.app_slug,
-            'icon_url': upsell.get_icon_url(128),
-            'name': unicode(upsell.name),
-            'resource_uri': AppResource().get_resource_uri(upsell),
-        }
+        if app.premium:
+            if rel['payment_account']:
+                data['payment_account'] = AccountResource().get_resource_uri(
+                    rel['payment_account'])
 
-    if app.premium:
-        q = AddonPaymentAccount.objects.filter(addon=app)
-        if len(q) > 0 and q[0].payment_account:
-            data['payment_account'] = AccountResource().get_resource_uri(
-                q[0].payment_account)
-
-        if (region in settings.PURCHASE_ENABLED_REGIONS or
-            (request and
-             waffle.flag_is_active(request, 'allow-paid-app-search'))):
-            data['price'] = app.get_price(region=region)
-            data['price_locale'] = app.get_price_locale(region=region)
-        data['payment_required'] = (bool(app.get_tier().price)
-                                    if app.get_tier() else False)
-
-    with no_translation():
-        data['device_types'] = [n.api_name
-                                for n in app.device_types]
-    if profile:
-        data['user'] = {
-            'developed': app.addonuser_set.filter(
-                user=profile, role=amo.AUTHOR_ROLE_OWNER).exists(),
-            'installed': app.has_installed(profile),
-            'purchased': app.pk in profile.purchase_ids(),
-        }
+            if paid_search:
+                data['price'] = app.get_price(region=region)
+                data['price_locale'] = app.get_price_locale(region=region)
+            data['payment_required'] = (bool(app.get_tier().price)
+                                        if app.get_tier() else False)
 
-    return data
+        with no_translation():
+            data['device_types'] = [n.api_name
+                                    for n in app.device_types]
+        if profile:
+            data['user'] = rel['user']
+
+        result.append(data)
+
+    return result
 
 
 def get_attr_lang(src, attr, default_locale):
@@ -156,68 +285,92 @@ def get_attr_lang(src, attr, default_locale):
     return value[0] if value else u''
 
 
-def es_app_to_dict(obj, region=None, profile=None, request=None):
+def es_app_api_base(src):
     """
-    Return app data as dict for API where `app` is the elasticsearch result.
+    Return the part of the API representation of an app that doesn't depend
+    on the region, the user or the active language, built from its
+    elasticsearch document `src`.
+
+    The indexer stores this in the document under `api` so search responses
+    don't have to rebuild it for every hit; `es_app_to_dict` only falls back
+    to calling this for documents indexed before that.
     """
     # Circular import.
     from mkt.api.base import GenericObject
-    from mkt.api.resources import AppResource, PrivacyPolicyResource
-    from mkt.developers.api import AccountResource
-    from mkt.developers.models import AddonPaymentAccount
-    from mkt.webapps.models import Installed, Webapp
+    from mkt.api.resources import PrivacyPolicyResource
+    from mkt.webapps.models import Webapp
 
-    src = obj._source
     # The following doesn't perform a database query, but gives us useful
-    # methods like `get_detail_url`. If you use `obj` make sure the calls
+    # methods like `get_detail_url`. If you use `app` make sure the calls
     # don't query the database.
     is_packaged = src.get('app_type') == amo.ADDON_WEBAPP_PACKAGED
-    app = Webapp(app_slug=obj.app_slug, is_packaged=is_packaged)
+    app = Webapp(app_slug=src.get('app_slug'), is_packaged=is_packaged)
 
     attrs = ('content_ratings', 'created', 'current_version', 'default_locale',
              'homepage', 'manifest_url', 'previews', 'ratings', 'status',
              'support_email', 'support_url', 'weekly_downloads')
-    data = dict((a, getattr(obj, a, None)) for a in attrs)
+    data = dict((a, src.get(a)) for a in attrs)
     data.update({
         'absolute_url': absolutify(app.get_detail_url()),
         'app_type': app.app_type,
         'author': src.get('author', ''),
-        'categories': [c for c in obj.category],
-        'description': get_attr_lang(src, 'description', obj.default_locale),
-        'device_types': [DEVICE_TYPES[d].api_name for d in src.get('device')],
-        'icons': dict((i['size'], i['url']) for i in src.get('icons')),
-        'id': str(obj._id),
+        'categories': [c for c in src.get('category') or []],
+        'device_types': [DEVICE_TYPES[d].api_name
+                         for d in src.get('device') or []],
+        'id': str(src.get('id')),
         'is_packaged': is_packaged,
-        'name': get_attr_lang(src, 'name', obj.default_locale),
+        'payment_account': None,
         'payment_required': False,
         'premium_type': amo.ADDON_PREMIUM_API[src.get('premium_type')],
         'privacy_policy': PrivacyPolicyResource().get_resource_uri(
-            GenericObject({'pk': obj._id})
+            GenericObject({'pk': src.get('id')})
         ),
-        'public_stats': obj.has_public_stats,
+        'public_stats': src.get('has_public_stats'),
         'supported_locales': src.get('supported_locales', ''),
-        'slug': obj.app_slug,
+        'slug': src.get('app_slug'),
         # TODO: Remove the type check once this code rolls out and our indexes
         # aren't between mapping changes.
         'versions': dict((v.get('version'), v.get('resource_uri')) for v in
-                         src.get('versions') if type(v) == dict),
+                         src.get('versions') or [] if type(v) == dict),
     })
 
     if not data['public_stats']:
         data['weekly_downloads'] = None
 
-    data['regions'] = RegionResource().dehydrate_objects(
-        map(REGIONS_CHOICES_ID_DICT.get,
-            app.get_region_ids(worldwide=True,
-                               excluded=obj.region_exclusions)))
-
     if src.get('premium_type') in amo.ADDON_PREMIUMS:
-        acct = list(AddonPaymentAccount.objects.filter(addon=app))
-        if acct and acct.payment_account:
-            data['payment_account'] = AccountResource().get_resource_uri(
-                acct.payment_account)
+        data['payment_account'] = src.get('payment_account')
+
+    return data
+
+
+def es_app_to_dict(obj, region=None, profile=None, request=None):
+    """
+    Return app data as dict for API where `app` is the elasticsearch result.
+
+    Only the localized, region and user specific fields are computed here,
+    the rest comes straight from the `api` part of the document.
+    """
+    # Circular import.
+    from mkt.api.resources import AppResource
+    from mkt.webapps.models import Installed, Webapp
+
+    src = obj._source
+    if src.get('api'):
+        data = dict(src['api'])
     else:
-        data['payment_account'] = None
+        data = es_app_api_base(src)
+
+    # Stored JSON objects can only have string keys, so the icons dict is
+    # rebuilt here.
+    data['icons'] = dict((i['size'], i['url']) for i in src.get('icons'))
+    data['name'] = get_attr_lang(src, 'name', obj.default_locale)
+    data['description'] = get_attr_lang(src, 'description',
+                                        obj.default_locale)
+
+    data['regions'] = RegionResource().dehydrate_objects(
+        map(REGIONS_CHOICES_ID_DICT.get,
+            Webapp().get_region_ids(worldwide=True,
+                                    excluded=obj.region_exclusions)))
 
     data['price'] = data['price_locale'] = None
     try:
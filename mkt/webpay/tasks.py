@@ -107,7 +107,7 @@ def _check_image(im_path, abs_url):
 def _resize_image(old_im, size):
     new_dest = tempfile.NamedTemporaryFile()
     new_dest.close()
-    resize_image(old_im.name, new_dest.name, locally=True)
+    resize_image(old_im.name, new_dest.name, (size, size), locally=True)
     return new_dest
 
 
@@ -7,6 +7,7 @@ from django.core.files.storage import default_storage as storage
 import fudge
 from fudge.inspector import arg
 from nose.tools import eq_
+from PIL import Image
 from requests.exceptions import RequestException
 
 from amo.tests import TestCase
@@ -92,6 +93,8 @@ class TestFetchProductIcon(TestCase):
         eq_(prod.ext_size, ext_size)
         eq_(prod.size, size)
         assert storage.exists(prod.storage_path()), 'Image not created'
+        with storage.open(prod.storage_path()) as fp:
+            eq_(max(Image.open(fp).size), size)
 
     @fudge.patch('mkt.webpay.tasks.requests')
     @fudge.patch('mkt.webpay.tasks._resize_image')
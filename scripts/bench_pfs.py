@@ -0,0 +1,98 @@
+"""
+Time the PFS WSGI app in-process, with and without its response cache.
+
+    python scripts/bench_pfs.py [requests [revision]]
+
+Each request is a random mix of the mimetypes, platforms and locales Firefox
+sends. "uncached" clears the cache before every request, so it measures the
+rule lookup and rendering alone.
+
+Given a git revision, services/pfs.py as of that revision is timed on the
+same requests as "baseline", after checking it gives the same responses. To
+compare with the if/elif chain the rules replaced:
+
+    python scripts/bench_pfs.py 10000 2f6f461^
+
+`manage.py bench_services --services=pfs` times pfs alongside the other
+services, with percentiles and baselines, but always with the cache on.
+This doesn't touch the database, and is the one to use when working on the
+cache itself.
+"""
+import imp
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib import urlencode
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'apps')]
+
+from services import pfs
+
+MIMETYPES = ['application/x-shockwave-flash', 'application/x-director',
+             'audio/x-pn-realaudio-plugin', 'video/quicktime', 'audio/mpeg',
+             'application/x-java-applet;version=1.5', 'application/pdf',
+             'video/x-ms-wmv', 'application/x-mtx', 'video/vnd.divx',
+             'application/x-silverlight-2', 'application/x-unknown']
+PLATFORMS = ['Windows NT 6.1', 'Windows NT 5.1', 'Intel Mac OS X 10.8',
+             'PPC Mac OS X 10.5', 'Linux x86_64', 'Linux i686']
+LOCALES = ['en-US', 'de', 'fr', 'ja-JP', 'es-ES', 'pt-BR']
+
+
+def environ():
+    return {'QUERY_STRING': urlencode({
+        'mimetype': random.choice(MIMETYPES),
+        'appID': '{ec8030f7-c20a-464f-9b0e-13a3a9e97384}',
+        'appVersion': '20130101',
+        'clientOS': random.choice(PLATFORMS),
+        'chromeLocale': random.choice(LOCALES)})}
+
+
+def load(revision):
+    """services/pfs.py as of `revision`, as a module of its own."""
+    source = subprocess.check_output(
+        ['git', 'show', '%s:services/pfs.py' % revision], cwd=ROOT)
+    # In the services package, so `from utils import ...` still finds
+    # services/utils.py.
+    module = imp.new_module('services.pfs_baseline')
+    module.__file__ = os.path.join(ROOT, 'services', 'pfs.py')
+    exec compile(source, module.__file__, 'exec') in module.__dict__
+    return module
+
+
+def respond(app, env):
+    return ''.join(app.application(env, lambda status, headers: None))
+
+
+def run(app, environs, cached=True):
+    start_response = lambda status, headers: None
+    start = time.time()
+    for env in environs:
+        if not cached:
+            app._cache.clear()
+        app.application(env, start_response)
+    return (time.time() - start) * 1e6 / len(environs)
+
+
+def main(count, revision=None):
+    environs = [environ() for i in xrange(count)]
+    baseline = load(revision) if revision else None
+    if baseline:
+        for env in environs[:1000]:
+            if respond(baseline, env) != respond(pfs, env):
+                sys.exit('%s responds differently to %s'
+                         % (revision, env['QUERY_STRING']))
+        run(baseline, environs[:100])
+    run(pfs, environs[:100])
+    print '%s requests' % count
+    if baseline:
+        print 'baseline: %8.1f us/request' % run(baseline, environs)
+    print 'uncached: %8.1f us/request' % run(pfs, environs, False)
+    print 'cached:   %8.1f us/request' % run(pfs, environs)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+         sys.argv[2] if len(sys.argv) > 2 else None)
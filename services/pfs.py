@@ -1,8 +1,10 @@
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from email.Utils import formatdate
+import hashlib
 import re
 from string import Template
 import sys
+import threading
 from time import time
 from urlparse import parse_qsl
 
@@ -63,12 +65,241 @@ quicktime_re = re.compile(r'^(application/(sdp|x-(mpeg|rtsp|sdp))|audio/(3gpp(2)
 java_re = re.compile(r'^application/x-java-((applet|bean)(;jpi-version=1\.5|;version=(1\.(1(\.[1-3])?|(2|4)(\.[1-2])?|3(\.1)?|5)))?|vm)$')
 wmp_re = re.compile(r'^(application/(asx|x-(mplayer2|ms-wmp))|video/x-ms-(asf(-plugin)?|wm(p|v|x)?|wvx)|audio/x-ms-w(ax|ma))$')
 
-
-def get_output(data):
+win_re = re.compile(r'^Win')
+mac_re = re.compile(r'^(PPC|Intel) Mac OS X')
+win_ppc_re = re.compile(r'^(Win|PPC Mac OS X)')
+win_linux_ppc_re = re.compile(r'^(Win|Linux|PPC Mac OS X)')
+
+output = Template(xml_template)
+
+
+class Rule(object):
+    """
+    Where to get a plugin for some mimetypes on some platforms.
+
+    `mimetypes` lists exact matches, `mimetype_re` is for the families of
+    mimetypes that need a regex. `os_re` is matched against clientOS; if it
+    doesn't match, the next rule gets a chance.
+
+    `plugin` is applied to the output, then the first of `variants`,
+    (os_re, locale, plugin) tuples, whose clientOS regex and chromeLocale
+    match. None matches anything.
+    """
+
+    def __init__(self, mimetypes=(), mimetype_re=None, os_re=None,
+                 plugin=None, variants=()):
+        self.mimetypes = mimetypes
+        self.mimetype_re = mimetype_re
+        self.os_re = os_re
+        self.plugin = plugin or {}
+        self.variants = variants
+
+    def get_plugin(self, client_os, locale):
+        """Return the plugin fields for this platform, or None."""
+        if self.os_re and not self.os_re.match(client_os):
+            return None
+        plugin = dict(self.plugin)
+        for os_re, variant_locale, variant in self.variants:
+            if ((os_re is None or os_re.match(client_os)) and
+                variant_locale in (None, locale)):
+                plugin.update(variant)
+                break
+        return plugin
+
+
+# In the order they are tried.
+RULES = [
+    Rule(mimetypes=['application/x-shockwave-flash',
+                    'application/futuresplash'],
+         os_re=flash_re,
+         # Tell the user where they can go to get the installer.
+         plugin=dict(
+             name='Adobe Flash Player',
+             manualInstallationURL='http://www.adobe.com/go/getflashplayer'),
+         # Offer Windows users a specific flash plugin installer instead.
+         # Don't use a https URL for the license here, per request from
+         # Macromedia.
+         variants=[(win_re, None, dict(
+             guid='{4cfaef8a-a6c9-41a0-8e6f-967eb8f49143}',
+             XPILocation='',
+             iconUrl='http://fpdownload2.macromedia.com/pub/flashplayer/current/fp_win_installer.ico',
+             needsRestart='false',
+             InstallerShowsUI='true',
+             version='11.8.800.94',
+             InstallerHash='sha256:925f78a50f509d632ac9c9a6f5cfc2c3ab49ca0fe06f396ebcf6e41ed99b0ed0',
+             InstallerLocation='http://download.macromedia.com/pub/flashplayer/pdc/fp_pl_pfs_installer.exe'))]),
+
+    Rule(mimetypes=['application/x-director'],
+         os_re=win_re,
+         plugin=dict(
+             name='Adobe Shockwave Player',
+             manualInstallationURL='http://get.adobe.com/shockwave/',
+             guid='{45f2a22c-4029-4209-8b3d-1421b989633f}',
+             XPILocation='',
+             version='12.0.3.133',
+             InstallerHash='sha256:337498d0e556d5ec3d302db79895eaa0c47770f47227e400d582b783cca6caf8',
+             InstallerLocation='http://fpdownload.macromedia.com/pub/shockwave/default/english/win95nt/latest/Shockwave_Installer_FF.exe',
+             needsRestart='false',
+             InstallerShowsUI='false'),
+         # Even though the shockwave installer is not a silent installer, we
+         # need to show its EULA here since we've got a slimmed down
+         # installer that doesn't do that itself.
+         variants=[
+             (None, 'ja-JP', dict(
+                 licenseURL='http://www.adobe.com/go/eula_shockwaveplayer_jp')),
+             (None, None, dict(
+                 licenseURL='http://www.adobe.com/go/eula_shockwaveplayer'))]),
+
+    Rule(mimetypes=['audio/x-pn-realaudio-plugin', 'audio/x-pn-realaudio'],
+         os_re=win_linux_ppc_re,
+         plugin=dict(
+             name='Real Player',
+             version='10.5',
+             manualInstallationURL='http://www.real.com'),
+         variants=[
+             (win_re, None, dict(
+                 XPILocation='http://forms.real.com/real/player/download.html?type=firefox',
+                 guid='{d586351c-cb55-41a7-8e7b-4aaac5172d39}')),
+             (None, None, dict(
+                 guid='{269eb771-59de-4702-9209-ca97ce522f6d}'))]),
+
+    # Well, we don't have a plugin that can handle any of those mimetypes,
+    # but the Apple Quicktime plugin can. Point the user to the Quicktime
+    # download page.
+    Rule(mimetype_re=quicktime_re,
+         os_re=win_ppc_re,
+         plugin=dict(
+             name='Apple Quicktime',
+             guid='{a42bb825-7eee-420f-8ee7-834062b6fefd}',
+             InstallerShowsUI='true',
+             manualInstallationURL='http://www.apple.com/quicktime/download/')),
+
+    # We serve up the Java plugin for application/x-java-vm and the applet
+    # and bean mimetypes with jpi-version=1.5 or version=1.1 to 1.5.
+    #
+    # We don't want to link users directly to the Java plugin because we want
+    # to warn them about ongoing security problems first. Link to SUMO.
+    Rule(mimetype_re=java_re,
+         os_re=win_linux_ppc_re,
+         plugin=dict(
+             name='Java Runtime Environment',
+             manualInstallationURL='https://support.mozilla.org/kb/use-java-plugin-to-view-interactive-content',
+             needsRestart='false',
+             guid='{fbe640ef-4375-4f45-8d79-767d60bf75b8}')),
+
+    Rule(mimetypes=['application/pdf', 'application/vnd.fdf',
+                    'application/vnd.adobe.xfdf',
+                    'application/vnd.adobe.xdp+xml',
+                    'application/vnd.adobe.xfd+xml'],
+         os_re=re.compile(r'^(Win|PPC Mac OS X|Linux(?! x86_64))'),
+         plugin=dict(
+             name='Adobe Acrobat Plug-In',
+             guid='{d87cd824-67cb-4547-8587-616c70318095}',
+             manualInstallationURL='http://www.adobe.com/products/acrobat/readstep.html')),
+
+    Rule(mimetypes=['application/x-mtx'],
+         os_re=win_ppc_re,
+         plugin=dict(
+             name='Viewpoint Media Player',
+             guid='{03f998b2-0e00-11d3-a498-00104b6eb52e}',
+             manualInstallationURL='http://www.viewpoint.com/pub/products/vmp.html')),
+
+    # For all windows users who don't have the WMP 11 plugin, give them a
+    # link for it. For OSX users -- added Intel to this since flip4mac is a
+    # UB. Contact at MS was okay w/ this, plus MS points to this anyway.
+    Rule(mimetype_re=wmp_re,
+         variants=[
+             (win_re, None, dict(
+                 name='Windows Media Player',
+                 version='11',
+                 guid='{cff1240a-fd24-4b9f-8183-ccd96e5300d0}',
+                 manualInstallationURL='http://port25.technet.com/pages/windows-media-player-firefox-plugin-download.aspx')),
+             (mac_re, None, dict(
+                 name='Flip4Mac',
+                 version='2.1',
+                 guid='{cff0240a-fd24-4b9f-8183-ccd96e5300d0}',
+                 manualInstallationURL='http://www.flip4mac.com/wmv_download.htm'))]),
+
+    Rule(mimetypes=['application/x-xstandard'],
+         os_re=win_ppc_re,
+         plugin=dict(
+             name='XStandard XHTML WYSIWYG Editor',
+             guid='{3563d917-2f44-4e05-8769-47e655e92361}',
+             iconUrl='http://xstandard.com/images/xicon32x32.gif',
+             XPILocation='http://xstandard.com/download/xstandard.xpi',
+             InstallerShowsUI='false',
+             manualInstallationURL='http://xstandard.com/download/',
+             licenseURL='http://xstandard.com/license/')),
+
+    Rule(mimetypes=['application/x-dnl'],
+         os_re=win_re,
+         plugin=dict(
+             name='DNL Reader',
+             guid='{ce9317a3-e2f8-49b9-9b3b-a7fb5ec55161}',
+             version='5.5',
+             iconUrl='http://digitalwebbooks.com/reader/dwb16.gif',
+             XPILocation='http://digitalwebbooks.com/reader/xpinst.xpi',
+             InstallerShowsUI='false',
+             manualInstallationURL='http://digitalwebbooks.com/reader/')),
+
+    Rule(mimetypes=['application/x-videoegg-loader'],
+         os_re=win_re,
+         plugin=dict(
+             name='VideoEgg Publisher',
+             guid='{b8b881f0-2e07-11db-a98b-0800200c9a66}',
+             iconUrl='http://videoegg.com/favicon.ico',
+             XPILocation='http://update.videoegg.com/Install/Windows/Initial/VideoEggPublisher.xpi',
+             InstallerShowsUI='true',
+             manualInstallationURL='http://www.videoegg.com/')),
+
+    Rule(mimetypes=['video/vnd.divx'],
+         os_re=win_re,
+         plugin=dict(
+             name='DivX Web Player',
+             guid='{a8b771f0-2e07-11db-a98b-0800200c9a66}',
+             iconUrl='http://images.divx.com/divx/player/webplayer.png',
+             XPILocation='http://download.divx.com/player/DivXWebPlayer.xpi',
+             InstallerShowsUI='false',
+             licenseURL='http://go.divx.com/plugin/license/',
+             manualInstallationURL='http://go.divx.com/plugin/download/')),
+
+    Rule(mimetypes=['video/vnd.divx'],
+         os_re=mac_re,
+         plugin=dict(
+             name='DivX Web Player',
+             guid='{a8b771f0-2e07-11db-a98b-0800200c9a66}',
+             iconUrl='http://images.divx.com/divx/player/webplayer.png',
+             XPILocation='http://download.divx.com/player/DivXWebPlayerMac.xpi',
+             InstallerShowsUI='false',
+             licenseURL='http://go.divx.com/plugin/license/',
+             manualInstallationURL='http://go.divx.com/plugin/download/')),
+]
+
+# Rules by exact mimetype, in order. Mimetypes listed here never match one of
+# the regex rules (test_pfs checks), so those are only tried for the rest.
+EXACT_RULES = defaultdict(list)
+for rule in RULES:
+    for mimetype in rule.mimetypes:
+        EXACT_RULES[mimetype].append(rule)
+REGEX_RULES = [rule for rule in RULES if rule.mimetype_re]
+
+required = ['mimetype', 'appID', 'appVersion', 'clientOS', 'chromeLocale']
+
+# Rendered output for the most recent requests, see get_output.
+CACHE_SIZE = 1000
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def find_rules(mimetype):
+    if mimetype in EXACT_RULES:
+        return EXACT_RULES[mimetype]
+    return [rule for rule in REGEX_RULES if rule.mimetype_re.match(mimetype)]
+
+
+def render(data):
     g = defaultdict(str, [(k, jinja2.escape(v)) for k, v in data.iteritems()])
 
-    required = ['mimetype', 'appID', 'appVersion', 'clientOS', 'chromeLocale']
-
     # Some defaults we override depending on what we find below.
     plugin = dict(mimetype='-1', name='-1', guid='-1', version='',
                   iconUrl='', XPILocation='', InstallerLocation='',
@@ -79,8 +310,6 @@ def get_output(data):
     # Special case for mimetype if they are provided.
     plugin['mimetype'] = g['mimetype'] or '-1'
 
-    output = Template(xml_template)
-
     for s in required:
         if s not in data:
             # A sort of 404, matching what was returned in the original PHP.
@@ -88,252 +317,58 @@ def get_output(data):
 
     # Figure out what plugins we've got, and what plugins we know where
     # to get.
+    for rule in find_rules(g['mimetype']):
+        found = rule.get_plugin(g['clientOS'], g['chromeLocale'])
+        if found is not None:
+            plugin.update(found)
+            break
 
-    # Begin our huge and embarrassing if-else statement.
-    if (g['mimetype'] in ['application/x-shockwave-flash',
-                          'application/futuresplash'] and
-        re.match(flash_re, g['clientOS'])):
-
-        # Tell the user where they can go to get the installer.
-
-        plugin.update(
-            name='Adobe Flash Player',
-            manualInstallationURL='http://www.adobe.com/go/getflashplayer')
-
-        # Offer Windows users a specific flash plugin installer instead.
-        # Don't use a https URL for the license here, per request from
-        # Macromedia.
-
-        if g['clientOS'].startswith('Win'):
-            plugin.update(
-                guid='{4cfaef8a-a6c9-41a0-8e6f-967eb8f49143}',
-                XPILocation='',
-                iconUrl='http://fpdownload2.macromedia.com/pub/flashplayer/current/fp_win_installer.ico',
-                needsRestart='false',
-                InstallerShowsUI='true',
-                version='11.8.800.94',
-                InstallerHash='sha256:925f78a50f509d632ac9c9a6f5cfc2c3ab49ca0fe06f396ebcf6e41ed99b0ed0',
-                InstallerLocation='http://download.macromedia.com/pub/flashplayer/pdc/fp_pl_pfs_installer.exe')
-
-    elif (g['mimetype'] == 'application/x-director' and
-          g['clientOS'].startswith('Win')):
-        plugin.update(
-            name='Adobe Shockwave Player',
-            manualInstallationURL='http://get.adobe.com/shockwave/')
-
-        # Even though the shockwave installer is not a silent installer, we
-        # need to show its EULA here since we've got a slimmed down
-        # installer that doesn't do that itself.
-        if g['chromeLocale'] != 'ja-JP':
-            plugin.update(
-                licenseURL='http://www.adobe.com/go/eula_shockwaveplayer')
-        else:
-            plugin.update(
-                licenseURL='http://www.adobe.com/go/eula_shockwaveplayer_jp')
-        plugin.update(
-            guid='{45f2a22c-4029-4209-8b3d-1421b989633f}',
-            XPILocation='',
-            version='12.0.3.133',
-            InstallerHash='sha256:337498d0e556d5ec3d302db79895eaa0c47770f47227e400d582b783cca6caf8',
-            InstallerLocation='http://fpdownload.macromedia.com/pub/shockwave/default/english/win95nt/latest/Shockwave_Installer_FF.exe',
-            needsRestart='false',
-            InstallerShowsUI='false')
-
-    elif (g['mimetype'] in ['audio/x-pn-realaudio-plugin',
-                            'audio/x-pn-realaudio'] and
-          re.match(r'^(Win|Linux|PPC Mac OS X)', g['clientOS'])):
-        plugin.update(
-            name='Real Player',
-            version='10.5',
-            manualInstallationURL='http://www.real.com')
-
-        if g['clientOS'].startswith('Win'):
-            plugin.update(
-                XPILocation='http://forms.real.com/real/player/download.html?type=firefox',
-                guid='{d586351c-cb55-41a7-8e7b-4aaac5172d39}')
-        else:
-            plugin.update(
-                guid='{269eb771-59de-4702-9209-ca97ce522f6d}')
-
-    elif (re.match(quicktime_re, g['mimetype']) and
-          re.match(r'^(Win|PPC Mac OS X)', g['clientOS'])):
-
-        # Well, we don't have a plugin that can handle any of those
-        # mimetypes, but the Apple Quicktime plugin can. Point the user to
-        # the Quicktime download page.
-
-        plugin.update(
-            name='Apple Quicktime',
-            guid='{a42bb825-7eee-420f-8ee7-834062b6fefd}',
-            InstallerShowsUI='true',
-            manualInstallationURL='http://www.apple.com/quicktime/download/')
-
-    elif (re.match(java_re, g['mimetype']) and
-          re.match(r'^(Win|Linux|PPC Mac OS X)', g['clientOS'])):
-
-        # We serve up the Java plugin for the following mimetypes:
-        #
-        # application/x-java-vm
-        # application/x-java-applet;jpi-version=1.5
-        # application/x-java-bean;jpi-version=1.5
-        # application/x-java-applet;version=1.3
-        # application/x-java-bean;version=1.3
-        # application/x-java-applet;version=1.2.2
-        # application/x-java-bean;version=1.2.2
-        # application/x-java-applet;version=1.2.1
-        # application/x-java-bean;version=1.2.1
-        # application/x-java-applet;version=1.4.2
-        # application/x-java-bean;version=1.4.2
-        # application/x-java-applet;version=1.5
-        # application/x-java-bean;version=1.5
-        # application/x-java-applet;version=1.3.1
-        # application/x-java-bean;version=1.3.1
-        # application/x-java-applet;version=1.4
-        # application/x-java-bean;version=1.4
-        # application/x-java-applet;version=1.4.1
-        # application/x-java-bean;version=1.4.1
-        # application/x-java-applet;version=1.2
-        # application/x-java-bean;version=1.2
-        # application/x-java-applet;version=1.1.3
-        # application/x-java-bean;version=1.1.3
-        # application/x-java-applet;version=1.1.2
-        # application/x-java-bean;version=1.1.2
-        # application/x-java-applet;version=1.1.1
-        # application/x-java-bean;version=1.1.1
-        # application/x-java-applet;version=1.1
-        # application/x-java-bean;version=1.1
-        # application/x-java-applet
-        # application/x-java-bean
-        #
-        #
-        # We don't want to link users directly to the Java plugin because
-        # we want to warn them about ongoing security problems first. Link
-        # to SUMO.
-
-        plugin.update(
-            name='Java Runtime Environment',
-            manualInstallationURL='https://support.mozilla.org/kb/use-java-plugin-to-view-interactive-content',
-            needsRestart='false',
-            guid='{fbe640ef-4375-4f45-8d79-767d60bf75b8}')
-
-    elif (g['mimetype'] in ['application/pdf', 'application/vnd.fdf',
-                            'application/vnd.adobe.xfdf',
-                            'application/vnd.adobe.xdp+xml',
-                            'application/vnd.adobe.xfd+xml'] and
-          re.match(r'^(Win|PPC Mac OS X|Linux(?! x86_64))', g['clientOS'])):
-        plugin.update(
-            name='Adobe Acrobat Plug-In',
-            guid='{d87cd824-67cb-4547-8587-616c70318095}',
-            manualInstallationURL='http://www.adobe.com/products/acrobat/readstep.html')
-
-    elif (g['mimetype'] == 'application/x-mtx' and
-          re.match(r'^(Win|PPC Mac OS X)', g['clientOS'])):
-        plugin.update(
-            name='Viewpoint Media Player',
-            guid='{03f998b2-0e00-11d3-a498-00104b6eb52e}',
-            manualInstallationURL='http://www.viewpoint.com/pub/products/vmp.html')
-
-    elif re.match(wmp_re, g['mimetype']):
-        # We serve up the Windows Media Player plugin for the following
-        # mimetypes:
-        #
-        # application/asx
-        # application/x-mplayer2
-        # audio/x-ms-wax
-        # audio/x-ms-wma
-        # video/x-ms-asf
-        # video/x-ms-asf-plugin
-        # video/x-ms-wm
-        # video/x-ms-wmp
-        # video/x-ms-wmv
-        # video/x-ms-wmx
-        # video/x-ms-wvx
-        #
-        # For all windows users who don't have the WMP 11 plugin, give them
-        # a link for it.
-        if g['clientOS'].startswith('Win'):
-            plugin.update(
-                name='Windows Media Player',
-                version='11',
-                guid='{cff1240a-fd24-4b9f-8183-ccd96e5300d0}',
-                manualInstallationURL='http://port25.technet.com/pages/windows-media-player-firefox-plugin-download.aspx')
-
-        # For OSX users -- added Intel to this since flip4mac is a UB.
-        # Contact at MS was okay w/ this, plus MS points to this anyway.
-        elif re.match(r'^(PPC|Intel) Mac OS X', g['clientOS']):
-            plugin.update(
-                name='Flip4Mac',
-                version='2.1',
-                guid='{cff0240a-fd24-4b9f-8183-ccd96e5300d0}',
-                manualInstallationURL='http://www.flip4mac.com/wmv_download.htm')
-
-    elif (g['mimetype'] == 'application/x-xstandard' and
-          re.match(r'^(Win|PPC Mac OS X)', g['clientOS'])):
-        plugin.update(
-            name='XStandard XHTML WYSIWYG Editor',
-            guid='{3563d917-2f44-4e05-8769-47e655e92361}',
-            iconUrl='http://xstandard.com/images/xicon32x32.gif',
-            XPILocation='http://xstandard.com/download/xstandard.xpi',
-            InstallerShowsUI='false',
-            manualInstallationURL='http://xstandard.com/download/',
-            licenseURL='http://xstandard.com/license/')
-
-    elif (g['mimetype'] == 'application/x-dnl' and
-          g['clientOS'].startswith('Win')):
-        plugin.update(
-            name='DNL Reader',
-            guid='{ce9317a3-e2f8-49b9-9b3b-a7fb5ec55161}',
-            version='5.5',
-            iconUrl='http://digitalwebbooks.com/reader/dwb16.gif',
-            XPILocation='http://digitalwebbooks.com/reader/xpinst.xpi',
-            InstallerShowsUI='false',
-            manualInstallationURL='http://digitalwebbooks.com/reader/')
-
-    elif (g['mimetype'] == 'application/x-videoegg-loader' and
-          g['clientOS'].startswith('Win')):
-        plugin.update(
-            name='VideoEgg Publisher',
-            guid='{b8b881f0-2e07-11db-a98b-0800200c9a66}',
-            iconUrl='http://videoegg.com/favicon.ico',
-            XPILocation='http://update.videoegg.com/Install/Windows/Initial/VideoEggPublisher.xpi',
-            InstallerShowsUI='true',
-            manualInstallationURL='http://www.videoegg.com/')
-
-    elif (g['mimetype'] == 'video/vnd.divx' and
-          g['clientOS'].startswith('Win')):
-        plugin.update(
-            name='DivX Web Player',
-            guid='{a8b771f0-2e07-11db-a98b-0800200c9a66}',
-            iconUrl='http://images.divx.com/divx/player/webplayer.png',
-            XPILocation='http://download.divx.com/player/DivXWebPlayer.xpi',
-            InstallerShowsUI='false',
-            licenseURL='http://go.divx.com/plugin/license/',
-            manualInstallationURL='http://go.divx.com/plugin/download/')
-
-    elif (g['mimetype'] == 'video/vnd.divx' and
-          re.match(r'^(PPC|Intel) Mac OS X', g['clientOS'])):
-        plugin.update(
-            name='DivX Web Player',
-            guid='{a8b771f0-2e07-11db-a98b-0800200c9a66}',
-            iconUrl='http://images.divx.com/divx/player/webplayer.png',
-            XPILocation='http://download.divx.com/player/DivXWebPlayerMac.xpi',
-            InstallerShowsUI='false',
-            licenseURL='http://go.divx.com/plugin/license/',
-            manualInstallationURL='http://go.divx.com/plugin/download/')
-
-    # End ridiculously huge and embarrassing if-else block.
     return output.substitute(plugin)
 
 
+def get_response(data):
+    """
+    Return the RDF for a request and its ETag, from the cache if we've seen
+    one like it.
+
+    Only the mimetype, clientOS and whether the locale is ja-JP change the
+    output, as long as all the required parameters are there.
+    """
+    if all(s in data for s in required):
+        key = (data['mimetype'], data['clientOS'],
+               data['chromeLocale'] == 'ja-JP')
+    else:
+        key = (data.get('mimetype'),)
+
+    with _cache_lock:
+        rv = _cache.pop(key, None)
+        if rv is not None:
+            _cache[key] = rv
+            return rv
+
+    output = render(data)
+    rv = output, '"%s"' % hashlib.md5(output.encode('utf-8')).hexdigest()
+    with _cache_lock:
+        _cache[key] = rv
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return rv
+
+
+def get_output(data):
+    return get_response(data)[0]
+
+
 def format_date(secs):
     return '%s GMT' % formatdate(time() + secs)[:25]
 
 
-def get_headers(length):
+def get_headers(length, etag):
     return [('Content-Type', 'text/xml'),
             ('Cache-Control', 'public, max-age=3600'),
             ('Last-Modified', format_date(0)),
             ('Expires', format_date(3600)),
+            ('ETag', etag),
             ('Content-Length', str(length))]
 
 
@@ -348,8 +383,11 @@ def application(environ, start_response):
     with statsd.timer('services.pfs'):
         data = dict(parse_qsl(environ['QUERY_STRING']))
         try:
-            output = get_output(data)
-            start_response(status, get_headers(len(output)))
+            output, etag = get_response(data)
+            if environ.get('HTTP_IF_NONE_MATCH') == etag:
+                start_response('304 Not Modified', [('ETag', etag)])
+                return []
+            start_response(status, get_headers(len(output), etag))
         except:
             log_exception(data)
             raise
@@ -19,6 +19,9 @@ log_configure()
 
 # This has to be imported after the settings (utils).
 from django_statsd.clients import statsd
+from lib.misc.locales import LocaleNegotiator
+
+locales = LocaleNegotiator(settings)
 
 
 class ThemeUpdate(object):
@@ -208,7 +211,7 @@ def application(environ, start_response):
         data = environ['wsgi.input'].read()
         try:
             locale, id_ = url_re.match(environ['PATH_INFO']).groups()
-            locale = (locale or 'en-US').lstrip('/')
+            locale = locales.find((locale or 'en-US').lstrip('/')) or 'en-US'
             id_ = int(id_)
         except AttributeError:  # URL path incorrect.
             start_response('404 Not Found', [])
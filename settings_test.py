@@ -50,6 +50,9 @@ SEND_REAL_EMAIL = True
 # Turn off search engine indexing.
 USE_ELASTIC = False
 
+# Tests refresh the search suggestions index themselves.
+SUGGESTIONS_POLL_INTERVAL = None
+
 # Ensure all validation code runs in tests:
 VALIDATE_ADDONS = True
 
@@ -130,5 +133,6 @@ SQL_RESET_SEQUENCES = False
 GEOIP_URL = ''
 GEOIP_DEFAULT_VAL = 'worldwide'
 GEOIP_DEFAULT_TIMEOUT = .2
+GEOIP_DB_PATH = ''
 
 PURCHASE_ENABLED_REGIONS = [regions.US.id,]  # US